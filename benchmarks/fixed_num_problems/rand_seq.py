@@ -1,4 +1,3 @@
-import pickle
 import signal
 import argparse
 import numpy as np
@@ -9,6 +8,8 @@ from scipy.stats import unitary_group
 
 import qfactor
 from qfactor import CnotGate, Gate, optimize
+from qfactor import utils
+from qfactor.serialize import save_corpus
 from qfactor.tensors import CircuitTensor
 
 import qsearch
@@ -38,6 +39,10 @@ def term_trial ( signal_number, frame ):
     raise TrialTerminatedException()
 
 class CircuitDataPoint():
+
+    # Sample with scipy's unitary_group, as before batched sampling, to
+    # reproduce the seeded problem sets of earlier benchmark runs
+    legacy_sampler = False
     
     def __init__ ( self, gate_size, num_qubits, locations, native ):
         self.gate_size = gate_size
@@ -65,16 +70,23 @@ class CircuitDataPoint():
         circuit = []
 
         if self.native:
-            for pair in self.locations:
+            utrys = self.sample_unitaries( 2 * len( self.locations ), 2 )
+            singles = [ ( q, ) for pair in self.locations for q in pair ]
+            singles = Gate.from_stack( utrys, singles )
+            for i, pair in enumerate( self.locations ):
                 circuit.append( CnotGate( pair[0], pair[1] ) )
-                circuit.append( Gate( unitary_group.rvs( 2 ), ( pair[0], ) ) )
-                circuit.append( Gate( unitary_group.rvs( 2 ), ( pair[1], ) ) )
+                circuit += singles[ 2 * i : 2 * i + 2 ]
             return circuit
 
-        for location in self.locations:
-            circuit.append( Gate( unitary_group.rvs( 2 ** self.gate_size ),
-                                  location ) )
-        return circuit
+        utrys = self.sample_unitaries( len( self.locations ),
+                                       2 ** self.gate_size )
+        return Gate.from_stack( utrys, self.locations )
+
+    def sample_unitaries ( self, num_unitaries, dim ):
+        if self.legacy_sampler:
+            return np.array( [ unitary_group.rvs( dim )
+                               for x in range( num_unitaries ) ] )
+        return utils.random_unitaries( num_unitaries, dim )
     
     def get_qsearch ( self ):
         if not self.native:
@@ -185,10 +197,13 @@ def run_benchmark ( gate_size, length, num_qubits, num_circs, timeout = 60*60 ):
 
         print( pt.data )
 
-    filename = "%dq_%dg_%dd_%dp.dat" % ( num_qubits, gate_size,
-                                         length, num_circs )
-    with open( filename, "wb" ) as f:
-        pickle.dump( pts, f )
+    dirname = "%dq_%dg_%dd_%dp" % ( num_qubits, gate_size,
+                                    length, num_circs )
+    metadata = [ dict( pt.data, gate_size = pt.gate_size,
+                       num_qubits = pt.num_qubits, native = pt.native )
+                 for pt in pts ]
+    save_corpus( dirname, [ pt.get_qfactor() for pt in pts ],
+                 [ pt.target for pt in pts ], metadata )
 
 if __name__ == "__main__":
     description_info = "Generate and optimize random circuits."
@@ -210,7 +225,11 @@ if __name__ == "__main__":
     parser.add_argument( "timeout", type = int,
                          help = "Timeout in seconds for each trial." )
 
+    parser.add_argument( "--legacysampler", action = "store_true",
+                         help = "Sample as earlier runs did, to reproduce them." )
+
     args = parser.parse_args()
+    CircuitDataPoint.legacy_sampler = args.legacysampler
 
     run_benchmark( args.gatesize, args.length, args.numqubits, args.numcircs, args.timeout )
 
@@ -1,4 +1,3 @@
-import pickle
 import signal
 import argparse
 import numpy as np
@@ -10,6 +9,7 @@ from scipy.stats import unitary_group
 import qfactor
 from qfactor import CnotGate, Gate, optimize
 from qfactor.tensors import CircuitTensor
+from qfactor.serialize import save_corpus
 
 import qsearch
 
@@ -113,16 +113,19 @@ def run_benchmark ( num_qubits, gate_size, length, test_qfactor, timeout = 120*6
         print( "Times Up! Solved: %d " % num_solved )
 
     # Save results
-    filename = "%dq_%dg_%dd_%ds.dat" % ( num_qubits, gate_size, length, timeout )
+    dirname = "%dq_%dg_%dd_%ds" % ( num_qubits, gate_size, length, timeout )
     if test_qfactor:
-        filename = "qfactor_" + filename
+        dirname = "qfactor_" + dirname
     elif gate_size == 1:
-        filename = "qsearch_" + filename
+        dirname = "qsearch_" + dirname
     else:
-        filename = "qfast_" + filename
-    with open( filename, "wb" ) as f:
-        pickle.dump( num_solved, f )
-        pickle.dump( pts, f )
+        dirname = "qfast_" + dirname
+    metadata = [ dict( pt.data, gate_size = pt.gate_size,
+                       num_qubits = pt.num_qubits, native = pt.native,
+                       solved = i < num_solved )
+                 for i, pt in enumerate( pts ) ]
+    save_corpus( dirname, [ pt.get_qfactor() for pt in pts ],
+                 [ pt.target for pt in pts ], metadata )
 
 if __name__ == "__main__":
     description_info = "Generate and optimize random circuits."
@@ -144,6 +147,10 @@ if __name__ == "__main__":
     parser.add_argument( "--testqfactor", action = "store_true",
                          help = "Test Qfactor or the other stuff." )
 
+    parser.add_argument( "--legacysampler", action = "store_true",
+                         help = "Sample as earlier runs did, to reproduce them." )
+
     args = parser.parse_args()
+    ParamOptimizationProblem.legacy_sampler = args.legacysampler
 
     run_benchmark( args.numqubits, args.gatesize, args.length, args.testqfactor, args.timeout )
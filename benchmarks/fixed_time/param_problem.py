@@ -4,6 +4,7 @@ from scipy.stats import unitary_group
 
 import qfactor
 from qfactor import CnotGate, Gate, optimize
+from qfactor import utils
 from qfactor.tensors import CircuitTensor
 
 import qsearch
@@ -13,6 +14,10 @@ from qfast.decomposition.models.fixedmodel import FixedModel
 from qfast.decomposition.optimizers.lbfgs import LBFGSOptimizer
 
 class ParamOptimizationProblem():
+
+    # Sample with scipy's unitary_group, as before batched sampling, to
+    # reproduce the seeded problem sets of earlier benchmark runs
+    legacy_sampler = False
     
     def __init__ ( self, gate_size, num_qubits, locations, native ):
         self.gate_size = gate_size
@@ -40,16 +45,23 @@ class ParamOptimizationProblem():
         circuit = []
 
         if self.native:
-            for pair in self.locations:
+            utrys = self.sample_unitaries( 2 * len( self.locations ), 2 )
+            singles = [ ( q, ) for pair in self.locations for q in pair ]
+            singles = Gate.from_stack( utrys, singles )
+            for i, pair in enumerate( self.locations ):
                 circuit.append( CnotGate( pair[0], pair[1] ) )
-                circuit.append( Gate( unitary_group.rvs( 2 ), ( pair[0], ) ) )
-                circuit.append( Gate( unitary_group.rvs( 2 ), ( pair[1], ) ) )
+                circuit += singles[ 2 * i : 2 * i + 2 ]
             return circuit
 
-        for location in self.locations:
-            circuit.append( Gate( unitary_group.rvs( 2 ** self.gate_size ),
-                                  location ) )
-        return circuit
+        utrys = self.sample_unitaries( len( self.locations ),
+                                       2 ** self.gate_size )
+        return Gate.from_stack( utrys, self.locations )
+
+    def sample_unitaries ( self, num_unitaries, dim ):
+        if self.legacy_sampler:
+            return np.array( [ unitary_group.rvs( dim )
+                               for x in range( num_unitaries ) ] )
+        return utils.random_unitaries( num_unitaries, dim )
     
     def get_qsearch ( self ):
         if not self.native:
@@ -19,4 +19,9 @@ _logger.addHandler( _handler )
 # Main API
 from .gates import Gate, RxGate, RyGate, RzGate, CnotGate
 from .optimize import optimize, get_distance
+from .aio import optimize_async
+from .window import optimize_window
 
+from .partition import instantiate_blocks
+from .circuit import CircuitArray
+from .simulate import circuit_unitary, apply_circuit
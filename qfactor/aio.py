@@ -0,0 +1,150 @@
+"""
+This module implements an asyncio interface to optimize.
+
+The blocking optimization loop runs in the event loop's executor, so it
+never stalls the loop. Its per-iteration callback reports progress back
+to the loop and checks a stop flag, so cancelling the awaiting task, or
+closing the progress iterator, stops the optimization at the next sweep
+boundary. A per-process limit caps how many optimizations run at once;
+further ones wait for a slot.
+"""
+
+import os
+import asyncio
+import logging
+import threading
+import weakref
+from functools import partial
+
+from qfactor.optimize import optimize
+
+
+logger = logging.getLogger( "qfactor" )
+
+
+_max_concurrency = os.cpu_count() or 1
+
+# One semaphore per event loop, as asyncio primitives are loop-bound
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def set_max_concurrency ( max_concurrency ):
+    """
+    Sets how many optimizations may run at once in this process.
+
+    Args:
+        max_concurrency (int): The maximum number of concurrent runs.
+            Applies to event loops that have not started one yet.
+    """
+
+    global _max_concurrency
+
+    if not isinstance( max_concurrency, int ) or max_concurrency <= 0:
+        raise TypeError( "Invalid maximum concurrency." )
+
+    _max_concurrency = max_concurrency
+    _semaphores.clear()
+
+
+async def optimize_iter ( circuit, target, **kwargs ):
+    """
+    Optimizes a circuit, yielding progress after every iteration.
+
+    The circuit's gates are updated in place, as in `optimize`. Closing
+    the iterator early, or cancelling the task iterating it, stops the
+    optimization at the next sweep boundary.
+
+    Args:
+        circuit (list[Gate]): The circuit to optimize.
+
+        target (np.ndarray): The target unitary matrix.
+
+        kwargs (dict): Passed on to `optimize`. A callback given here
+            is still called and may still stop the run.
+
+    Yields:
+        (tuple[int, float]): The iteration count and the distance.
+    """
+
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    stop = threading.Event()
+    user_callback = kwargs.pop( "callback", None )
+
+    def callback ( it, c1 ):
+        loop.call_soon_threadsafe( queue.put_nowait, ( it, c1 ) )
+        if user_callback is not None and user_callback( it, c1 ):
+            return True
+        return stop.is_set()
+
+    get = None
+
+    async with _get_semaphore():
+        future = loop.run_in_executor( None, partial( optimize, circuit,
+                                                      target,
+                                                      callback = callback,
+                                                      **kwargs ) )
+        try:
+            while True:
+                get = asyncio.ensure_future( queue.get() )
+                first = asyncio.FIRST_COMPLETED
+                done, _ = await asyncio.wait( { get, future },
+                                              return_when = first )
+
+                if get in done:
+                    yield get.result()
+                    continue
+
+                get.cancel()
+                break
+
+            while not queue.empty():
+                yield queue.get_nowait()
+
+            future.result()
+
+        finally:
+            if get is not None:
+                get.cancel()
+
+            if not future.done():
+                logger.info( "Stopping optimization." )
+                stop.set()
+                await asyncio.shield( future )
+
+
+async def optimize_async ( circuit, target, **kwargs ):
+    """
+    Optimizes a circuit without blocking the event loop.
+
+    Cancelling the awaiting task stops the optimization at the next
+    sweep boundary before the cancellation propagates.
+
+    Args:
+        circuit (list[Gate]): The circuit to optimize.
+
+        target (np.ndarray): The target unitary matrix.
+
+        kwargs (dict): Passed on to `optimize`.
+
+    Returns:
+        (list[Gate]): The optimized circuit.
+    """
+
+    progress = optimize_iter( circuit, target, **kwargs )
+    try:
+        async for _ in progress:
+            pass
+    finally:
+        await progress.aclose()
+
+    return circuit
+
+
+def _get_semaphore ( ):
+    """Returns the running event loop's concurrency semaphore."""
+
+    loop = asyncio.get_running_loop()
+    if loop not in _semaphores:
+        _semaphores[ loop ] = asyncio.Semaphore( _max_concurrency )
+    return _semaphores[ loop ]
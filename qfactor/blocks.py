@@ -0,0 +1,314 @@
+"""
+This module implements a block-diagonal circuit tensor.
+
+A qubit is conserved when the target and every gate touching it are
+block diagonal in its computational basis, as are controlled unitaries
+in their controls. The circuit tensor is then zero wherever the qubit's
+output and input indices differ, and splits into one independent block
+per value of the qubit. A BlockCircuitTensor detects the conserved
+qubits and stores only these blocks, one shared index per conserved
+qubit, and applies every gate block by block. Memory and work halve for
+every conserved qubit.
+
+Gates stay block diagonal during optimization only if they never change
+or can only change within their blocks, so a conserved qubit may only
+be touched by fixed gates, such as CnotGate controls, and RzGates.
+"""
+
+import logging
+import itertools
+
+import numpy as np
+
+from qfactor import utils
+from qfactor.gates import RzGate
+from qfactor.tensors import CircuitTensor, apply_matrix, get_num_qubits
+
+
+logger = logging.getLogger( "qfactor" )
+
+
+class BlockCircuitTensor ( CircuitTensor ):
+    """A BlockCircuitTensor tracks the nonzero blocks of a circuit."""
+
+    def __init__ ( self, utry_target, gate_list, dtype = None,
+                   num_qubits = None ):
+        """
+        BlockCircuitTensor Constructor
+
+        Args:
+            utry_target (np.ndarray or list[Gate]): Unitary target
+                matrix, or a circuit implementing it.
+
+            gate_list (list[Gate]): The circuit's gate list.
+
+            dtype (np.dtype or None): If given, the tensor and every
+                applied gate are cast to this type.
+
+            num_qubits (int or None): The number of qubits of a target
+                circuit; if None, it is inferred.
+        """
+
+        self.conserved = None
+        super().__init__( utry_target, gate_list, dtype,
+                          num_qubits = num_qubits )
+
+    def reinitialize ( self ):
+        """Reconstruct the circuit tensor."""
+        logger.debug( "Reinitializing BlockCircuitTensor" )
+
+        if self.conserved is None:
+            self.conserved = get_conserved_qubits( self.utry_target,
+                                                   self.gate_list,
+                                                   self.num_qubits )
+            self.others = [ x for x in range( self.num_qubits )
+                            if x not in self.conserved ]
+            logger.info( f"Conserved qubits: {self.conserved}" )
+
+        k, m = len( self.conserved ), len( self.others )
+        dtype = np.complex128 if self.dtype is None else self.dtype
+        self.tensor = np.empty( [2] * ( k + 2 * m ), dtype )
+
+        if isinstance( self.utry_target, list ):
+            identity = np.identity( 2 ** m ).reshape( [2] * 2 * m )
+            self.tensor[...] = identity
+
+            for gate in self.utry_target:
+                self.apply_left( gate, inverse = True )
+
+        else:
+            n = self.num_qubits
+            full = self._cast( self.utry_target.conj().T )
+            full = full.reshape( [2] * 2 * n )
+            for bits in self._get_blocks():
+                self.tensor[ bits ] = full[ self._get_full_key( bits ) ]
+
+        for gate in self.gate_list:
+            self.apply_right( gate )
+
+    @property
+    def utry ( self ):
+        """Calculates this circuit tensor's unitary representation."""
+        n = self.num_qubits
+        full = np.zeros( [2] * 2 * n, self.tensor.dtype )
+
+        for bits in self._get_blocks():
+            full[ self._get_full_key( bits ) ] = self.tensor[ bits ]
+
+        return full.reshape( ( 2 ** n, 2 ** n ) )
+
+    def calc_trace ( self ):
+        """Calculates the trace of this circuit tensor's unitary."""
+        return self.calc_env_matrix( [] ).reshape( () )[()]
+
+    def apply_right ( self, gate, inverse = False ):
+        """
+        Apply the specified gate on the right of the circuit.
+
+        Args:
+            gate (Gate): The gate to apply.
+
+            inverse (bool): If true, apply the inverse of gate.
+        """
+
+        utry = gate.inverse_utry if inverse else gate.utry
+        self._apply_blocks( self._cast( utry ), gate.location, False )
+
+    def apply_left ( self, gate, inverse = False ):
+        """
+        Apply the specified gate on the left of the circuit.
+
+        Args:
+            gate (Gate): The gate to apply.
+
+            inverse (bool): If true, apply the inverse of gate.
+        """
+
+        utry = gate.inverse_utry if inverse else gate.utry
+        self._apply_blocks( self._cast( utry ), gate.location, True )
+
+    def calc_env_matrix ( self, location ):
+        """
+        Calculates the environmental matrix of the tensor with
+        respect to the specified location.
+
+        The environment is block diagonal in the conserved qubits of
+        the location; every block is the partial trace of the tensor
+        blocks with matching bits, summed over the other conserved
+        qubits.
+
+        Args:
+            location (iterable): Calculate the environment for this
+                set of qubits.
+
+        Returns:
+            (np.ndarray): The environmental matrix.
+        """
+
+        location = list( location )
+
+        if not all( 0 <= x < self.num_qubits for x in location ):
+            raise ValueError( "Invalid location for the tensor." )
+
+        k, m = len( self.conserved ), len( self.others )
+        fixed = [ x for x in location if x in self.conserved ]
+        free = [ x for x in location if x not in self.conserved ]
+        env = np.zeros( [2] * 2 * len( location ), self.tensor.dtype )
+
+        # Subscripts: block indices 0..k-1, then outputs, then inputs
+        operand = list( range( k + 2 * m ) )
+        for j, x in enumerate( self.others ):
+            if x not in location:
+                operand[ k + m + j ] = k + j
+
+        output = [ k + self.others.index( x ) for x in free ]
+        output += [ k + m + self.others.index( x ) for x in free ]
+
+        for bits in itertools.product( range( 2 ), repeat = len( fixed ) ):
+            key = [ slice( None ) ] * self.tensor.ndim
+            for x, b in zip( fixed, bits ):
+                key[ self.conserved.index( x ) ] = b
+
+            sub_operand = [ y for x, y in zip( key, operand )
+                            if isinstance( x, slice ) ]
+            share = np.einsum( self.tensor[ tuple( key ) ], sub_operand,
+                               output )
+
+            bits = dict( zip( fixed, bits ) )
+            env_key = [ bits.get( x, slice( None ) ) for x in location ]
+            env[ tuple( env_key + env_key ) ] = share
+
+        size = 2 ** len( location )
+        return env.reshape( ( size, size ) )
+
+    def _apply_blocks ( self, utry, location, left ):
+        """
+        Contracts a gate into every block of the tensor.
+
+        Args:
+            utry (np.ndarray): The gate's matrix.
+
+            location (tuple[int]): The qubits the gate acts on.
+
+            left (bool): Contract into the input indices instead of the
+                output indices.
+        """
+
+        k, m = len( self.conserved ), len( self.others )
+        size = len( location )
+        fixed = [ j for j, x in enumerate( location ) if x in self.conserved ]
+        free = [ x for x in location if x not in self.conserved ]
+        # Slicing off the blocks' indices, which lead, shifts the rest
+        offset = ( k + m if left else k ) - len( fixed )
+        axes = [ offset + self.others.index( x ) for x in free ]
+        utry = utry.reshape( [2] * 2 * size )
+
+        for bits in itertools.product( range( 2 ), repeat = len( fixed ) ):
+            utry_key = [ slice( None ) ] * 2 * size
+            key = [ slice( None ) ] * self.tensor.ndim
+            for j, b in zip( fixed, bits ):
+                utry_key[j] = b
+                utry_key[ size + j ] = b
+                key[ self.conserved.index( location[j] ) ] = b
+
+            sub = utry[ tuple( utry_key ) ]
+            sub = sub.reshape( ( 2 ** len( free ), 2 ** len( free ) ) )
+
+            # Multiplying on the right contracts the matrix's row index
+            if left:
+                sub = sub.T
+
+            key = tuple( key )
+            if len( free ) == 0:
+                self.tensor[ key ] *= sub[0, 0]
+            else:
+                self.tensor[ key ] = apply_matrix( self.tensor[ key ], sub,
+                                                   axes )
+
+    def _get_blocks ( self ):
+        """Returns the bits of every block, one per conserved qubit."""
+        return itertools.product( range( 2 ), repeat = len( self.conserved ) )
+
+    def _get_full_key ( self, bits ):
+        """Returns the index of a block in the full [2] * 2n tensor."""
+        n = self.num_qubits
+        key = [ slice( None ) ] * 2 * n
+        for x, b in zip( self.conserved, bits ):
+            key[x] = b
+            key[ n + x ] = b
+        return tuple( key )
+
+
+def get_conserved_qubits ( target, circuit, num_qubits = None ):
+    """
+    Finds the qubits a problem's tensor is block diagonal in.
+
+    Args:
+        target (np.ndarray or list[Gate]): The unitary target, or a
+            circuit implementing it.
+
+        circuit (list[Gate]): The circuit.
+
+        num_qubits (int or None): The number of qubits, if known.
+
+    Returns:
+        (list[int]): The sorted conserved qubits.
+    """
+
+    num_qubits = get_num_qubits( target, circuit, num_qubits )
+    conserved = []
+
+    for qubit in range( num_qubits ):
+        if not all( [ _is_conserved_by( gate, qubit, True )
+                      for gate in circuit ] ):
+            continue
+
+        if isinstance( target, list ):
+            if not all( [ _is_conserved_by( gate, qubit, False )
+                          for gate in target ] ):
+                continue
+
+        elif not _is_block_diagonal( target, num_qubits, qubit ):
+            continue
+
+        conserved.append( qubit )
+
+    return conserved
+
+
+def _is_conserved_by ( gate, qubit, updated ):
+    """
+    Returns true if a gate keeps a qubit block diagonal.
+
+    Args:
+        gate (Gate): The gate.
+
+        qubit (int): The qubit.
+
+        updated (bool): If true, the gate must also stay block diagonal
+            when it is updated.
+    """
+
+    if qubit not in gate.location:
+        return True
+
+    if updated and not gate.fixed and not isinstance( gate, RzGate ):
+        return False
+
+    index = gate.location.index( qubit )
+    return _is_block_diagonal( gate.utry, len( gate.location ), index )
+
+
+def _is_block_diagonal ( utry, num_qubits, qubit ):
+    """Returns true if a matrix never flips the qubit."""
+    tensor = np.asarray( utry ).reshape( [2] * 2 * num_qubits )
+    key = [ slice( None ) ] * 2 * num_qubits
+    tol = utils.get_unitary_tol( tensor.dtype )
+
+    for a, b in [ ( 0, 1 ), ( 1, 0 ) ]:
+        key[ qubit ] = a
+        key[ num_qubits + qubit ] = b
+        if not np.allclose( tensor[ tuple( key ) ], 0, atol = tol ):
+            return False
+
+    return True
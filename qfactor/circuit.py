@@ -0,0 +1,435 @@
+"""
+This module implements the CircuitArray class.
+
+A CircuitArray is a structure-of-arrays view of a circuit. The angles of
+every parameterized gate type are kept in one contiguous array per type
+and the gate locations in one integer array, so the unitaries and update
+formulas of all gates of a type are evaluated in single vectorized calls
+instead of once per gate object.
+
+`optimize` accepts a CircuitArray. Its sweeps see the gates through
+light ArrayGate views: the unitaries of each type are built in one call
+and cached in one stack, and every update recomputes only its own gate's
+unitary, in sweep order.
+"""
+
+import numpy as np
+
+from qfactor.gates import Gate, RxGate, RyGate, RzGate, XXGate, CnotGate
+from qfactor.gates.cnot import CNOT_UTRY
+
+
+# Gate type codes, in the order stored in CircuitArray.types
+GATE, RX, RY, RZ, XX, CNOT = range( 6 )
+
+GATE_CODES = { RxGate: RX, RyGate: RY, RzGate: RZ, XXGate: XX,
+               CnotGate: CNOT }
+
+GATE_CLASSES = { code: gate_class for gate_class, code in GATE_CODES.items() }
+
+PARAM_CODES = ( RX, RY, RZ, XX )
+
+
+class CircuitArray():
+    """A CircuitArray stores a circuit's gates type by type in arrays."""
+
+    def __init__ ( self, circuit ):
+        """
+        CircuitArray Constructor
+
+        Args:
+            circuit (list[Gate]): The circuit to store. Gates that are
+                not RxGate, RyGate, RzGate, XXGate or CnotGate are kept
+                as dense general gates.
+        """
+
+        if not isinstance( circuit, list ):
+            raise TypeError( "The circuit argument is not a list of gates." )
+
+        if not all( [ isinstance( g, Gate ) for g in circuit ] ):
+            raise TypeError( "The circuit argument is not a list of gates." )
+
+        self.num_gates = len( circuit )
+        max_size = max( [ g.gate_size for g in circuit ], default = 1 )
+
+        self.types = np.empty( self.num_gates, dtype = np.int8 )
+        self.gate_sizes = np.empty( self.num_gates, dtype = np.int64 )
+        self.locations = np.full( ( self.num_gates, max_size ), -1,
+                                  dtype = np.int64 )
+        self.fixed = np.empty( self.num_gates, dtype = bool )
+        self.utrys = []
+
+        for i, gate in enumerate( circuit ):
+            self.types[i] = GATE_CODES.get( type( gate ), GATE )
+            self.gate_sizes[i] = gate.gate_size
+            self.locations[ i, : gate.gate_size ] = gate.location
+            self.fixed[i] = gate.fixed
+
+            if self.types[i] == GATE:
+                self.utrys.append( gate.utry )
+
+        self.indices = { code: np.flatnonzero( self.types == code )
+                         for code in range( CNOT + 1 ) }
+
+        self.thetas = { code: np.array( [ circuit[i].theta
+                                          for i in self.indices[ code ] ],
+                                        dtype = np.float64 )
+                        for code in PARAM_CODES }
+
+        # Position of every gate within its type's arrays
+        self.positions = np.empty( self.num_gates, dtype = np.int64 )
+        for code, indices in self.indices.items():
+            self.positions[ indices ] = np.arange( len( indices ) )
+
+        self._stacks = {}
+        self._inverses = {}
+
+    def get_gates ( self ):
+        """
+        Returns ArrayGate views of this CircuitArray's gates.
+
+        Updating a view updates this CircuitArray.
+
+        Returns:
+            (list[ArrayGate]): The views, in circuit order.
+        """
+
+        return [ ArrayGate( self, i ) for i in range( self.num_gates ) ]
+
+    def get_utry ( self, index ):
+        """Returns the cached unitary of the gate at index."""
+        code = self.types[ index ]
+
+        if code == GATE:
+            return self.utrys[ self.positions[ index ] ]
+
+        if code not in self._stacks:
+            self._stacks[ code ] = self.get_type_utrys( code )
+
+        return self._stacks[ code ][ self.positions[ index ] ]
+
+    def get_inverse_utry ( self, index ):
+        """Returns the cached inverse unitary of the gate at index."""
+        code = self.types[ index ]
+
+        if code == GATE:
+            return self.utrys[ self.positions[ index ] ].conj().T
+
+        if code not in self._inverses:
+            self.get_utry( index )
+            stack = self._stacks[ code ]
+            self._inverses[ code ] = stack.conj().transpose( 0, 2, 1 )
+
+        return self._inverses[ code ][ self.positions[ index ] ]
+
+    def set_utry ( self, index, utry ):
+        """Sets the unitary of the general gate at index."""
+
+        if self.types[ index ] != GATE:
+            raise TypeError( "Gate is not a general gate." )
+
+        self.utrys[ self.positions[ index ] ] = utry
+
+    def set_theta ( self, index, theta ):
+        """Sets the angle of the parameterized gate at index."""
+        code = self.types[ index ]
+
+        if code not in PARAM_CODES:
+            raise TypeError( "Gate is not parameterized." )
+
+        position = self.positions[ index ]
+        self.thetas[ code ][ position ] = theta
+
+        # Only this gate's cached unitary changes
+        if code in self._stacks:
+            utry = _build_utrys( code, self.thetas[ code ][ [ position ] ] )
+            self._stacks[ code ][ position ] = utry[0]
+
+            if code in self._inverses:
+                self._inverses[ code ][ position ] = utry[0].conj().T
+
+    def update_gate ( self, index, env, slowdown_factor ):
+        """
+        Update the gate at index with respect to an environment.
+
+        Same as the gate's own update method.
+
+        Args:
+            index (int): The gate's index in the circuit.
+
+            env (np.ndarray): The enviromental matrix.
+
+            slowdown_factor (float): A positive number less than 1.
+                The larger this factor, the slower the optimization.
+        """
+
+        if self.fixed[ index ]:
+            return
+
+        code = self.types[ index ]
+
+        if code == GATE:
+            gate = Gate( self.get_utry( index ), self._get_location( index ),
+                         check_params = False )
+            gate.update( env, slowdown_factor )
+            self.set_utry( index, gate.utry )
+            return
+
+        theta = self.thetas[ code ][ self.positions[ index ] ]
+        new_theta = _get_new_thetas( code, np.asarray( env )[ None ] )[0]
+        self.set_theta( index, ( 1 - slowdown_factor ) * new_theta
+                               + slowdown_factor * theta )
+
+    def to_gates ( self ):
+        """
+        Converts this CircuitArray back into a list of gates.
+
+        Returns:
+            (list[Gate]): The circuit as new gate objects.
+        """
+
+        circuit = [ None ] * self.num_gates
+
+        for code in PARAM_CODES:
+            gate_class = GATE_CLASSES[ code ]
+            for i, theta in zip( self.indices[ code ], self.thetas[ code ] ):
+                location = self._get_location( i )
+                circuit[i] = gate_class( float( theta ), location,
+                                         bool( self.fixed[i] ), False )
+
+        for i in self.indices[ CNOT ]:
+            control, target = self._get_location( i )
+            circuit[i] = CnotGate( int( control ), int( target ), False )
+
+        for i, utry in zip( self.indices[ GATE ], self.utrys ):
+            circuit[i] = Gate( utry, self._get_location( i ),
+                               bool( self.fixed[i] ), False )
+
+        return circuit
+
+    def get_type_utrys ( self, code ):
+        """
+        Builds the unitaries of every gate of one type.
+
+        Args:
+            code (int): The gate type code, one of RX, RY, RZ, XX, CNOT.
+
+        Returns:
+            (np.ndarray): The stacked unitaries, in circuit order.
+        """
+
+        if code == CNOT:
+            return np.broadcast_to( CNOT_UTRY,
+                                    ( len( self.indices[ CNOT ] ), 4, 4 ) )
+
+        if code not in PARAM_CODES:
+            raise ValueError( "Invalid gate type code." )
+
+        return _build_utrys( code, self.thetas[ code ] )
+
+    def get_utrys ( self ):
+        """
+        Builds every gate unitary, one vectorized call per gate type.
+
+        Returns:
+            (list[np.ndarray]): The gate unitaries, in circuit order.
+        """
+
+        utrys = [ None ] * self.num_gates
+
+        for code in PARAM_CODES + ( CNOT, ):
+            batch = self.get_type_utrys( code )
+            for i, utry in zip( self.indices[ code ], batch ):
+                utrys[i] = utry
+
+        for i, utry in zip( self.indices[ GATE ], self.utrys ):
+            utrys[i] = utry
+
+        return utrys
+
+    def update ( self, code, envs, slowdown_factor ):
+        """
+        Update every gate of one parameterized type at once.
+
+        Each gate's angle is set to maximize Re( Tr( env * utry ) )
+        for its own environment, as in the gate's update method. Fixed
+        gates are left unchanged. The environments must not depend on
+        each other's updates; a sweep updates its gates one at a time
+        with `update_gate` instead.
+
+        Args:
+            code (int): The gate type code, one of RX, RY, RZ, XX.
+
+            envs (np.ndarray): The stacked environmental matrices of
+                the type's gates, in circuit order.
+
+            slowdown_factor (float): A positive number less than 1.
+                The larger this factor, the slower the optimization.
+        """
+
+        if code not in PARAM_CODES:
+            raise ValueError( "Invalid gate type code." )
+
+        if len( envs ) != len( self.indices[ code ] ):
+            raise ValueError( "Number of environments mismatch." )
+
+        if len( envs ) == 0:
+            return
+
+        new_thetas = _get_new_thetas( code, envs )
+        thetas = self.thetas[ code ]
+        new_thetas = ( ( 1 - slowdown_factor ) * new_thetas
+                       + slowdown_factor * thetas )
+        free = ~self.fixed[ self.indices[ code ] ]
+        thetas[ free ] = new_thetas[ free ]
+        self._stacks.pop( code, None )
+        self._inverses.pop( code, None )
+
+    def _get_location ( self, index ):
+        """Returns the location of the gate at index as a tuple."""
+        size = self.gate_sizes[ index ]
+        return tuple( int( q ) for q in self.locations[ index, : size ] )
+
+    def __len__ ( self ):
+        """Returns the number of gates."""
+        return self.num_gates
+
+
+class ArrayGate ( Gate ):
+    """An ArrayGate is a view of one gate of a CircuitArray."""
+
+    __slots__ = ( "array", "index" )
+
+    def __init__ ( self, array, index ):
+        """
+        ArrayGate Constructor
+
+        Args:
+            array (CircuitArray): The CircuitArray holding the gate.
+
+            index (int): The gate's index in the circuit.
+        """
+
+        self.array = array
+        self.index = index
+        self.location = array._get_location( index )
+        self.gate_size = len( self.location )
+        self.fixed = bool( array.fixed[ index ] )
+
+    @property
+    def utry ( self ):
+        """The gate's unitary operation, cached by the CircuitArray."""
+        return self.array.get_utry( self.index )
+
+    @utry.setter
+    def utry ( self, utry ):
+        self.array.set_utry( self.index, utry )
+
+    @property
+    def inverse_utry ( self ):
+        """The inverse of the gate's unitary."""
+        return self.array.get_inverse_utry( self.index )
+
+    @property
+    def theta ( self ):
+        """The gate's angle of rotation, if it is parameterized."""
+        code = self.array.types[ self.index ]
+
+        if code not in PARAM_CODES:
+            raise AttributeError( "Gate is not parameterized." )
+
+        return self.array.thetas[ code ][ self.array.positions[ self.index ] ]
+
+    @theta.setter
+    def theta ( self, theta ):
+        self.array.set_theta( self.index, theta )
+
+    def update ( self, env, slowdown_factor ):
+        """
+        Update this gate with respect to an enviroment.
+
+        Args:
+            env (np.ndarray): The enviromental matrix.
+
+            slowdown_factor (float): A positive number less than 1.
+                The larger this factor, the slower the optimization.
+        """
+
+        self.array.update_gate( self.index, env, slowdown_factor )
+
+    def is_real ( self ):
+        """Returns true if this gate's unitary is real and stays real."""
+        code = self.array.types[ self.index ]
+
+        if code in ( RY, CNOT ):
+            return True
+
+        if code in PARAM_CODES and not self.fixed:
+            return False
+
+        return super().is_real()
+
+    def is_diagonal ( self ):
+        """Returns true if this gate's unitary is diagonal and stays so."""
+        return self.array.types[ self.index ] == RZ or super().is_diagonal()
+
+    def __repr__ ( self ):
+        """Gets a simple gate string representation."""
+        return str( self.location ) + ": ArrayGate(" + str( self.index ) + ")"
+
+
+def _build_utrys ( code, thetas ):
+    """Builds the stacked unitaries of one gate type from its angles."""
+
+    utrys = np.zeros( ( len( thetas ), 4 if code == XX else 2,
+                        4 if code == XX else 2 ), dtype = np.complex128 )
+
+    if code == RZ:
+        utrys[:, 0, 0] = 1
+        utrys[:, 1, 1] = np.exp( 1j * thetas )
+        return utrys
+
+    cos = np.cos( thetas / 2 )
+    sin = np.sin( thetas / 2 )
+    dim = utrys.shape[1]
+
+    for j in range( dim ):
+        utrys[:, j, j] = cos
+
+    if code == RY:
+        utrys[:, 0, 1] = -sin
+        utrys[:, 1, 0] = sin
+    else:
+        for j in range( dim ):
+            utrys[:, j, dim - 1 - j] = -1j * sin
+
+    return utrys
+
+
+def _get_new_thetas ( code, envs ):
+    """Returns the angles maximizing Re( Tr( env * utry ) ) per env."""
+
+    if code == RX:
+        a = np.real( envs[:, 0, 0] + envs[:, 1, 1] )
+        b = np.imag( envs[:, 0, 1] + envs[:, 1, 0] )
+        new_thetas = 2 * np.arccos( a / np.sqrt( a ** 2 + b ** 2 ) )
+        new_thetas *= np.where( b < 0, -1, 1 )
+
+    elif code == RY:
+        a = np.real( envs[:, 0, 0] + envs[:, 1, 1] )
+        b = np.real( envs[:, 1, 0] - envs[:, 0, 1] )
+        new_thetas = -2 * np.arctan2( b, a )
+
+    elif code == RZ:
+        a = np.real( envs[:, 1, 1] )
+        b = np.imag( envs[:, 1, 1] )
+        new_thetas = -np.arctan2( b, a )
+
+    else:
+        a = np.real( np.trace( envs, axis1 = 1, axis2 = 2 ) )
+        b = np.imag( envs[:, 0, 3] + envs[:, 1, 2]
+                     + envs[:, 2, 1] + envs[:, 3, 0] )
+        new_thetas = np.arccos( a / np.sqrt( a ** 2 + b ** 2 ) )
+        new_thetas *= np.where( b < 0, -2, 2 )
+
+    return new_thetas
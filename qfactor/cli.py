@@ -0,0 +1,253 @@
+"""
+This module implements the qfactor command-line entry point.
+
+The `qfactor` command solves every problem of a circuit corpus, written
+by `qfactor.serialize.save_corpus`, or of a single circuit file, written
+by `qfactor.serialize.save_circuit`. Each problem's circuit is the
+starting point and its stored target is the target. Problems are solved
+on worker processes and every result is appended to the output file as
+one JSON line, as soon as it is ready. A problem that fails is
+recorded as a line with an error instead, and the others carry on.
+Rerunning the same command skips the problems already in the output
+file, so a crashed run resumes where it stopped.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from qfactor.optimize import optimize, get_distance
+from qfactor.serialize import CircuitCorpus, load_circuit
+
+
+logger = logging.getLogger( "qfactor" )
+
+
+# The corpus this worker process reads problems from, opened once
+_corpus = None
+
+
+def main ( argv = None ):
+    """
+    Runs the qfactor command.
+
+    Args:
+        argv (list[str] or None): The command-line arguments. If None,
+            sys.argv is used.
+
+    Returns:
+        (int): The exit status, 1 if any problem failed.
+    """
+
+    args = _get_parser().parse_args( argv )
+
+    if args.verbose:
+        logger.setLevel( logging.INFO )
+
+    num_problems = _get_num_problems( args.input )
+    done = _read_done( args.output )
+    todo = [ i for i in range( num_problems ) if i not in done ]
+    logger.info( f"{len( done )} problems done, {len( todo )} to solve." )
+
+    kwargs = { "dist_tol": args.dist_tol, "max_iters": args.max_iters,
+               "min_iters": args.min_iters }
+
+    status = 0
+
+    with open( args.output, "a" ) as f, \
+         ProcessPoolExecutor( max_workers = args.workers ) as executor:
+
+        futures = { executor.submit( solve_problem, args.input, index,
+                                     args.time_limit, kwargs ): index
+                    for index in todo }
+
+        for future in as_completed( futures ):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = { "index": futures[ future ],
+                           "error": f"{type( e ).__name__}: {e}" }
+                logger.error( f"Problem {futures[ future ]} failed: {e}" )
+                status = 1
+
+            f.write( json.dumps( result ) + "\n" )
+            f.flush()
+
+    return status
+
+
+def solve_problem ( path, index, time_limit = None, kwargs = None ):
+    """
+    Solves one problem of a corpus or circuit file.
+
+    Args:
+        path (str): The corpus directory or circuit file.
+
+        index (int): The problem's index in the corpus.
+
+        time_limit (float or None): Stop optimizing after this many
+            seconds.
+
+        kwargs (dict or None): Passed on to `optimize`.
+
+    Returns:
+        (dict): The JSON-serializable result.
+    """
+
+    circuit, target = _load_problem( path, index )
+
+    if target is None:
+        return { "index": index, "error": "Problem has no target." }
+
+    result = solve( circuit, target, time_limit, kwargs )[1]
+    result[ "index" ] = index
+    return result
+
+
+def solve ( circuit, target, time_limit = None, kwargs = None ):
+    """
+    Optimizes a circuit under a time limit and reports on the run.
+
+    Args:
+        circuit (list[Gate]): The circuit to optimize.
+
+        target (np.ndarray): The target unitary matrix.
+
+        time_limit (float or None): Stop optimizing after this many
+            seconds.
+
+        kwargs (dict or None): Passed on to `optimize`.
+
+    Returns:
+        (tuple[list[Gate], dict]): The optimized circuit and a
+            JSON-serializable result.
+    """
+
+    iterations = 0
+    start = time.time()
+
+    def callback ( it, c1 ):
+        nonlocal iterations
+        iterations = it
+        return time_limit is not None and time.time() - start > time_limit
+
+    circuit = optimize( circuit, target, callback = callback,
+                        **( kwargs or {} ) )
+
+    result = {}
+    result[ "time" ] = time.time() - start
+    result[ "iterations" ] = iterations
+    result[ "timed_out" ] = ( time_limit is not None
+                              and result[ "time" ] > time_limit )
+    result[ "distance" ] = get_distance( circuit, target )
+    result[ "params" ] = [ get_params( gate ) for gate in circuit ]
+    return circuit, result
+
+
+def get_params ( gate ):
+    """
+    Returns a gate's parameters in a JSON-serializable form.
+
+    Args:
+        gate (Gate): The gate.
+
+    Returns:
+        (float or list or None): The angle of a rotation gate, the
+            unitary of a general gate as nested [real, imag] pairs, or
+            None for gates without parameters.
+    """
+
+    if hasattr( gate, "theta" ):
+        return float( gate.theta )
+
+    if gate.fixed:
+        return None
+
+    utry = np.asarray( gate.utry )
+    return np.stack( [ utry.real, utry.imag ], axis = -1 ).tolist()
+
+
+def _get_parser ( ):
+    """Builds the command-line argument parser."""
+
+    parser = argparse.ArgumentParser( prog = "qfactor",
+                                      description = "Solve a batch of "
+                                      "circuit instantiation problems." )
+
+    parser.add_argument( "input", help = "Corpus directory or circuit file." )
+
+    parser.add_argument( "output", help = "JSON lines file to append to." )
+
+    parser.add_argument( "-j", "--workers", type = int, default = None,
+                         help = "Number of worker processes." )
+
+    parser.add_argument( "-t", "--time-limit", type = float, default = None,
+                         help = "Time limit per problem in seconds." )
+
+    parser.add_argument( "--dist-tol", type = float, default = 1e-10,
+                         help = "Distance threshold." )
+
+    parser.add_argument( "--max-iters", type = int, default = 100000,
+                         help = "Maximum number of iterations." )
+
+    parser.add_argument( "--min-iters", type = int, default = 0,
+                         help = "Minimum number of iterations." )
+
+    parser.add_argument( "-v", "--verbose", action = "store_true",
+                         help = "Log progress." )
+
+    return parser
+
+
+def _get_num_problems ( path ):
+    """Returns the number of problems in a corpus or circuit file."""
+    return len( CircuitCorpus( path ) ) if os.path.isdir( path ) else 1
+
+
+def _load_problem ( path, index ):
+    """Loads the circuit and target of one problem."""
+    global _corpus
+
+    if os.path.isdir( path ):
+        if _corpus is None or _corpus.directory != path:
+            _corpus = CircuitCorpus( path )
+        return _corpus[ index ][:2]
+
+    return load_circuit( path )[:2]
+
+
+def _read_done ( output ):
+    """
+    Reads the problem indices already in an output file.
+
+    A partial last line, left by a crash, is removed from the file.
+    """
+
+    done = set()
+
+    if not os.path.exists( output ):
+        return done
+
+    with open( output, "r+" ) as f:
+        offset = 0
+        for line in f:
+            if not line.endswith( "\n" ):
+                break
+            try:
+                done.add( json.loads( line )[ "index" ] )
+            except ( ValueError, KeyError ):
+                break
+            offset += len( line.encode() )
+        f.truncate( offset )
+
+    return done
+
+
+if __name__ == "__main__":
+    sys.exit( main() )
@@ -0,0 +1,336 @@
+"""
+This module implements a circuit tensor distributed over processes.
+
+A SlabCircuitTensor splits the 2^(2n) tensor of a CircuitTensor into
+slabs along its leading input (column) qubits and stores them in one
+block of `multiprocessing.shared_memory`, slab after slab. A pool of
+worker processes attaches to the block and works on the slabs in place,
+so a single large instantiation can use every core and all the memory
+bandwidth of a node.
+
+Gates applied on the right act on the output indices, which every slab
+holds in full, so each slab is updated independently. Gates applied on
+the left act on the input indices; when they touch the split qubits,
+the slabs that differ only in those qubits are exchanged and updated
+together by one worker. Environment matrices and traces are the sums of
+the partial traces of the slabs.
+"""
+
+import logging
+import itertools
+import weakref
+from functools import partial
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from qfactor import utils
+from qfactor.gates import Gate
+from qfactor.tensors import apply_matrix
+from qfactor.threads import make_executor, get_num_workers
+from qfactor.optimize import optimize
+
+
+logger = logging.getLogger( "qfactor" )
+
+
+# Shared memory blocks attached by this worker process, by name
+_blocks = {}
+
+
+class SlabCircuitTensor():
+    """A SlabCircuitTensor tracks a circuit as slabs in shared memory."""
+
+    def __init__ ( self, utry_target, gate_list, num_workers = None,
+                   num_slabs = None ):
+        """
+        SlabCircuitTensor Constructor
+
+        The tensor owns a worker pool and a shared memory block; call
+        `close` (or use a with block) to free them.
+
+        Args:
+            utry_target (np.ndarray): Unitary target matrix
+
+            gate_list (list[Gate]): The circuit's gate list.
+
+            num_workers (int or None): Number of worker processes. If
+                None, pick one with `qfactor.threads.get_num_workers`.
+
+            num_slabs (int or None): Number of slabs, a power of two of
+                at most the target's dimension. If None, use the
+                smallest power of two not below the number of workers.
+        """
+
+        if not utils.is_unitary( utry_target ):
+            raise TypeError( "Specified target matrix is not unitary." )
+
+        if not isinstance( gate_list, list ):
+            raise TypeError( "Gate list is not a list." )
+
+        if not all( [ isinstance( gate, Gate ) for gate in gate_list ] ):
+            raise TypeError( "Gate list contains non-gate objects." )
+
+        self.utry_target = utry_target
+        self.num_qubits = utils.get_num_qubits( self.utry_target )
+
+        if not all( [ utils.is_valid_location( gate.location, self.num_qubits )
+                      for gate in gate_list ] ):
+            raise ValueError( "Gate location mismatch with circuit tensor." )
+
+        if num_workers is None:
+            num_workers = get_num_workers( self.num_qubits )
+
+        if num_slabs is None:
+            num_slabs = 1
+            while num_slabs < num_workers:
+                num_slabs *= 2
+            num_slabs = min( num_slabs, 2 ** self.num_qubits )
+
+        if ( not isinstance( num_slabs, int ) or num_slabs <= 0
+             or num_slabs & ( num_slabs - 1 ) != 0
+             or num_slabs > 2 ** self.num_qubits ):
+            raise ValueError( "Number of slabs is not a valid power of two." )
+
+        self.gate_list = gate_list
+        self.executor = make_executor( self.num_qubits, num_workers )
+
+        # The leading input qubits index the slabs
+        self.num_split = num_slabs.bit_length() - 1
+        self.shape = ( [2] * self.num_split + [2] * self.num_qubits
+                       + [2] * ( self.num_qubits - self.num_split ) )
+        self.dtype = np.dtype( np.complex128 )
+
+        size = self.dtype.itemsize * 4 ** self.num_qubits
+        self.block = shared_memory.SharedMemory( create = True, size = size )
+        self.tensor = np.ndarray( self.shape, self.dtype, self.block.buf )
+        self._finalizer = weakref.finalize( self, _release, self.block,
+                                            self.executor )
+
+        logger.debug( f"Split tensor into {num_slabs} slabs." )
+        self.reinitialize()
+
+    def reinitialize ( self ):
+        """Reconstruct the circuit tensor."""
+        logger.debug( "Reinitializing SlabCircuitTensor" )
+
+        n, s = self.num_qubits, self.num_split
+        tensor = self.utry_target.conj().T.reshape( [2] * 2 * n )
+        perm = ( list( range( n, n + s ) ) + list( range( n ) )
+                 + list( range( n + s, 2 * n ) ) )
+        self.tensor[...] = tensor.transpose( perm )
+
+        for gate in self.gate_list:
+            self.apply_right( gate )
+
+    @property
+    def utry ( self ):
+        """Gathers this circuit tensor's unitary representation."""
+        n, s = self.num_qubits, self.num_split
+        perm = ( list( range( s, s + n ) ) + list( range( s ) )
+                 + list( range( s + n, 2 * n ) ) )
+        num_elems = 2 ** n
+        return self.tensor.transpose( perm ).reshape( ( num_elems,
+                                                        num_elems ) )
+
+    def calc_trace ( self ):
+        """Calculates the trace of this circuit tensor's unitary."""
+        return complex( self.calc_env_matrix( [] ).reshape( () ) )
+
+    def apply_right ( self, gate, inverse = False ):
+        """
+        Apply the specified gate on the right of the circuit.
+
+        Every slab holds all output indices and is updated on its own.
+
+        Args:
+            gate (Gate): The gate to apply.
+
+            inverse (bool): If true, apply the inverse of gate.
+        """
+
+        utry = gate.inverse_utry if inverse else gate.utry
+        axes = [ self.num_split + x for x in gate.location ]
+        self._map_groups( utry, axes, [] )
+
+    def apply_left ( self, gate, inverse = False ):
+        """
+        Apply the specified gate on the left of the circuit.
+
+        Slabs differing only in split qubits the gate acts on are
+        updated together.
+
+        Args:
+            gate (Gate): The gate to apply.
+
+            inverse (bool): If true, apply the inverse of gate.
+        """
+
+        utry = gate.inverse_utry if inverse else gate.utry
+        n, s = self.num_qubits, self.num_split
+        axes = [ x if x < s else n + x for x in gate.location ]
+        exchanged = [ x for x in gate.location if x < s ]
+
+        # Multiplying on the right contracts the matrix's row index
+        self._map_groups( utry.T, axes, exchanged )
+
+    def calc_env_matrix ( self, location ):
+        """
+        Calculates the environmental matrix of the tensor with
+        respect to the specified location.
+
+        Args:
+            location (iterable): Calculate the environment for this
+                set of qubits.
+
+        Returns:
+            (np.ndarray): The environmental matrix.
+        """
+
+        location = list( location )
+
+        if not all( 0 <= x < self.num_qubits for x in location ):
+            raise ValueError( "Invalid location for the tensor." )
+
+        size = 2 ** len( location )
+        slabs = itertools.product( range( 2 ), repeat = self.num_split )
+        task = partial( _calc_slab_env, self._get_spec(), self.num_qubits,
+                        location )
+        env = sum( self.executor.map( task, slabs ) )
+        return env.reshape( ( size, size ) )
+
+    def close ( self ):
+        """Stops the workers and frees the shared memory."""
+        self.tensor = None
+        self._finalizer()
+
+    def _map_groups ( self, matrix, axes, exchanged ):
+        """
+        Contracts a matrix into the tensor on the workers.
+
+        Args:
+            matrix (np.ndarray): The matrix to contract.
+
+            axes (list[int]): The tensor indices to contract with.
+
+            exchanged (list[int]): The split qubits among the indices;
+                the slabs differing only in them form one group.
+        """
+
+        others = [ x for x in range( self.num_split ) if x not in exchanged ]
+        groups = itertools.product( range( 2 ), repeat = len( others ) )
+        task = partial( _apply_group, self._get_spec(), matrix, axes, others )
+        list( self.executor.map( task, groups ) )
+
+    def _get_spec ( self ):
+        """Returns what a worker needs to attach to the tensor."""
+        return ( self.block.name, tuple( self.shape ), self.dtype.str )
+
+    def __enter__ ( self ):
+        return self
+
+    def __exit__ ( self, *args ):
+        self.close()
+
+
+def optimize_distributed ( circuit, target, num_workers = None,
+                           num_slabs = None, **kwargs ):
+    """
+    Optimize a circuit with a SlabCircuitTensor.
+
+    Args:
+        circuit (list[Gate]): The circuit to optimize.
+
+        target (np.ndarray): The target unitary matrix.
+
+        num_workers (int or None): Number of worker processes.
+
+        num_slabs (int or None): Number of slabs.
+
+        kwargs (dict): Passed on to `optimize`.
+
+    Returns:
+        (list[Gate]): The optimized circuit.
+    """
+
+    tensors = []
+
+    def factory ( utry_target, gate_list ):
+        tensors.append( SlabCircuitTensor( utry_target, gate_list,
+                                           num_workers, num_slabs ) )
+        return tensors[-1]
+
+    try:
+        return optimize( circuit, target, tensor_factory = factory, **kwargs )
+    finally:
+        for ct in tensors:
+            ct.close()
+
+
+def _release ( block, executor ):
+    """Stops a tensor's workers and frees its shared memory."""
+    executor.shutdown()
+    block.close()
+    block.unlink()
+
+
+def _attach ( spec ):
+    """Returns a view of a shared tensor; runs in a worker process."""
+    name, shape, dtype = spec
+
+    if name not in _blocks:
+        _blocks[ name ] = shared_memory.SharedMemory( name = name )
+
+    return np.ndarray( shape, np.dtype( dtype ), _blocks[ name ].buf )
+
+
+def _apply_group ( spec, matrix, axes, others, bits ):
+    """Contracts a matrix into one group of slabs; runs in a worker."""
+    tensor = _attach( spec )
+    key = [ slice( None ) ] * tensor.ndim
+    for x, b in zip( others, bits ):
+        key[x] = b
+    key = tuple( key )
+
+    sub_axes = [ x - sum( y < x for y in others ) for x in axes ]
+    tensor[ key ] = apply_matrix( tensor[ key ], matrix, sub_axes )
+
+
+def _calc_slab_env ( spec, num_qubits, location, bits ):
+    """
+    Calculates one slab's share of an environment; runs in a worker.
+
+    The slab's split input qubits are fixed to bits. Traced split qubits
+    select the matching output index; split qubits in the location
+    place the slab's share in the matching environment columns.
+
+    Returns:
+        (np.ndarray): The share, with one index per location qubit for
+            the outputs, then the inputs.
+    """
+
+    tensor = _attach( spec )
+    n, s = num_qubits, len( bits )
+    slab = tensor[ tuple( bits ) ]
+
+    # Output indices are 0..n-1 and input indices n..2n-1 in subscripts
+    operand = list( range( n ) ) + list( range( n + s, 2 * n ) )
+    key = [ slice( None ) ] * slab.ndim
+    for x in range( n ):
+        if x not in location:
+            if x < s:
+                key[x] = bits[x]
+            else:
+                operand[ n + x - s ] = x
+
+    operand = [ y for x, y in zip( key, operand ) if isinstance( x, slice ) ]
+    slab = slab[ tuple( key ) ]
+
+    free = [ x + n for x in location if x >= s ]
+    share = np.einsum( slab, operand, location + free )
+
+    env = np.zeros( [2] * 2 * len( location ), slab.dtype )
+    key = [ slice( None ) ] * len( location )
+    key += [ bits[x] if x < s else slice( None ) for x in location ]
+    env[ tuple( key ) ] = share
+    return env
@@ -7,9 +7,19 @@ from qfactor import utils
 from qfactor.gates import Gate
 
 
+# Shared by every CnotGate, so it must never be modified
+CNOT_UTRY = np.array( [ [ 1, 0, 0, 0 ],
+                        [ 0, 1, 0, 0 ],
+                        [ 0, 0, 0, 1 ],
+                        [ 0, 0, 1, 0 ] ], dtype = np.complex128 )
+CNOT_UTRY.flags.writeable = False
+
+
 class CnotGate ( Gate ):
     """A CnotGate is a controlled-not applied to a pair of qubit."""
 
+    __slots__ = ()
+
     def __init__ ( self, control, target, check_params = True ):
         """
         Gate Constructor
@@ -30,10 +40,9 @@ class CnotGate ( Gate ):
             if not isinstance( target, int ) or target < 0:
                 raise TypeError( "Invalid target qubit." )
 
-        self.utry = np.array( [ [ 1, 0, 0, 0 ],
-                                [ 0, 1, 0, 0 ],
-                                [ 0, 0, 0, 1 ],
-                                [ 0, 0, 1, 0 ] ] )
+        # The CNOT is its own inverse
+        self._utry = CNOT_UTRY
+        self._inverse = CNOT_UTRY
         self.location = tuple( [ control, target ] )
         self.gate_size = 2
         self.fixed = True
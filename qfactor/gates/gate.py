@@ -10,6 +10,8 @@ from qfactor import utils
 class Gate():
     """A Gate is a unitary operation applied to a set of qubits."""
 
+    __slots__ = ( "_utry", "_inverse", "location", "gate_size", "fixed" )
+
     def __init__ ( self, utry, location, fixed = False, check_params = True ):
         """
         Gate Constructor
@@ -43,9 +45,76 @@ class Gate():
         self.gate_size = len( location )
         self.fixed = fixed
 
+    @staticmethod
+    def from_stack ( utrys, locations, fixed = False, check_params = True ):
+        """
+        Builds one gate per unitary in a stack.
+
+        All parameters are checked in one vectorized pass instead of
+        once per gate.
+
+        Args:
+            utrys (np.ndarray): The (N, d, d) stack of unitaries.
+
+            locations (np.ndarray or list[tuple[int]]): The N gate
+                locations, each of size log2( d ).
+
+            fixed (bool): True if the gates' unitaries are immutable.
+
+            check_params (bool): True implies parameters are checked for
+                correctness.
+
+        Returns:
+            (list[Gate]): The gates, in stack order.
+        """
+
+        locations = np.asarray( locations )
+
+        if check_params:
+            if not np.all( utils.is_unitary_stack( utrys ) ):
+                raise TypeError( "Specified matrix is not unitary." )
+
+            if not np.issubdtype( locations.dtype, np.integer ):
+                raise TypeError( "Specified location is not valid." )
+
+            if locations.ndim != 2 or len( locations ) != len( utrys ):
+                raise TypeError( "Specified location is not valid." )
+
+            if np.any( locations < 0 ):
+                raise TypeError( "Specified location is not valid." )
+
+            if np.any( np.diff( locations, axis = 1 ) <= 0 ):
+                raise TypeError( "Specified location is not valid." )
+
+            if 2 ** locations.shape[1] != utrys.shape[1]:
+                raise ValueError( "Location size does not match unitary." )
+
+            if not isinstance( fixed, bool ):
+                raise TypeError( "Invalid fixed parameter." )
+
+        return [ Gate( utry, tuple( location.tolist() ), fixed, False )
+                 for utry, location in zip( utrys, locations ) ]
+
+    @property
+    def utry ( self ):
+        """The gate's unitary operation."""
+        return self._utry
+
+    @utry.setter
+    def utry ( self, utry ):
+        self._utry = utry
+        self._inverse = None
+
+    @property
+    def inverse_utry ( self ):
+        """The inverse of the gate's unitary, cached until it changes."""
+        if self._inverse is None:
+            self._inverse = self.utry.conj().T
+        return self._inverse
+
     def get_inverse ( self ):
         """Returns the inverse of this gate."""
-        return Gate( self.utry.conj().T, self.location, self.fixed, False )
+        return Gate( self.inverse_utry, self.location, self.fixed, False )
 
     def update ( self, env, slowdown_factor ):
         """
@@ -65,6 +134,15 @@ class Gate():
                           + slowdown_factor * self.utry.conj().T )
         self.utry = v.conj().T @ u.conj().T
 
+    def is_real ( self ):
+        """Returns true if this gate's unitary is real and stays real."""
+        return not np.iscomplexobj( self.utry ) or not np.any( self.utry.imag )
+
+    def is_diagonal ( self ):
+        """Returns true if this gate's unitary is diagonal and stays so."""
+        utry = self.utry
+        return self.fixed and not np.any( utry - np.diag( np.diag( utry ) ) )
+
     def get_tensor_format ( self, compress_left = False,
                             compress_right = False ):
         """
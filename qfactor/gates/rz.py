@@ -10,6 +10,8 @@ from qfactor.gates import Gate
 class RzGate ( Gate ):
     """A RzGate is a Quantum Z-rotation applied to a qubit."""
 
+    __slots__ = ( "_theta", )
+
     def __init__ ( self, theta, location, fixed = False, check_params = True ):
         """
         Gate Constructor
@@ -47,10 +49,27 @@ class RzGate ( Gate ):
         self.gate_size = len( self.location )
         self.fixed = fixed
 
+    @property
+    def theta ( self ):
+        """The gate's angle of rotation."""
+        return self._theta
+
+    @theta.setter
+    def theta ( self, theta ):
+        self._theta = theta
+        self._utry = None
+        self._inverse = None
+
     @property
     def utry ( self ):
-        return np.array( [ [ 1, 0 ],
-                           [ 0, np.exp( 1j * self.theta ) ] ] )
+        """The gate's unitary operation, cached until theta changes."""
+        if self._utry is not None:
+            return self._utry
+
+        self._utry = np.array( [ [ 1, 0 ],
+                                 [ 0, np.exp( 1j * self.theta ) ] ] )
+        self._utry.flags.writeable = False
+        return self._utry
 
     def update ( self, env, slowdown_factor ):
         """
@@ -82,6 +101,14 @@ class RzGate ( Gate ):
         self.theta = ( ( 1 - slowdown_factor ) * new_theta
                        + slowdown_factor * self.theta )
 
+    def is_real ( self ):
+        """Returns true if this gate's unitary is real and stays real."""
+        return self.fixed and super().is_real()
+
+    def is_diagonal ( self ):
+        """Returns true if this gate's unitary is diagonal and stays so."""
+        return True
+
     def __repr__ ( self ):
         """Gets a simple gate string representation."""
 
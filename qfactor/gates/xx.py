@@ -10,6 +10,8 @@ from qfactor.gates import Gate
 class XXGate ( Gate ):
     """A XXGate is a Quantum XX-rotation applied to a qubit."""
 
+    __slots__ = ( "_theta", )
+
     def __init__ ( self, theta, location, fixed = False, check_params = True ):
         """
         Gate Constructor
@@ -46,14 +48,31 @@ class XXGate ( Gate ):
         self.gate_size = len( self.location )
         self.fixed = fixed
 
+    @property
+    def theta ( self ):
+        """The gate's angle of rotation."""
+        return self._theta
+
+    @theta.setter
+    def theta ( self, theta ):
+        self._theta = theta
+        self._utry = None
+        self._inverse = None
+
     @property
     def utry ( self ):
+        """The gate's unitary operation, cached until theta changes."""
+        if self._utry is not None:
+            return self._utry
+
         cos = np.cos( self.theta / 2 )
         isin = -1j * np.sin( self.theta / 2 )
-        return np.array( [ [ cos, 0, 0, isin ],
-                           [ 0, cos, isin, 0 ],
-                           [ 0, isin, cos, 0 ],
-                           [ isin, 0, 0, cos ] ] )
+        self._utry = np.array( [ [ cos, 0, 0, isin ],
+                                 [ 0, cos, isin, 0 ],
+                                 [ 0, isin, cos, 0 ],
+                                 [ isin, 0, 0, cos ] ] )
+        self._utry.flags.writeable = False
+        return self._utry
 
     def update ( self, env, slowdown_factor ):
         """
@@ -79,6 +98,10 @@ class XXGate ( Gate ):
         self.theta = ( ( 1 - slowdown_factor ) * new_theta
                        + slowdown_factor * self.theta )
 
+    def is_real ( self ):
+        """Returns true if this gate's unitary is real and stays real."""
+        return self.fixed and super().is_real()
+
     def __repr__ ( self ):
         """Gets a simple gate string representation."""
 
@@ -0,0 +1,267 @@
+"""
+This module implements the MPOCircuitTensor class.
+
+An MPOCircuitTensor stores the same operator as a CircuitTensor, but as a
+matrix product operator: one site tensor per qubit, holding that qubit's
+output and input index, joined by bond indices. Gates are applied by
+contracting neighbouring sites and splitting them back with truncated
+SVDs; gates on distant qubits are first brought together with swaps.
+Memory and time grow polynomially in the number of qubits for operators
+with low entanglement across the chain.
+"""
+
+import logging
+
+import numpy as np
+
+from qfactor import utils
+from qfactor.tensors import CircuitTensor, apply_matrix
+
+
+logger = logging.getLogger( "qfactor" )
+
+
+class MPOCircuitTensor ( CircuitTensor ):
+    """A MPOCircuitTensor tracks a circuit as a matrix product operator."""
+
+    def __init__ ( self, utry_target, gate_list, max_bond = None,
+                   cutoff = 1e-12 ):
+        """
+        MPOCircuitTensor Constructor
+
+        Args:
+            utry_target (np.ndarray or list[Gate]): Unitary target
+                matrix, or a circuit implementing it. A circuit's gates
+                are applied to an identity operator, which never forms
+                the target's matrix.
+
+            gate_list (list[Gate]): The circuit's gate list.
+
+            max_bond (int or None): The maximum bond dimension kept
+                after a split. If None, bonds are not capped.
+
+            cutoff (float): Singular values smaller than this fraction
+                of the largest one are discarded when splitting.
+        """
+
+        if max_bond is not None:
+            if not isinstance( max_bond, int ) or max_bond <= 0:
+                raise TypeError( "Invalid maximum bond dimension." )
+
+        if not isinstance( cutoff, float ) or cutoff < 0:
+            raise TypeError( "Invalid singular value cutoff." )
+
+        self.max_bond = max_bond
+        self.cutoff = cutoff
+        super().__init__( utry_target, gate_list )
+
+    def reinitialize ( self ):
+        """Reconstruct the circuit tensor."""
+        logger.debug( "Reinitializing MPOCircuitTensor" )
+
+        n = self.num_qubits
+
+        if isinstance( self.utry_target, list ):
+            site = np.identity( 2 ).reshape( ( 1, 2, 2, 1 ) )
+            self.sites = [ site ] * n
+            for gate in self.utry_target:
+                self.apply_left( gate, inverse = True )
+
+        else:
+            tensor = self.utry_target.conj().T.reshape( [2] * 2 * n )
+            perm = [ x for q in range( n ) for x in ( q, q + n ) ]
+            tensor = tensor.transpose( perm )
+            tensor = tensor.reshape( [1] + [2] * 2 * n + [1] )
+
+            self.sites = [ None ] * n
+            self._split( tensor, 0, n )
+
+        for gate in self.gate_list:
+            self.apply_right( gate )
+
+    @property
+    def bond_dims ( self ):
+        """The bond dimensions between neighbouring sites."""
+        return [ site.shape[3] for site in self.sites[:-1] ]
+
+    @property
+    def utry ( self ):
+        """Calculates this circuit tensor's unitary representation."""
+        tensor = self._merge( 0, self.num_qubits )
+        tensor = tensor.reshape( [2] * 2 * self.num_qubits )
+        perm = list( range( 0, 2 * self.num_qubits, 2 ) )
+        perm += list( range( 1, 2 * self.num_qubits, 2 ) )
+        num_elems = 2 ** self.num_qubits
+        return tensor.transpose( perm ).reshape( ( num_elems, num_elems ) )
+
+    def calc_trace ( self ):
+        """Calculates the trace of this circuit tensor's unitary."""
+        return self._contract_traced( [] )[0, 0]
+
+    def apply_right ( self, gate, inverse = False ):
+        """
+        Apply the specified gate on the right of the circuit.
+
+        This contracts the gate into the output indices of its sites.
+
+        Args:
+            gate (Gate): The gate to apply.
+
+            inverse (bool): If true, apply the inverse of gate.
+        """
+
+        utry = gate.inverse_utry if inverse else gate.utry
+        self._apply_local( utry, gate.location, 1 )
+
+    def apply_left ( self, gate, inverse = False ):
+        """
+        Apply the specified gate on the left of the circuit.
+
+        This contracts the gate into the input indices of its sites.
+
+        Args:
+            gate (Gate): The gate to apply.
+
+            inverse (bool): If true, apply the inverse of gate.
+        """
+
+        utry = gate.inverse_utry.T if inverse else gate.utry.T
+        self._apply_local( utry, gate.location, 2 )
+
+    def calc_env_matrix ( self, location ):
+        """
+        Calculates the environmental matrix of the tensor with
+        respect to the specified location.
+
+        Every other site is traced out along the chain.
+
+        Args:
+            location (iterable): Calculate the environment for this
+                set of qubits.
+
+        Returns:
+            (np.ndarray): The environmental matrix.
+        """
+
+        location = list( location )
+
+        if not all( [ isinstance( q, int ) for q in location ] ):
+            raise TypeError( "Invalid location." )
+
+        if not utils.is_valid_location( tuple( location ), self.num_qubits ):
+            raise ValueError( "Invalid location." )
+
+        return self._contract_traced( location )
+
+    def _apply_local ( self, utry, location, offset ):
+        """
+        Contracts utry into one kind of index of the location's sites.
+
+        Args:
+            utry (np.ndarray): The matrix to contract.
+
+            location (tuple[int]): The qubits the matrix acts on.
+
+            offset (int): 1 for output indices or 2 for input indices.
+        """
+
+        start = location[0]
+        size = len( location )
+
+        # Swap the location's sites next to each other
+        for j in range( 1, size ):
+            self._move( location[j], start + j )
+
+        tensor = self._merge( start, size )
+        axes = [ 2 * j + offset for j in range( size ) ]
+        tensor = apply_matrix( tensor, utry, axes )
+        self._split( tensor, start, size )
+
+        # Swap them back in reverse
+        for j in reversed( range( 1, size ) ):
+            self._move( start + j, location[j] )
+
+    def _move ( self, src, dst ):
+        """Moves the site at src to dst with neighbouring swaps."""
+
+        while src > dst:
+            self._swap( src - 1 )
+            src -= 1
+
+        while src < dst:
+            self._swap( src )
+            src += 1
+
+    def _swap ( self, pos ):
+        """Swaps the sites at pos and pos + 1."""
+
+        tensor = self._merge( pos, 2 )
+        tensor = tensor.transpose( ( 0, 3, 4, 1, 2, 5 ) )
+        self._split( tensor, pos, 2 )
+
+    def _merge ( self, start, size ):
+        """
+        Contracts `size` sites starting at `start` into one tensor.
+
+        Returns:
+            (np.ndarray): Tensor indexed by the left bond, then output
+                and input indices of each site, then the right bond.
+        """
+
+        tensor = self.sites[ start ]
+        for site in self.sites[ start + 1 : start + size ]:
+            tensor = np.tensordot( tensor, site, axes = ( [ -1 ], [ 0 ] ) )
+        return tensor
+
+    def _split ( self, tensor, start, size ):
+        """Splits a tensor from `_merge` back into truncated sites."""
+
+        left_bond = tensor.shape[0]
+        right_bond = tensor.shape[-1]
+        rest = tensor
+
+        for j in range( size - 1 ):
+            rest = rest.reshape( ( left_bond * 4, -1 ) )
+            u, s, vh = np.linalg.svd( rest, full_matrices = False )
+            bond = self._get_bond( s )
+            self.sites[ start + j ] = u[:, :bond].reshape( ( left_bond, 2,
+                                                             2, bond ) )
+            rest = s[:bond, None] * vh[:bond]
+            left_bond = bond
+
+        self.sites[ start + size - 1 ] = rest.reshape( ( left_bond, 2, 2,
+                                                         right_bond ) )
+
+    def _get_bond ( self, s ):
+        """Returns the number of singular values to keep."""
+
+        if len( s ) == 0 or s[0] == 0:
+            return 1
+
+        bond = int( np.count_nonzero( s > self.cutoff * s[0] ) )
+        if self.max_bond is not None:
+            bond = min( bond, self.max_bond )
+        return max( bond, 1 )
+
+    def _contract_traced ( self, location ):
+        """
+        Contracts the chain, tracing out every site not in location.
+
+        Returns:
+            (np.ndarray): Matrix indexed by the location's output
+                indices, then its input indices.
+        """
+
+        tensor = np.ones( ( 1, ) )
+
+        for q, site in enumerate( self.sites ):
+            if q in location:
+                tensor = np.tensordot( tensor, site, axes = ( [ -1 ], [ 0 ] ) )
+            else:
+                site = np.trace( site, axis1 = 1, axis2 = 2 )
+                tensor = tensor @ site
+
+        size = len( location )
+        tensor = tensor.reshape( [2] * 2 * size )
+        perm = list( range( 0, 2 * size, 2 ) ) + list( range( 1, 2 * size, 2 ) )
+        return tensor.transpose( perm ).reshape( ( 2 ** size, 2 ** size ) )
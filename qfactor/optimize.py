@@ -6,22 +6,39 @@ import numpy as np
 
 from qfactor import utils
 from qfactor.gates import Gate
+from qfactor.circuit import CircuitArray
 from qfactor.tensors import CircuitTensor
+from qfactor.simulate import estimate_distance
+from qfactor.reorder import get_sweep_order
 
 
 logger = logging.getLogger( "qfactor" )
 
 
+# Mixed precision sweeps switch to double precision below this distance
+SINGLE_DIST_TOL = 1e-6
+
+# Iterations between reinitializations, by the active precision
+REINIT_PERIODS = { "single": 10, "double": 40 }
+
+
 def optimize ( circuit, target, diff_tol_a = 1e-12, diff_tol_r = 1e-6,
                dist_tol = 1e-10, max_iters = 100000, min_iters = 1000,
-               slowdown_factor = 0.0 ):
+               slowdown_factor = 0.0, tensor_factory = None, real = False,
+               precision = "double", callback = None, executor = None,
+               reorder = False ):
     """
     Optimize distance between circuit and target unitary.
 
     Args:
-        circuit (list[Gate]): The circuit to optimize.
+        circuit (list[Gate] or CircuitArray): The circuit to optimize.
+            A CircuitArray is swept through views of its gates and
+            updated in place.
 
-        target (np.ndarray): The target unitary matrix.
+        target (np.ndarray or list[Gate]): The target unitary matrix,
+            or a circuit implementing it. A target circuit's gates are
+            applied directly, without forming its matrix. Other tensor
+            backends may accept other target formats.
 
         diff_tol_a (float): Terminate when the difference in distance
             between iterations is less than this threshold.
@@ -40,17 +57,51 @@ def optimize ( circuit, target, diff_tol_a = 1e-12, diff_tol_r = 1e-6,
         slowdown_factor (float): A positive number less than 1. 
             The larger this factor, the slower the optimization.
 
+        tensor_factory (callable or None): Builds the circuit tensor
+            as tensor_factory( target, circuit ). Defaults to the dense
+            CircuitTensor. Other backends, such as MPOCircuitTensor,
+            can be selected with functools.partial.
+
+        real (bool): If true, run in real arithmetic, which requires
+            a real target and gates that stay real, such as RyGate,
+            CnotGate or real fixed gates. Gates given complex unitaries
+            are returned complex.
+
+        precision (str): Either "double" or "mixed". Mixed precision
+            sweeps in single precision until the distance plateaus or
+            drops below SINGLE_DIST_TOL, then promotes the CircuitTensor
+            to double precision to approach dist_tol.
+
+        callback (callable or None): Called after every iteration as
+            callback( it, c1 ) with the iteration count and distance.
+            The optimization stops early if it returns true.
+
+        executor (Executor or None): A thread pool, such as a
+            ThreadPoolExecutor, that the dense CircuitTensor splits its
+            contractions across. Pays off from about 7 qubits.
+
+        reorder (bool): If true, sweep the gates in the order of
+            `qfactor.reorder.get_sweep_order`, which groups gates on
+            the same qubits. The returned list keeps the caller's order.
+
     Returns:
-        (list[Gate]): The optimized circuit.
+        (list[Gate] or CircuitArray): The optimized circuit.
     """
 
+    result = circuit
+
+    if isinstance( circuit, CircuitArray ):
+        circuit = circuit.get_gates()
+
     if not isinstance( circuit, list ):
         raise TypeError( "The circuit argument is not a list of gates." )
 
     if not all( [ isinstance( g, Gate ) for g in circuit ] ):
         raise TypeError( "The circuit argument is not a list of gates." )
 
-    if not utils.is_unitary( target ):
+    # Other tensor backends and target circuits are validated later
+    if ( tensor_factory is None and not isinstance( target, list )
+         and not utils.is_unitary( target ) ):
         raise TypeError( "The target matrix is not unitary." )
 
     if not isinstance( diff_tol_a, float ) or diff_tol_a > 0.5:
@@ -71,7 +122,56 @@ def optimize ( circuit, target, diff_tol_a = 1e-12, diff_tol_r = 1e-6,
     if slowdown_factor < 0 or slowdown_factor >= 1:
         raise TypeError( "Slowdown factor is a positive number less than 1." )
 
-    ct = CircuitTensor( target, circuit )
+    if precision not in ( "double", "mixed" ):
+        raise ValueError( "Invalid precision, expected double or mixed." )
+
+    if precision == "mixed" and tensor_factory is not None:
+        raise ValueError( "Mixed precision requires the CircuitTensor." )
+
+    if executor is not None and tensor_factory is not None:
+        raise ValueError( "An executor requires the CircuitTensor." )
+
+    if not isinstance( real, bool ):
+        raise TypeError( "Invalid real parameter." )
+
+    if real:
+        if tensor_factory is not None:
+            raise ValueError( "Real arithmetic requires the CircuitTensor." )
+
+        if not _is_real_problem( circuit, target ):
+            raise ValueError( "The circuit or target is not real." )
+
+    dtype = None
+    dtypes = [ gate.utry.dtype for gate in circuit ]
+
+    if real:
+        logger.info( "Running in real arithmetic." )
+        if not isinstance( target, list ):
+            target = np.real( target )
+        # Angles set parameterized gates, whose unitaries the tensor casts
+        for gate in circuit:
+            if ( not gate.fixed and not hasattr( gate, "theta" )
+                 and np.iscomplexobj( gate.utry ) ):
+                gate.utry = np.real( gate.utry )
+        dtype = np.float64
+
+    single = precision == "mixed"
+
+    if single:
+        logger.info( "Running in single precision." )
+        double_dtype = np.float64 if real else np.complex128
+        dtype = np.float32 if real else np.complex64
+
+    # The sweep shares the caller's gates, in place, in its own order
+    if reorder:
+        sweep_circuit = [ circuit[i] for i in get_sweep_order( circuit ) ]
+    else:
+        sweep_circuit = circuit
+
+    if tensor_factory is None:
+        ct = CircuitTensor( target, sweep_circuit, dtype, executor )
+    else:
+        ct = tensor_factory( target, sweep_circuit )
 
     c1 = 0
     c2 = 1
@@ -94,66 +194,149 @@ def optimize ( circuit, target, diff_tol_a = 1e-12, diff_tol_r = 1e-6,
 
         it += 1
 
-        # from right to left
-        for k in range( len( circuit ) ):
-            rk = len( circuit ) - 1 - k
-
-            # Remove current gate from right of circuit tensor
-            ct.apply_right( circuit[rk], inverse = True )
-
-            # Update current gate
-            if not circuit[rk].fixed:
-                env = ct.calc_env_matrix( circuit[rk].location )
-                circuit[rk].update( env, slowdown_factor )
-
-            # Add updated gate to left of circuit tensor
-            ct.apply_left( circuit[rk] )
-
-        # from left to right
-        for k in range( len( circuit ) ):
-
-            # Remove current gate from left of circuit tensor
-            ct.apply_left( circuit[k], inverse = True )
-
-            # Update current gate
-            if not circuit[k].fixed:
-                env = ct.calc_env_matrix( circuit[k].location )
-                circuit[k].update( env, slowdown_factor )
-
-            # Add updated gate to right of circuit tensor
-            ct.apply_right( circuit[k] )
+        _sweep( ct, sweep_circuit, slowdown_factor )
 
         c2 = c1
-        c1 = np.abs( np.trace( ct.utry ) )
+        c1 = np.abs( ct.calc_trace() )
         c1 = 1 - ( c1 / ( 2 ** ct.num_qubits ) )
 
+        if single and ( c1 <= SINGLE_DIST_TOL or np.abs(c1 - c2)
+                        <= diff_tol_a + diff_tol_r * np.abs( c1 ) ):
+            logger.info( f"Promoting to double precision, cost: {c1}" )
+            single = False
+            ct.dtype = double_dtype
+            ct.reinitialize()
+            c1 = 1 - ( np.abs( ct.calc_trace() ) / ( 2 ** ct.num_qubits ) )
+            c2 = 1
+
+        if callback is not None and callback( it, c1 ):
+            logger.info( "Terminated: stopped by callback." )
+            break
+
         if c1 <= dist_tol:
             logger.info( f"Terminated: c1 = {c1} <= dist_tol." )
-            return circuit
+            break
 
         if it % 100 == 0:
             logger.info( f"iteration: {it}, cost: {c1}" )
 
-        if it % 40 == 0:
+        if it % REINIT_PERIODS[ "single" if single else "double" ] == 0:
             ct.reinitialize()
 
-    return circuit
+    _restore_dtypes( circuit, dtypes )
+    return result
+
+
+def _sweep ( ct, circuit, slowdown_factor, start = 0, end = None ):
+    """
+    Perform one right-to-left and one left-to-right update sweep.
+
+    Only the gates in circuit[start:end] are updated. The circuit tensor
+    must hold every gate before `end` on its right and every gate from
+    `end` onward wrapped around on its left; a tensor constructed from
+    the whole circuit satisfies this for the default range.
 
+    Args:
+        ct (CircuitTensor): The circuit tensor, left in the same
+            arrangement on return.
 
-def get_distance ( circuit, target ):
+        circuit (list[Gate]): The circuit being optimized.
+
+        slowdown_factor (float): A positive number less than 1. 
+            The larger this factor, the slower the optimization.
+
+        start (int): Index of the first gate to update.
+
+        end (int or None): One past the index of the last gate to
+            update. If None, sweep to the end of the circuit.
+    """
+
+    if end is None:
+        end = len( circuit )
+
+    # from right to left
+    for rk in range( end - 1, start - 1, -1 ):
+
+        # Remove current gate from right of circuit tensor
+        ct.apply_right( circuit[rk], inverse = True )
+
+        # Update current gate
+        if not circuit[rk].fixed:
+            env = ct.calc_env_matrix( circuit[rk].location )
+            circuit[rk].update( env, slowdown_factor )
+
+        # Add updated gate to left of circuit tensor
+        ct.apply_left( circuit[rk] )
+
+    # from left to right
+    for k in range( start, end ):
+
+        # Remove current gate from left of circuit tensor
+        ct.apply_left( circuit[k], inverse = True )
+
+        # Update current gate
+        if not circuit[k].fixed:
+            env = ct.calc_env_matrix( circuit[k].location )
+            circuit[k].update( env, slowdown_factor )
+
+        # Add updated gate to right of circuit tensor
+        ct.apply_right( circuit[k] )
+
+
+def _restore_dtypes ( circuit, dtypes ):
+    """
+    Casts the updated gates back up to their given dtypes.
+
+    Single precision sweeps leave single precision angles and unitaries
+    behind when they stop before promotion.
+    """
+
+    for gate, dtype in zip( circuit, dtypes ):
+        if hasattr( gate, "theta" ):
+            if not gate.fixed:
+                gate.theta = float( gate.theta )
+            continue
+
+        dtype = np.promote_types( gate.utry.dtype, dtype )
+        if not gate.fixed and gate.utry.dtype != dtype:
+            gate.utry = gate.utry.astype( dtype )
+
+
+def _is_real_problem ( circuit, target ):
+    """Returns true if the target and the circuit's gates are real."""
+
+    if isinstance( target, list ):
+        return all( [ gate.is_real() for gate in target + circuit ] )
+
+    if np.iscomplexobj( target ) and np.any( target.imag ):
+        return False
+
+    return all( [ gate.is_real() for gate in circuit ] )
+
+
+def get_distance ( circuit, target, tol = None, **kwargs ):
     """
     Returns the distance between the circuit and the unitary target.
 
     Args:
         circuit (list[Gate]): The circuit.
 
-        target (np.ndarray): The unitary target.
+        target (np.ndarray or list[Gate]): The unitary target, or a
+            circuit implementing it.
+
+        tol (float or None): If given, estimate the distance from
+            random probe states to within tol instead of forming the
+            circuit tensor, see `qfactor.simulate.estimate_distance`.
+
+        kwargs (dict): Passed on to `estimate_distance` with tol.
     
     Returns:
         (float): The distance between the circuit and unitary target.
     """
 
+    if tol is not None:
+        return estimate_distance( circuit, target, tol, **kwargs )[0]
+
     ct = CircuitTensor( target, circuit )
-    num_qubits = utils.get_num_qubits( target )
-    return 1 - ( np.abs( np.trace( ct.utry ) ) / ( 2 ** num_qubits ) )
+    return 1 - ( np.abs( ct.calc_trace() ) / ( 2 ** ct.num_qubits ) )
 
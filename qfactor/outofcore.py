@@ -0,0 +1,256 @@
+"""
+This module implements an out-of-core, memory-capped circuit tensor.
+
+A MemmapCircuitTensor keeps the 4^n entries of a CircuitTensor in an
+`np.memmap` scratch file on local disk instead of in memory. Every gate
+application and environment calculation streams over the file in
+blocks sized from a user-set memory limit, so the resident memory of
+an optimization stays near that limit whatever the problem size. The
+file's pages are cached by the operating system, but they are clean or
+written back, so they can be reclaimed under memory pressure instead of
+killing the process. This trades speed for predictable memory use.
+"""
+
+import logging
+import tempfile
+
+import numpy as np
+
+from qfactor import utils
+from qfactor.tensors import CircuitTensor
+from qfactor.tensors import apply_matrix_chunked, calc_env_chunked
+from qfactor.optimize import optimize
+
+
+logger = logging.getLogger( "qfactor" )
+
+
+# Copies of a block alive at once while contracting it
+BLOCK_COPIES = 4
+
+
+class MemmapCircuitTensor ( CircuitTensor ):
+    """A MemmapCircuitTensor streams a circuit tensor from disk."""
+
+    def __init__ ( self, utry_target, gate_list, max_memory = 2 ** 28,
+                   directory = None ):
+        """
+        MemmapCircuitTensor Constructor
+
+        The scratch file is deleted by `close`; call it, or use a with
+        block, when done with the tensor.
+
+        Args:
+            utry_target (np.ndarray or list[Gate]): Unitary target
+                matrix, which may be an np.memmap too, or a circuit
+                implementing it.
+
+            gate_list (list[Gate]): The circuit's gate list.
+
+            max_memory (int): The memory, in bytes, the tensor's blocks
+                may use at once.
+
+            directory (str or None): Where to create the scratch file.
+                If None, use the default temporary directory.
+        """
+
+        if not isinstance( max_memory, int ) or max_memory <= 0:
+            raise TypeError( "Invalid memory limit." )
+
+        self.max_memory = max_memory
+        self.directory = directory
+        self.scratch = None
+        super().__init__( utry_target, gate_list )
+
+    def reinitialize ( self ):
+        """Reconstruct the circuit tensor."""
+        logger.debug( "Reinitializing MemmapCircuitTensor" )
+
+        if self.scratch is None:
+            self._open()
+
+        # Write the target's inverse, or the identity, in blocks of rows
+        num_elems = 2 ** self.num_qubits
+        utry = self.tensor.reshape( ( num_elems, num_elems ) )
+        step = max( 1, num_elems // self.num_chunks )
+        circuit = isinstance( self.utry_target, list )
+
+        for start in range( 0, num_elems, step ):
+            stop = min( start + step, num_elems )
+
+            if circuit:
+                utry[ start : stop ] = 0
+                rows = np.arange( start, stop )
+                utry[ rows, rows ] = 1
+            else:
+                block = self.utry_target[ :, start : stop ]
+                utry[ start : stop ] = block.conj().T
+
+        if circuit:
+            for gate in self.utry_target:
+                self.apply_left( gate, inverse = True )
+
+        for gate in self.gate_list:
+            self.apply_right( gate )
+
+    def _is_unitary_target ( self, utry_target ):
+        """Checks a target's unitarity in blocks within max_memory."""
+
+        if not utils.is_square_matrix( utry_target ):
+            return False
+
+        num_elems = len( utry_target )
+        block_memory = max( 1, self.max_memory // BLOCK_COPIES )
+        step = max( 1, block_memory // ( 16 * num_elems ) )
+        tol = utils.get_unitary_tol( utry_target.dtype )
+        return is_unitary_streamed( utry_target, step, tol )
+
+    def apply_right ( self, gate, inverse = False ):
+        """
+        Apply the specified gate on the right of the circuit.
+
+        Args:
+            gate (Gate): The gate to apply.
+
+            inverse (bool): If true, apply the inverse of gate.
+        """
+
+        utry = gate.inverse_utry if inverse else gate.utry
+        apply_matrix_chunked( self.tensor, utry, list( gate.location ),
+                              None, self.num_chunks, self.tensor )
+
+    def apply_left ( self, gate, inverse = False ):
+        """
+        Apply the specified gate on the left of the circuit.
+
+        Args:
+            gate (Gate): The gate to apply.
+
+            inverse (bool): If true, apply the inverse of gate.
+        """
+
+        utry = gate.inverse_utry if inverse else gate.utry
+        axes = [ x + self.num_qubits for x in gate.location ]
+
+        # Multiplying on the right contracts the matrix's row index
+        apply_matrix_chunked( self.tensor, utry.T, axes, None,
+                              self.num_chunks, self.tensor )
+
+    def calc_env_matrix ( self, location ):
+        """
+        Calculates the environmental matrix of the tensor with
+        respect to the specified location.
+
+        Args:
+            location (iterable): Calculate the environment for this
+                set of qubits.
+
+        Returns:
+            (np.ndarray): The environmental matrix.
+        """
+
+        return calc_env_chunked( self.tensor, location, None,
+                                 self.num_chunks )
+
+    def close ( self ):
+        """Deletes the scratch file."""
+        self.tensor = None
+
+        if self.scratch is not None:
+            self.scratch.close()
+            self.scratch = None
+
+    def _open ( self ):
+        """Creates the scratch file and picks the block count."""
+
+        # The file is unlinked at once, so it never outlives the process
+        self.scratch = tempfile.TemporaryFile( dir = self.directory )
+        shape = [2] * 2 * self.num_qubits
+        self.tensor = np.memmap( self.scratch, np.complex128, "w+",
+                                 shape = tuple( shape ) )
+
+        block_memory = max( 1, self.max_memory // BLOCK_COPIES )
+        self.num_chunks = 1
+        while self.tensor.nbytes // self.num_chunks > block_memory:
+            self.num_chunks *= 2
+
+        logger.debug( f"Streaming tensor in {self.num_chunks} blocks." )
+
+    def __enter__ ( self ):
+        return self
+
+    def __exit__ ( self, *args ):
+        self.close()
+
+
+def is_unitary_streamed ( utry, step, tol ):
+    """
+    Checks if a matrix is unitary, streaming over it in blocks.
+
+    For a square matrix U^dagger U = I implies U U^dagger = I, so only
+    U^dagger U is formed, a block of columns at a time. Each block is
+    accumulated over blocks of rows, so at most a few step-wide slabs of
+    the matrix are in memory at once.
+
+    Args:
+        utry (np.ndarray): The square matrix, possibly an np.memmap.
+
+        step (int): The number of rows and columns per block.
+
+        tol (float): The absolute tolerance on the entries of U^d U.
+
+    Returns:
+        (bool): Unitary or not
+    """
+
+    num_elems = len( utry )
+
+    for start in range( 0, num_elems, step ):
+        stop = min( start + step, num_elems )
+        block = np.zeros( ( num_elems, stop - start ), np.complex128 )
+
+        for row in range( 0, num_elems, step ):
+            rows = utry[ row : row + step ]
+            block += rows.conj().T @ rows[ :, start : stop ]
+
+        block[ np.arange( start, stop ), np.arange( stop - start ) ] -= 1
+
+        if np.abs( block ).max() > tol:
+            return False
+
+    return True
+
+
+def optimize_memmap ( circuit, target, max_memory = 2 ** 28,
+                      directory = None, **kwargs ):
+    """
+    Optimize a circuit with a memory-capped MemmapCircuitTensor.
+
+    Args:
+        circuit (list[Gate]): The circuit to optimize.
+
+        target (np.ndarray): The target unitary matrix.
+
+        max_memory (int): The memory, in bytes, the tensor's blocks
+            may use at once.
+
+        directory (str or None): Where to create the scratch file.
+
+        kwargs (dict): Passed on to `optimize`.
+
+    Returns:
+        (list[Gate]): The optimized circuit.
+    """
+
+    tensors = []
+
+    def factory ( utry_target, gate_list ):
+        tensors.append( MemmapCircuitTensor( utry_target, gate_list,
+                                             max_memory, directory ) )
+        return tensors[-1]
+
+    try:
+        return optimize( circuit, target, tensor_factory = factory, **kwargs )
+    finally:
+        for ct in tensors:
+            ct.close()
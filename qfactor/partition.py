@@ -0,0 +1,225 @@
+"""
+This module implements circuit partitioning and block instantiation.
+
+Wide circuits are cut into blocks of consecutive gates that together
+act on only a few qubits. Every block is optimized against a dense
+block target, in parallel across processes, and the results are
+stitched back together. The dense 4^n circuit tensor is never built.
+"""
+
+import copy
+import logging
+
+import numpy as np
+
+from qfactor.gates import Gate
+from qfactor.optimize import optimize, get_distance
+from qfactor.threads import make_executor
+
+
+logger = logging.getLogger( "qfactor" )
+
+
+class Block():
+    """A Block is a run of consecutive gates acting on few qubits."""
+
+    def __init__ ( self, start, end, location ):
+        """
+        Block Constructor
+
+        Args:
+            start (int): Index of the block's first gate.
+
+            end (int): One past the index of the block's last gate.
+
+            location (tuple[int]): Sorted set of qubits the block's
+                gates act on.
+        """
+
+        self.start = start
+        self.end = end
+        self.location = location
+        self.block_size = len( location )
+        self.distance = None
+
+    def get_local_circuit ( self, circuit ):
+        """
+        Returns copies of the block's gates relabeled onto its qubits.
+
+        Args:
+            circuit (list[Gate]): The partitioned circuit.
+
+        Returns:
+            (list[Gate]): The block's gates, acting on qubits 0 to
+                block_size - 1.
+        """
+
+        local_circuit = []
+        for gate in circuit[ self.start : self.end ]:
+            local_gate = copy.copy( gate )
+            local_gate.location = tuple( [ self.location.index( q )
+                                           for q in gate.location ] )
+            local_circuit.append( local_gate )
+        return local_circuit
+
+    def get_global_circuit ( self, local_circuit ):
+        """Maps gates from `get_local_circuit` back onto the circuit."""
+
+        global_circuit = []
+        for gate in local_circuit:
+            global_gate = copy.copy( gate )
+            global_gate.location = tuple( [ self.location[q]
+                                            for q in gate.location ] )
+            global_circuit.append( global_gate )
+        return global_circuit
+
+    def __repr__ ( self ):
+        """Gets a simple block string representation."""
+
+        return str( self.location )                         \
+               + ": gates["                                 \
+               + str( self.start ) + ":" + str( self.end )  \
+               + "]"
+
+
+def partition ( circuit, block_size ):
+    """
+    Cuts a circuit into blocks along its gate list.
+
+    Blocks are grown greedily: a gate joins the current block as long as
+    the block then acts on at most `block_size` qubits.
+
+    Args:
+        circuit (list[Gate]): The circuit to partition.
+
+        block_size (int): The maximum number of qubits in a block.
+
+    Returns:
+        (list[Block]): The blocks, in circuit order.
+    """
+
+    if not isinstance( circuit, list ):
+        raise TypeError( "The circuit argument is not a list of gates." )
+
+    if not all( [ isinstance( g, Gate ) for g in circuit ] ):
+        raise TypeError( "The circuit argument is not a list of gates." )
+
+    if not isinstance( block_size, int ) or block_size <= 0:
+        raise TypeError( "Invalid block size." )
+
+    if any( [ g.gate_size > block_size for g in circuit ] ):
+        raise ValueError( "A gate is larger than the block size." )
+
+    blocks = []
+    start = 0
+    qubits = set()
+
+    for i, gate in enumerate( circuit ):
+        if len( qubits.union( gate.location ) ) > block_size:
+            blocks.append( Block( start, i, tuple( sorted( qubits ) ) ) )
+            start = i
+            qubits = set()
+        qubits.update( gate.location )
+
+    if len( circuit ) > start:
+        blocks.append( Block( start, len( circuit ),
+                              tuple( sorted( qubits ) ) ) )
+
+    return blocks
+
+
+def get_error_bound ( blocks ):
+    """
+    Bounds the distance of a stitched circuit from its block distances.
+
+    A distance d between unitaries equals half the squared Frobenius
+    distance, up to global phase, normalized by the dimension. That
+    normalized norm is unchanged by padding with identities and obeys the
+    triangle inequality across a product, which gives:
+        d <= ( sum_i sqrt( 2 * d_i ) ) ** 2 / 2
+
+    Args:
+        blocks (list[Block]): Blocks with their distances computed.
+
+    Returns:
+        (float): An upper bound on the total distance.
+    """
+
+    if any( [ block.distance is None for block in blocks ] ):
+        raise ValueError( "Block distances have not been computed." )
+
+    norm = sum( [ np.sqrt( 2 * max( block.distance, 0 ) )
+                  for block in blocks ] )
+    return min( norm ** 2 / 2, 1.0 )
+
+
+def instantiate_blocks ( circuit, target, block_size = 3, num_workers = None,
+                         **kwargs ):
+    """
+    Optimize a circuit block by block towards a reference circuit.
+
+    The circuit is partitioned into blocks of at most `block_size`
+    qubits. The target must be a circuit with the same gate locations, so
+    every block gets the dense unitary of the matching target gates as
+    its target. Blocks are optimized in parallel across processes.
+
+    Args:
+        circuit (list[Gate]): The circuit to optimize.
+
+        target (list[Gate]): The reference circuit defining the target.
+
+        block_size (int): The maximum number of qubits in a block.
+
+        num_workers (int or None): Number of worker processes. If None,
+            it follows the thread budget of `qfactor.threads`; if 1,
+            optimize in this process.
+
+        kwargs (dict): Passed on to `optimize` for every block.
+
+    Returns:
+        (tuple[list[Gate], list[Block]]): The optimized circuit and its
+            blocks, with their distances computed.
+    """
+
+    if not isinstance( target, list ):
+        raise TypeError( "The target argument is not a list of gates." )
+
+    if not all( [ isinstance( g, Gate ) for g in target ] ):
+        raise TypeError( "The target argument is not a list of gates." )
+
+    if len( target ) != len( circuit ):
+        raise ValueError( "Target and circuit have different lengths." )
+
+    if any( [ tuple( g.location ) != tuple( t.location )
+              for g, t in zip( circuit, target ) ] ):
+        raise ValueError( "Target and circuit have different locations." )
+
+    blocks = partition( circuit, block_size )
+    jobs = [ ( block.get_local_circuit( circuit ),
+               block.get_local_circuit( target ),
+               kwargs ) for block in blocks ]
+
+    if num_workers == 1:
+        results = list( map( _instantiate_block, jobs ) )
+    else:
+        with make_executor( block_size, num_workers ) as executor:
+            results = list( executor.map( _instantiate_block, jobs ) )
+
+    out_circuit = []
+    for block, ( local_circuit, distance ) in zip( blocks, results ):
+        block.distance = distance
+        out_circuit += block.get_global_circuit( local_circuit )
+        logger.info( f"Block {block}: distance = {distance}" )
+
+    if len( blocks ) > 0:
+        logger.info( f"Total error bound: {get_error_bound( blocks )}" )
+
+    return out_circuit, blocks
+
+
+def _instantiate_block ( job ):
+    """Optimizes one block job; runs in a worker process."""
+
+    local_circuit, local_target, kwargs = job
+    local_circuit = optimize( local_circuit, local_target, **kwargs )
+    return local_circuit, get_distance( local_circuit, local_target )
@@ -0,0 +1,292 @@
+"""
+This module implements instantiation of CNOT+Rz circuits by phases.
+
+A circuit made only of CnotGates and RzGates maps every basis state to
+another with a phase: U|x> = e^(i phi(x)) |P x>. Each wire carries a
+parity of the input bits, tracked as a bit mask, and each RzGate adds
+its angle to phi(x) wherever its wire's parity is one. A PhasePolynomial
+tracks these parity masks and the length-2^n phase vector instead of
+the 4^n circuit tensor.
+
+Against a diagonal target only the states with P x = x contribute to
+Tr(U_t^dagger U). Fixing every other angle, the trace of one RzGate is
+A + B e^(i theta), with A and B sums of the phase vector over the
+states where its parity is zero and one, so each angle has a closed
+form update and a sweep costs O(L * 2^n).
+"""
+
+import logging
+
+import numpy as np
+
+from qfactor import utils
+from qfactor.gates import CnotGate, RzGate
+
+
+logger = logging.getLogger( "qfactor" )
+
+
+class PhasePolynomial():
+    """A PhasePolynomial tracks the parities of a CNOT+Rz circuit."""
+
+    def __init__ ( self, circuit, num_qubits = None ):
+        """
+        PhasePolynomial Constructor
+
+        Args:
+            circuit (list[Gate]): A circuit of CnotGates and RzGates.
+
+            num_qubits (int or None): The number of qubits. If None, it
+                is inferred from the gates' locations.
+        """
+
+        if not is_phase_circuit( circuit ):
+            raise TypeError( "Circuit is not made of CNOT and Rz gates." )
+
+        if num_qubits is None:
+            num_qubits = 1 + max( [ max( g.location ) for g in circuit ],
+                                  default = 0 )
+
+        if not all( [ utils.is_valid_location( g.location, num_qubits )
+                      for g in circuit ] ):
+            raise ValueError( "Gate location mismatch with num_qubits." )
+
+        self.circuit = circuit
+        self.num_qubits = num_qubits
+
+        # Qubit 0 is the most significant bit of a basis state index
+        wires = [ 1 << ( num_qubits - 1 - q ) for q in range( num_qubits ) ]
+        self.masks = []
+
+        for gate in circuit:
+            if isinstance( gate, CnotGate ):
+                control, target = gate.location
+                wires[ target ] ^= wires[ control ]
+                self.masks.append( None )
+            else:
+                self.masks.append( wires[ gate.location[0] ] )
+
+        self.wires = wires
+        self.states = np.arange( 2 ** num_qubits, dtype = np.int64 )
+
+    def get_parities ( self, mask ):
+        """
+        Returns the parity of mask's bits for every basis state.
+
+        Args:
+            mask (int): The input bits to take the parity of.
+
+        Returns:
+            (np.ndarray): A boolean vector of length 2^n.
+        """
+
+        bits = self.states & mask
+        shift = 1
+        while shift < self.num_qubits:
+            bits ^= bits >> shift
+            shift *= 2
+        return ( bits & 1 ).astype( bool )
+
+    def get_fixed_points ( self ):
+        """Returns a boolean vector of the states with P x = x."""
+
+        n = self.num_qubits
+        fixed = np.ones( 2 ** n, dtype = bool )
+
+        # Each output wire's parity must equal its own input bit
+        for q, wire in enumerate( self.wires ):
+            fixed &= ~self.get_parities( wire ^ ( 1 << ( n - 1 - q ) ) )
+
+        return fixed
+
+    def get_phases ( self, fixed_only = False ):
+        """
+        Calculates the circuit's phase vector e^(i phi(x)).
+
+        Args:
+            fixed_only (bool): Only include the fixed RzGates.
+
+        Returns:
+            (np.ndarray): The phases, of length 2^n.
+        """
+
+        phi = np.zeros( 2 ** self.num_qubits )
+        for gate, mask in zip( self.circuit, self.masks ):
+            if mask is None or ( fixed_only and not gate.fixed ):
+                continue
+            phi[ self.get_parities( mask ) ] += gate.theta
+        return np.exp( 1j * phi )
+
+
+def is_phase_circuit ( circuit ):
+    """Returns true if a circuit is made only of CnotGates and RzGates."""
+
+    if not isinstance( circuit, list ):
+        return False
+
+    return all( [ isinstance( g, ( CnotGate, RzGate ) ) for g in circuit ] )
+
+
+def get_phase_distance ( circuit, target ):
+    """
+    Returns the distance between a CNOT+Rz circuit and a diagonal target.
+
+    Args:
+        circuit (list[Gate]): A circuit of CnotGates and RzGates.
+
+        target (np.ndarray or list[Gate]): The target's diagonal, the
+            diagonal target matrix, or a CNOT+Rz circuit implementing it.
+
+    Returns:
+        (float): The distance between the circuit and the target.
+    """
+
+    weights, num_qubits = _get_weights( circuit, target )
+    poly = PhasePolynomial( circuit, num_qubits )
+    trace = np.vdot( weights, poly.get_phases() * poly.get_fixed_points() )
+    return 1 - ( np.abs( trace ) / ( 2 ** num_qubits ) )
+
+
+def optimize_phase ( circuit, target, diff_tol_a = 1e-12, diff_tol_r = 1e-6,
+                     dist_tol = 1e-10, max_iters = 100000, min_iters = 1000,
+                     slowdown_factor = 0.0, callback = None ):
+    """
+    Optimize the RzGate angles of a CNOT+Rz circuit for a diagonal target.
+
+    The arguments match those of `qfactor.optimize.optimize`.
+
+    Args:
+        circuit (list[Gate]): A circuit of CnotGates and RzGates.
+
+        target (np.ndarray or list[Gate]): The target's diagonal, the
+            diagonal target matrix, or a CNOT+Rz circuit implementing it.
+
+        diff_tol_a (float): Terminate when the difference in distance
+            between iterations is less than this threshold.
+
+        diff_tol_r (float): Terminate when the relative difference in
+            distance between iterations is less than this threshold.
+
+        dist_tol (float): Terminate when the distance is less than
+            this threshold.
+
+        max_iters (int): Maximum number of iterations.
+
+        min_iters (int): Minimum number of iterations.
+
+        slowdown_factor (float): A positive number less than 1.
+
+        callback (callable or None): Called after every iteration as
+            callback( it, c1 ); the optimization stops if it returns true.
+
+    Returns:
+        (list[Gate]): The optimized circuit.
+    """
+
+    weights, num_qubits = _get_weights( circuit, target )
+    poly = PhasePolynomial( circuit, num_qubits )
+
+    # Conjugated target weights times the fixed gates' phases
+    phases = weights.conj() * poly.get_fixed_points()
+    phases *= poly.get_phases( fixed_only = True )
+
+    # Gates on the same parity share its vector
+    parities = {}
+    updated = []
+    for gate, mask in zip( circuit, poly.masks ):
+        if mask is not None and not gate.fixed:
+            if mask not in parities:
+                parities[ mask ] = poly.get_parities( mask )
+            updated.append( ( gate, parities[ mask ] ) )
+
+    for gate, parities in updated:
+        phases[ parities ] *= np.exp( 1j * gate.theta )
+
+    c1 = 0
+    c2 = 1
+    it = 0
+
+    while True:
+
+        if it > min_iters:
+
+            if np.abs(c1 - c2) <= diff_tol_a + diff_tol_r * np.abs( c1 ):
+                diff = np.abs(c1 - c2)
+                logger.info( f"Terminated: |c1 - c2| = {diff}"
+                              " <= diff_tol_a + diff_tol_r * |c1|." )
+                break
+
+            if it > max_iters:
+                logger.info( "Terminated: iteration limit reached." )
+                break
+
+        it += 1
+
+        for gate, parities in updated:
+            phases[ parities ] *= np.exp( -1j * gate.theta )
+            a = np.sum( phases[ ~parities ] )
+            b = np.sum( phases[ parities ] )
+            new_theta = float( np.angle( a ) - np.angle( b ) )
+            gate.theta = ( ( 1 - slowdown_factor ) * new_theta
+                           + slowdown_factor * gate.theta )
+            phases[ parities ] *= np.exp( 1j * gate.theta )
+
+        c2 = c1
+        c1 = 1 - ( np.abs( np.sum( phases ) ) / ( 2 ** num_qubits ) )
+
+        if callback is not None and callback( it, c1 ):
+            logger.info( "Terminated: stopped by callback." )
+            break
+
+        if c1 <= dist_tol:
+            logger.info( f"Terminated: c1 = {c1} <= dist_tol." )
+            return circuit
+
+        if it % 100 == 0:
+            logger.info( f"iteration: {it}, cost: {c1}" )
+
+    return circuit
+
+
+def _get_weights ( circuit, target ):
+    """
+    Returns a diagonal target's entries and its number of qubits.
+
+    Args:
+        circuit (list[Gate]): The circuit, used to size a target circuit.
+
+        target (np.ndarray or list[Gate]): The target's diagonal, the
+            diagonal target matrix, or a CNOT+Rz circuit implementing it.
+    """
+
+    if isinstance( target, list ):
+        num_qubits = 1 + max( [ max( g.location ) for g in target + circuit ],
+                              default = 0 )
+        poly = PhasePolynomial( target, num_qubits )
+
+        if not np.all( poly.get_fixed_points() ):
+            raise ValueError( "Target circuit is not diagonal." )
+
+        return poly.get_phases(), num_qubits
+
+    target = np.asarray( target )
+
+    if target.ndim == 2:
+        if not utils.is_unitary( target ):
+            raise TypeError( "The target matrix is not unitary." )
+
+        diagonal = np.diagonal( target )
+        if not np.allclose( target, np.diag( diagonal ) ):
+            raise ValueError( "The target matrix is not diagonal." )
+
+        target = diagonal
+
+    num_qubits = int( np.log2( len( target ) ) )
+
+    if target.ndim != 1 or 2 ** num_qubits != len( target ):
+        raise TypeError( "Invalid target diagonal." )
+
+    if not np.allclose( np.abs( target ), 1 ):
+        raise TypeError( "The target diagonal is not unitary." )
+
+    return target, num_qubits
@@ -0,0 +1,141 @@
+"""
+This module implements commutation-aware reordering of sweeps.
+
+The order of a circuit decides which tensor indices a CircuitTensor has
+to move into place for each gate. `get_sweep_order` reorders the gates
+so consecutive gates share qubits where cheap commutation rules allow:
+two gates commute if they only share qubits both act on diagonally,
+such as qubits of gates that are and stay diagonal, or the control of a
+CnotGate. Every such pair may be swapped, so the reordered circuit
+implements the same unitary.
+The order only changes the sweep; the gates are the caller's objects,
+updated in place, and the caller's list keeps its order.
+"""
+
+import heapq
+import logging
+
+from qfactor.gates import CnotGate
+
+
+logger = logging.getLogger( "qfactor" )
+
+
+def commutes ( gate_a, gate_b ):
+    """
+    Returns true if two gates commute for any of their parameters.
+
+    Two gates commute if each of their shared qubits is one both act on
+    diagonally. A gate acts diagonally on all its qubits if it is and
+    stays diagonal, and a CnotGate acts diagonally on its control. Only
+    these cheap rules are checked, so false does not imply that the
+    gates do not commute.
+
+    Args:
+        gate_a (Gate): The first gate.
+
+        gate_b (Gate): The second gate.
+
+    Returns:
+        (bool): True if the gates commute.
+    """
+
+    shared = set( gate_a.location ) & set( gate_b.location )
+    diagonal = get_diagonal_qubits( gate_a ) & get_diagonal_qubits( gate_b )
+    return shared <= diagonal
+
+
+def get_diagonal_qubits ( gate ):
+    """Returns the qubits a gate always acts diagonally on."""
+
+    if gate.is_diagonal():
+        return set( gate.location )
+
+    if isinstance( gate, CnotGate ):
+        return { gate.location[0] }
+
+    return set()
+
+
+def get_sweep_order ( circuit ):
+    """
+    Reorders a circuit so consecutive gates share qubits.
+
+    Gates are scheduled greedily: among the gates whose non-commuting
+    predecessors are all scheduled, the one sharing the most qubits
+    with the previous gate comes next, the earliest on ties.
+
+    Args:
+        circuit (list[Gate]): The circuit.
+
+    Returns:
+        (list[int]): The circuit's indices in the new order.
+    """
+
+    diagonal = [ get_diagonal_qubits( gate ) for gate in circuit ]
+    successors = [ [] for _ in circuit ]
+    num_blockers = [ 0 ] * len( circuit )
+
+    # Per qubit, the last gate acting on it off-diagonally and the gates
+    # acting diagonally since; every earlier gate is ordered before them
+    last_other = {}
+    diagonal_since = {}
+
+    for j, gate in enumerate( circuit ):
+        blockers = set()
+        for qubit in gate.location:
+            if qubit in last_other:
+                blockers.add( last_other[ qubit ] )
+
+            if qubit in diagonal[j]:
+                diagonal_since.setdefault( qubit, [] ).append( j )
+            else:
+                blockers.update( diagonal_since.pop( qubit, [] ) )
+                last_other[ qubit ] = j
+
+        for i in blockers:
+            successors[i].append( j )
+        num_blockers[j] = len( blockers )
+
+    # Ready gates by index, removed lazily once scheduled, and by qubit
+    ready = []
+    ready_on = {}
+    scheduled = [ False ] * len( circuit )
+    order = []
+    last = ()
+
+    def push ( k ):
+        heapq.heappush( ready, k )
+        for qubit in circuit[k].location:
+            ready_on.setdefault( qubit, set() ).add( k )
+
+    for j in range( len( circuit ) ):
+        if num_blockers[j] == 0:
+            push( j )
+
+    while len( order ) < len( circuit ):
+        shared = {}
+        for qubit in last:
+            for k in ready_on.get( qubit, () ):
+                shared[k] = shared.get( k, 0 ) + 1
+
+        if len( shared ) > 0:
+            j = min( shared, key = lambda k: ( -shared[k], k ) )
+        else:
+            while scheduled[ ready[0] ]:
+                heapq.heappop( ready )
+            j = ready[0]
+
+        for qubit in circuit[j].location:
+            ready_on[ qubit ].discard( j )
+
+        scheduled[j] = True
+        order.append( j )
+        last = circuit[j].location
+
+        for k in successors[j]:
+            num_blockers[k] -= 1
+            if num_blockers[k] == 0:
+                push( k )
+
+    return order
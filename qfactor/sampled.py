@@ -0,0 +1,239 @@
+"""
+This module implements sampled-state (stochastic) instantiation.
+
+Instead of the full product of the target and the circuit, a
+SampledCircuitTensor tracks a batch of random input states pushed
+through the circuit together with the matching target outputs. The
+environments are contracted from these state vectors, so memory grows as
+O(num_samples * 2^n) instead of 4^n. The trace it reports is an unbiased
+estimate of the full trace, and the optimum of the sampled objective is
+the target itself once the sample pins it down.
+"""
+
+import logging
+from functools import partial
+
+import numpy as np
+
+from qfactor import utils
+from qfactor.gates import Gate
+from qfactor.tensors import apply_matrix
+from qfactor.optimize import optimize
+
+
+logger = logging.getLogger( "qfactor" )
+
+
+class SampledCircuitTensor():
+    """A SampledCircuitTensor tracks a circuit on random input states."""
+
+    def __init__ ( self, utry_target, gate_list, num_samples = 8,
+                   seed = None, num_qubits = None ):
+        """
+        SampledCircuitTensor Constructor
+
+        Args:
+            utry_target (np.ndarray or list[Gate]): Unitary target
+                matrix, or a circuit implementing it.
+
+            gate_list (list[Gate]): The circuit's gate list.
+
+            num_samples (int): The number of random input states.
+
+            seed (int or None): Seed for the random input states. The
+                same states are used after every reinitialization.
+
+            num_qubits (int or None): The number of qubits. Required
+                only if it cannot be inferred from the target.
+        """
+
+        if isinstance( utry_target, list ):
+            if not all( [ isinstance( g, Gate ) for g in utry_target ] ):
+                raise TypeError( "Target circuit contains non-gate objects." )
+
+            if num_qubits is None:
+                num_qubits = 1 + max( [ max( g.location, default = -1 )
+                                        for g in utry_target + gate_list ],
+                                      default = 0 )
+
+        elif not utils.is_unitary( utry_target ):
+            raise TypeError( "Specified target matrix is not unitary." )
+
+        else:
+            num_qubits = utils.get_num_qubits( utry_target )
+
+        if not isinstance( gate_list, list ):
+            raise TypeError( "Gate list is not a list." )
+
+        if not all( [ isinstance( gate, Gate ) for gate in gate_list ] ):
+            raise TypeError( "Gate list contains non-gate objects." )
+
+        if not isinstance( num_samples, int ) or num_samples <= 0:
+            raise TypeError( "Invalid number of samples." )
+
+        self.utry_target = utry_target
+        self.num_qubits = num_qubits
+
+        if not all( [ utils.is_valid_location( gate.location, self.num_qubits )
+                      for gate in gate_list ] ):
+            raise ValueError( "Gate location mismatch with circuit tensor." )
+
+        if seed is None:
+            seed = np.random.randint( 2 ** 31 )
+
+        self.gate_list = gate_list
+        self.num_samples = num_samples
+        self.seed = seed
+        self.reinitialize()
+
+    def reinitialize ( self ):
+        """Reconstruct the circuit and target states."""
+        logger.debug( "Reinitializing SampledCircuitTensor" )
+
+        num_elems = 2 ** self.num_qubits
+        shape = ( num_elems, self.num_samples )
+        rng = np.random.RandomState( self.seed )
+        states = rng.standard_normal( shape ) + 1j * rng.standard_normal( shape )
+
+        # Scale so the sample's outer product averages to the identity
+        norms = np.linalg.norm( states, axis = 0 )
+        states *= np.sqrt( num_elems / self.num_samples ) / norms
+
+        if isinstance( self.utry_target, list ):
+            self.target_states = states.reshape( [2] * self.num_qubits + [-1] )
+            for gate in self.utry_target:
+                self.target_states = apply_matrix( self.target_states,
+                                                   gate.utry,
+                                                   list( gate.location ) )
+        else:
+            self.target_states = self.utry_target @ states
+            self.target_states = self.target_states.reshape( [2] * self.num_qubits
+                                                             + [-1] )
+
+        self.states = states.reshape( [2] * self.num_qubits + [-1] )
+
+        for gate in self.gate_list:
+            self.apply_right( gate )
+
+    @property
+    def utry ( self ):
+        """Calculates the sampled estimate of the unitary product."""
+        num_elems = 2 ** self.num_qubits
+        states = self.states.reshape( ( num_elems, -1 ) )
+        target_states = self.target_states.reshape( ( num_elems, -1 ) )
+        return states @ target_states.conj().T
+
+    def calc_trace ( self ):
+        """Calculates the sampled estimate of the product's trace."""
+        return np.vdot( self.target_states, self.states )
+
+    def apply_right ( self, gate, inverse = False ):
+        """
+        Apply the specified gate on the right of the circuit.
+
+        The gate acts on the circuit states.
+
+        Args:
+            gate (Gate): The gate to apply.
+
+            inverse (bool): If true, apply the inverse of gate.
+        """
+
+        utry = gate.inverse_utry if inverse else gate.utry
+        self.states = apply_matrix( self.states, utry, list( gate.location ) )
+
+    def apply_left ( self, gate, inverse = False ):
+        """
+        Apply the specified gate on the left of the circuit.
+
+        The inverse gate acts on the target states.
+
+        Args:
+            gate (Gate): The gate to apply.
+
+            inverse (bool): If true, apply the inverse of gate.
+        """
+
+        utry = gate.utry if inverse else gate.inverse_utry
+        self.target_states = apply_matrix( self.target_states, utry,
+                                           list( gate.location ) )
+
+    def calc_env_matrix ( self, location ):
+        """
+        Calculates the environmental matrix of the tensor with
+        respect to the specified location.
+
+        Args:
+            location (iterable): Calculate the environment for this
+                set of qubits.
+
+        Returns:
+            (np.ndarray): The environmental matrix.
+        """
+
+        location = list( location )
+        others = [ x for x in range( self.num_qubits + 1 )
+                   if x not in location ]
+        perm = location + others
+        size = 2 ** len( location )
+
+        states = self.states.transpose( perm ).reshape( ( size, -1 ) )
+        target_states = self.target_states.transpose( perm )
+        target_states = target_states.reshape( ( size, -1 ) )
+        return states @ target_states.conj().T
+
+
+def get_sampled_distance ( circuit, target, num_samples = 64, seed = None ):
+    """
+    Estimates the distance between the circuit and the target.
+
+    Args:
+        circuit (list[Gate]): The circuit.
+
+        target (np.ndarray or list[Gate]): The unitary target, or a
+            circuit implementing it.
+
+        num_samples (int): The number of random input states.
+
+        seed (int or None): Seed for the random input states.
+
+    Returns:
+        (float): The estimated distance.
+    """
+
+    ct = SampledCircuitTensor( target, circuit, num_samples, seed )
+    return 1 - ( np.abs( ct.calc_trace() ) / ( 2 ** ct.num_qubits ) )
+
+
+def optimize_sampled ( circuit, target, num_samples = 8,
+                       num_verify_samples = 64, seed = None, **kwargs ):
+    """
+    Optimize a circuit on sampled states and verify on a fresh sample.
+
+    Args:
+        circuit (list[Gate]): The circuit to optimize.
+
+        target (np.ndarray or list[Gate]): The unitary target, or a
+            circuit implementing it.
+
+        num_samples (int): The number of random input states used
+            during optimization.
+
+        num_verify_samples (int): The number of independent random
+            input states used to verify the result.
+
+        seed (int or None): Seed for the optimization states.
+
+        kwargs (dict): Passed on to `optimize`.
+
+    Returns:
+        (tuple[list[Gate], float]): The optimized circuit and its
+            distance estimated on the verification sample.
+    """
+
+    factory = partial( SampledCircuitTensor, num_samples = num_samples,
+                       seed = seed )
+    circuit = optimize( circuit, target, tensor_factory = factory, **kwargs )
+    distance = get_sampled_distance( circuit, target, num_verify_samples )
+    logger.info( f"Verified distance: {distance}" )
+    return circuit, distance
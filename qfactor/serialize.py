@@ -0,0 +1,267 @@
+"""
+This module implements qfactor's binary circuit format.
+
+Circuits are stored as flat arrays in the layout of CircuitArray: gate
+type codes, gate sizes, fixed flags, angles, locations and the dense
+blocks of general gates, with offset arrays locating every circuit and
+gate. A single circuit is written as one `.npz` file. A corpus of many
+circuits is written as a directory of raw `.npy` arrays, which are read
+back through memory maps, so single circuits can be loaded from a large
+corpus without reading the rest of it.
+"""
+
+import os
+import json
+import logging
+
+import numpy as np
+
+from qfactor.gates import Gate, CnotGate
+from qfactor.circuit import GATE, CNOT, GATE_CODES, GATE_CLASSES
+
+
+logger = logging.getLogger( "qfactor" )
+
+
+FORMAT_VERSION = 1
+
+ARRAY_NAMES = ( "circuit_offsets", "types", "gate_sizes", "fixed", "thetas",
+                "location_offsets", "locations", "utry_offsets", "utrys",
+                "target_offsets", "targets" )
+
+
+class CircuitCorpus():
+    """A CircuitCorpus reads circuits from a memory-mapped corpus."""
+
+    def __init__ ( self, directory ):
+        """
+        CircuitCorpus Constructor
+
+        Args:
+            directory (str): A directory written by `save_corpus`.
+        """
+
+        with open( os.path.join( directory, "header.json" ) ) as f:
+            header = json.load( f )
+
+        _check_header( header )
+
+        self.directory = directory
+        self.metadata = header[ "metadata" ]
+        self.arrays = { name: np.load( os.path.join( directory, name + ".npy" ),
+                                       mmap_mode = "r" )
+                        for name in ARRAY_NAMES }
+
+    def get_circuit ( self, index ):
+        """Loads the circuit at index."""
+        return _unpack_circuit( self.arrays, self._check_index( index ) )
+
+    def get_target ( self, index ):
+        """Loads the target at index, or None if it has no target."""
+        return _unpack_target( self.arrays, self._check_index( index ) )
+
+    def _check_index ( self, index ):
+        """Validates a circuit index."""
+
+        if not isinstance( index, ( int, np.integer ) ):
+            raise TypeError( "Invalid circuit index." )
+
+        if index < 0 or index >= len( self ):
+            raise IndexError( "Circuit index out of range." )
+
+        return int( index )
+
+    def __getitem__ ( self, index ):
+        """Returns the circuit, target and metadata at index."""
+        return ( self.get_circuit( index ), self.get_target( index ),
+                 self.metadata[ index ] )
+
+    def __len__ ( self ):
+        """Returns the number of circuits in the corpus."""
+        return len( self.arrays[ "circuit_offsets" ] ) - 1
+
+
+def save_circuit ( filename, circuit, target = None, metadata = None ):
+    """
+    Saves one circuit in a `.npz` file.
+
+    Args:
+        filename (str): The file to write.
+
+        circuit (list[Gate]): The circuit to save.
+
+        target (np.ndarray or None): The circuit's target unitary.
+
+        metadata (dict or None): JSON-serializable information kept with
+            the circuit, such as distances or timings.
+    """
+
+    arrays = _pack( [ circuit ], [ target ] )
+    header = _get_header( [ metadata ] )
+    np.savez( filename, header = np.array( json.dumps( header ) ), **arrays )
+
+
+def load_circuit ( filename ):
+    """
+    Loads a circuit saved by `save_circuit`.
+
+    Args:
+        filename (str): The file to read.
+
+    Returns:
+        (tuple[list[Gate], np.ndarray or None, dict or None]): The
+            circuit, its target and its metadata.
+    """
+
+    with np.load( filename ) as arrays:
+        header = json.loads( str( arrays[ "header" ] ) )
+        _check_header( header )
+        return ( _unpack_circuit( arrays, 0 ), _unpack_target( arrays, 0 ),
+                 header[ "metadata" ][0] )
+
+
+def save_corpus ( directory, circuits, targets = None, metadata = None ):
+    """
+    Saves many circuits as a directory of raw arrays.
+
+    Args:
+        directory (str): The directory to write, created if needed.
+
+        circuits (list[list[Gate]]): The circuits to save.
+
+        targets (list[np.ndarray or None] or None): The circuits'
+            target unitaries.
+
+        metadata (list[dict or None] or None): JSON-serializable
+            information kept with every circuit.
+    """
+
+    if targets is None:
+        targets = [ None ] * len( circuits )
+
+    if metadata is None:
+        metadata = [ None ] * len( circuits )
+
+    if len( targets ) != len( circuits ) or len( metadata ) != len( circuits ):
+        raise ValueError( "Circuits, targets and metadata lengths differ." )
+
+    os.makedirs( directory, exist_ok = True )
+
+    for name, array in _pack( circuits, targets ).items():
+        np.save( os.path.join( directory, name + ".npy" ), array )
+
+    with open( os.path.join( directory, "header.json" ), "w" ) as f:
+        json.dump( _get_header( metadata ), f )
+
+    logger.info( f"Saved {len( circuits )} circuits to {directory}." )
+
+
+def _get_header ( metadata ):
+    """Returns the format header holding the metadata."""
+    return { "format": "qfactor", "version": FORMAT_VERSION,
+             "metadata": metadata }
+
+
+def _check_header ( header ):
+    """Validates a format header."""
+
+    if header.get( "format" ) != "qfactor":
+        raise ValueError( "Not a qfactor circuit file." )
+
+    if header.get( "version" ) != FORMAT_VERSION:
+        raise ValueError( "Unsupported qfactor format version." )
+
+
+def _pack ( circuits, targets ):
+    """Packs circuits and targets into flat arrays."""
+
+    if not all( [ isinstance( c, list ) and all( [ isinstance( g, Gate )
+                                                   for g in c ] )
+                  for c in circuits ] ):
+        raise TypeError( "Invalid circuit, not a list of gates." )
+
+    gates = [ gate for circuit in circuits for gate in circuit ]
+    types = np.array( [ GATE_CODES.get( type( g ), GATE ) for g in gates ],
+                      dtype = np.int8 )
+    blocks = [ np.asarray( g.utry, dtype = np.complex128 ).ravel()
+               if t == GATE else np.empty( 0, dtype = np.complex128 )
+               for g, t in zip( gates, types ) ]
+    targets = [ np.empty( 0, dtype = np.complex128 ) if t is None
+                else np.asarray( t, dtype = np.complex128 ).ravel()
+                for t in targets ]
+
+    return {
+        "circuit_offsets": _get_offsets( [ len( c ) for c in circuits ] ),
+        "types": types,
+        "gate_sizes": np.array( [ g.gate_size for g in gates ],
+                                dtype = np.int64 ),
+        "fixed": np.array( [ g.fixed for g in gates ], dtype = bool ),
+        "thetas": np.array( [ g.theta if t != GATE and t != CNOT else np.nan
+                              for g, t in zip( gates, types ) ],
+                            dtype = np.float64 ),
+        "location_offsets": _get_offsets( [ g.gate_size for g in gates ] ),
+        "locations": np.array( [ q for g in gates for q in g.location ],
+                               dtype = np.int64 ),
+        "utry_offsets": _get_offsets( [ len( b ) for b in blocks ] ),
+        "utrys": _concatenate( blocks ),
+        "target_offsets": _get_offsets( [ len( t ) for t in targets ] ),
+        "targets": _concatenate( targets )
+    }
+
+
+def _get_offsets ( sizes ):
+    """Returns the start offsets of consecutive segments, and the end."""
+    return np.concatenate( [ [ 0 ], np.cumsum( sizes, dtype = np.int64 ) ] )
+
+
+def _concatenate ( blocks ):
+    """Concatenates complex blocks, allowing none at all."""
+    return np.concatenate( [ np.empty( 0, dtype = np.complex128 ) ] + blocks )
+
+
+def _unpack_circuit ( arrays, index ):
+    """Rebuilds the circuit at index from flat arrays."""
+
+    start, end = arrays[ "circuit_offsets" ][ index : index + 2 ]
+    types = arrays[ "types" ][ start : end ]
+    fixed = arrays[ "fixed" ][ start : end ]
+    thetas = arrays[ "thetas" ][ start : end ]
+    location_offsets = arrays[ "location_offsets" ][ start : end + 1 ]
+    utry_offsets = arrays[ "utry_offsets" ][ start : end + 1 ]
+    locations = arrays[ "locations" ]
+    utrys = arrays[ "utrys" ]
+
+    circuit = []
+    for i, code in enumerate( types ):
+        location = tuple( int( q ) for q in
+                          locations[ location_offsets[i]
+                                     : location_offsets[i + 1] ] )
+
+        if code == GATE:
+            dim = 2 ** len( location )
+            utry = np.array( utrys[ utry_offsets[i] : utry_offsets[i + 1] ] )
+            circuit.append( Gate( utry.reshape( ( dim, dim ) ), location,
+                                  bool( fixed[i] ), False ) )
+
+        elif code == CNOT:
+            circuit.append( CnotGate( location[0], location[1], False ) )
+
+        else:
+            circuit.append( GATE_CLASSES[ code ]( float( thetas[i] ), location,
+                                                  bool( fixed[i] ), False ) )
+
+    return circuit
+
+
+def _unpack_target ( arrays, index, copy = True ):
+    """Rebuilds the target at index, or a view of it, from flat arrays."""
+
+    start, end = arrays[ "target_offsets" ][ index : index + 2 ]
+
+    if start == end:
+        return None
+
+    dim = int( np.round( np.sqrt( end - start ) ) )
+    target = arrays[ "targets" ][ start : end ]
+    target = np.array( target ) if copy else target
+    return target.reshape( ( dim, dim ) )
@@ -0,0 +1,387 @@
+"""
+This module implements a local job server for circuit instantiation.
+
+Run it with `python -m qfactor.serve`. The server accepts jobs over
+localhost HTTP or a UNIX socket and hands them to a fixed pool of worker
+processes. The workers are started and warmed up once, so a job costs no
+interpreter or numpy start-up time. At most `max_queue` jobs are accepted
+at once, running or waiting, until their workers are done with them;
+any further job is refused with status 503 until a slot frees. Every
+job has a deadline, counted from when it is accepted. A job still
+waiting for a worker at its deadline is dropped, and a running one
+stops optimizing when it passes.
+
+A job is a POST to /optimize with a JSON body holding the circuit and
+target, encoded by `encode_problem`, an optional "deadline" in seconds
+and optional "options" for `optimize`. The reply holds the result fields
+of `qfactor.cli.solve` and the optimized circuit, decoded by
+`decode_problem`. A GET to /status reports the queue occupancy.
+"""
+
+import io
+import os
+import json
+import time
+import base64
+import socket
+import logging
+import argparse
+import threading
+import http.client
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import numpy as np
+
+from qfactor.gates import Gate
+from qfactor.cli import solve
+from qfactor.serialize import save_circuit, load_circuit
+
+
+logger = logging.getLogger( "qfactor" )
+
+
+# Extra seconds to wait for a worker past a job's deadline
+DEADLINE_GRACE = 5.0
+
+
+class JobServer():
+    """A JobServer runs instantiation jobs on warm worker processes."""
+
+    def __init__ ( self, num_workers = None, max_queue = 64,
+                   default_deadline = 60.0 ):
+        """
+        JobServer Constructor
+
+        Args:
+            num_workers (int or None): Number of worker processes. If
+                None, use one per core.
+
+            max_queue (int): The maximum number of jobs accepted at once,
+                running or waiting.
+
+            default_deadline (float): Deadline in seconds for jobs that
+                do not set one.
+        """
+
+        if not isinstance( max_queue, int ) or max_queue <= 0:
+            raise TypeError( "Invalid maximum queue size." )
+
+        self.num_workers = num_workers or os.cpu_count()
+        self.max_queue = max_queue
+        self.default_deadline = default_deadline
+        self.num_jobs = 0
+        self.lock = threading.Lock()
+        self.executor = ProcessPoolExecutor( max_workers = self.num_workers,
+                                             initializer = _init_worker )
+
+        # Start every worker now rather than on the first jobs
+        for future in [ self.executor.submit( _ping )
+                        for _ in range( self.num_workers ) ]:
+            future.result()
+
+    def run_job ( self, job ):
+        """
+        Runs one job, blocking until it finishes or misses its deadline.
+
+        The job keeps its queue slot until its worker is done with it,
+        even after a reply for a missed deadline.
+
+        Args:
+            job (dict): The decoded JSON job.
+
+        Returns:
+            (tuple[int, dict]): The HTTP status and the JSON reply.
+        """
+
+        with self.lock:
+            if self.num_jobs >= self.max_queue:
+                return 503, { "error": "Job queue is full." }
+            self.num_jobs += 1
+
+        future = None
+
+        try:
+            if not isinstance( job, dict ):
+                raise TypeError( "Job is not a JSON object." )
+
+            deadline = float( job.get( "deadline", self.default_deadline ) )
+            expires = time.time() + deadline
+            future = self.executor.submit( _run_job, job[ "problem" ],
+                                           expires, job.get( "options" ) )
+            try:
+                result = future.result( deadline + DEADLINE_GRACE )
+            except FutureTimeoutError:
+                future.cancel()
+                return 504, { "error": "Job missed its deadline." }
+
+            if result is None:
+                return 504, { "error": "Job expired before it started." }
+
+            return 200, result
+
+        except ( KeyError, TypeError, ValueError ) as e:
+            return 400, { "error": f"Invalid job: {e}" }
+
+        except Exception as e:
+            logger.error( f"Job failed: {e!r}" )
+            return 500, { "error": f"Job failed: {type( e ).__name__}: {e}" }
+
+        finally:
+            if future is None or future.done():
+                self._release()
+            else:
+                future.add_done_callback( self._release )
+
+    def _release ( self, future = None ):
+        """Frees a job's queue slot."""
+        with self.lock:
+            self.num_jobs -= 1
+
+    def get_status ( self ):
+        """Returns the queue occupancy."""
+        with self.lock:
+            return { "jobs": self.num_jobs, "max_queue": self.max_queue,
+                     "workers": self.num_workers }
+
+    def shutdown ( self ):
+        """Stops the worker processes."""
+        self.executor.shutdown()
+
+
+class JobRequestHandler ( BaseHTTPRequestHandler ):
+    """Serves the /optimize and /status endpoints of a JobServer."""
+
+    def do_GET ( self ):
+        if self.path != "/status":
+            self._reply( 404, { "error": "Unknown endpoint." } )
+            return
+
+        self._reply( 200, self.server.job_server.get_status() )
+
+    def do_POST ( self ):
+        if self.path != "/optimize":
+            self._reply( 404, { "error": "Unknown endpoint." } )
+            return
+
+        try:
+            length = int( self.headers[ "Content-Length" ] )
+            job = json.loads( self.rfile.read( length ) )
+        except ( TypeError, ValueError ):
+            self._reply( 400, { "error": "Invalid JSON body." } )
+            return
+
+        self._reply( *self.server.job_server.run_job( job ) )
+
+    def _reply ( self, status, reply ):
+        body = json.dumps( reply ).encode()
+        self.send_response( status )
+        self.send_header( "Content-Type", "application/json" )
+        self.send_header( "Content-Length", str( len( body ) ) )
+        self.end_headers()
+        self.wfile.write( body )
+
+    def address_string ( self ):
+        # UNIX socket clients have no address
+        return str( self.client_address[0] if self.client_address else "" )
+
+    def log_message ( self, format, *args ):
+        logger.info( format % args )
+
+
+class UnixHTTPServer ( socketserver.ThreadingMixIn,
+                       socketserver.UnixStreamServer ):
+    """A threaded HTTP server listening on a UNIX socket."""
+
+    daemon_threads = True
+
+
+class UnixHTTPConnection ( http.client.HTTPConnection ):
+    """An HTTP client connection over a UNIX socket."""
+
+    def __init__ ( self, path, timeout = None ):
+        super().__init__( "localhost", timeout = timeout )
+        self.socket_path = path
+
+    def connect ( self ):
+        self.sock = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM )
+        self.sock.settimeout( self.timeout )
+        self.sock.connect( self.socket_path )
+
+
+def make_server ( job_server, port = 0, socket_path = None ):
+    """
+    Builds an HTTP server for a JobServer.
+
+    Args:
+        job_server (JobServer): The server running the jobs.
+
+        port (int): The localhost port, or 0 for any free port.
+
+        socket_path (str or None): If given, listen on this UNIX
+            socket instead.
+
+    Returns:
+        (socketserver.BaseServer): The server; call serve_forever.
+    """
+
+    if socket_path is not None:
+        if os.path.exists( socket_path ):
+            os.remove( socket_path )
+        server = UnixHTTPServer( socket_path, JobRequestHandler )
+    else:
+        server = ThreadingHTTPServer( ( "127.0.0.1", port ),
+                                      JobRequestHandler )
+
+    server.job_server = job_server
+    return server
+
+
+def submit ( circuit, target, port = None, socket_path = None,
+             deadline = None, **kwargs ):
+    """
+    Submits one job to a running server and waits for its result.
+
+    Args:
+        circuit (list[Gate]): The circuit to optimize.
+
+        target (np.ndarray): The target unitary matrix.
+
+        port (int or None): The server's localhost port.
+
+        socket_path (str or None): The server's UNIX socket, used
+            instead of the port if given.
+
+        deadline (float or None): The job's deadline in seconds. If
+            None, the server's default is used.
+
+        kwargs (dict): Passed on to `optimize` by the worker.
+
+    Returns:
+        (tuple[list[Gate], dict]): The optimized circuit and the result.
+    """
+
+    if socket_path is not None:
+        conn = UnixHTTPConnection( socket_path )
+    elif port is not None:
+        conn = http.client.HTTPConnection( "127.0.0.1", port )
+    else:
+        raise ValueError( "Either a port or a socket path is required." )
+
+    job = { "problem": encode_problem( circuit, target ), "options": kwargs }
+    if deadline is not None:
+        job[ "deadline" ] = deadline
+
+    try:
+        conn.request( "POST", "/optimize", json.dumps( job ),
+                      { "Content-Type": "application/json" } )
+        response = conn.getresponse()
+        reply = json.loads( response.read() )
+    finally:
+        conn.close()
+
+    if response.status != 200:
+        raise RuntimeError( f"Job failed ({response.status}): "
+                            + reply.get( "error", "" ) )
+
+    return decode_problem( reply.pop( "circuit" ) )[0], reply
+
+
+def encode_problem ( circuit, target = None ):
+    """Encodes a circuit and target as base64 text."""
+    buffer = io.BytesIO()
+    save_circuit( buffer, circuit, target )
+    return base64.b64encode( buffer.getvalue() ).decode( "ascii" )
+
+
+def decode_problem ( text ):
+    """Decodes a circuit and target from `encode_problem`."""
+    buffer = io.BytesIO( base64.b64decode( text ) )
+    return load_circuit( buffer )[:2]
+
+
+def _init_worker ( ):
+    """Warms up a worker process with a small optimization."""
+    solve( [ Gate( np.identity( 2 ), ( 0, ) ) ], np.identity( 2 ),
+           kwargs = { "min_iters": 0, "max_iters": 2 } )
+
+
+def _ping ( ):
+    """Does nothing; used to start the workers."""
+    return os.getpid()
+
+
+def _run_job ( problem, expires, options ):
+    """
+    Runs one job; runs in a worker process.
+
+    Args:
+        problem (str): The problem from `encode_problem`.
+
+        expires (float): The job's deadline as a `time.time` value.
+
+        options (dict or None): Passed on to `optimize`.
+
+    Returns:
+        (dict or None): The result, or None if the job expired before
+            it started.
+    """
+
+    remaining = expires - time.time()
+
+    if remaining <= 0:
+        logger.info( "Dropped a job past its deadline." )
+        return None
+
+    circuit, target = decode_problem( problem )
+
+    if target is None:
+        raise ValueError( "Problem has no target." )
+
+    circuit, result = solve( circuit, target, remaining, options )
+    result[ "circuit" ] = encode_problem( circuit )
+    return result
+
+
+def main ( argv = None ):
+    """Runs the job server until interrupted."""
+
+    parser = argparse.ArgumentParser( prog = "python -m qfactor.serve",
+                                      description = "Serve circuit "
+                                      "instantiation jobs." )
+
+    parser.add_argument( "-p", "--port", type = int, default = 8420,
+                         help = "Localhost port to listen on." )
+
+    parser.add_argument( "-s", "--socket", default = None,
+                         help = "UNIX socket to listen on instead." )
+
+    parser.add_argument( "-j", "--workers", type = int, default = None,
+                         help = "Number of worker processes." )
+
+    parser.add_argument( "-q", "--max-queue", type = int, default = 64,
+                         help = "Maximum number of accepted jobs." )
+
+    parser.add_argument( "-d", "--deadline", type = float, default = 60.0,
+                         help = "Default job deadline in seconds." )
+
+    args = parser.parse_args( argv )
+    logger.setLevel( logging.INFO )
+
+    job_server = JobServer( args.workers, args.max_queue, args.deadline )
+    server = make_server( job_server, args.port, args.socket )
+    logger.info( f"Serving on {args.socket or args.port}." )
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        job_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
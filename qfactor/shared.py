@@ -0,0 +1,159 @@
+"""
+This module implements zero-copy sharing of problems with worker processes.
+
+A SharedProblems object packs circuits and targets into the flat arrays of
+`qfactor.serialize` and places every array in its own block of
+`multiprocessing.shared_memory`. Pickling it sends only the block names,
+shapes and dtypes, so passing it to a worker costs the same for any
+target size. The worker attaches to the blocks and reads targets as
+read-only views of the shared memory, with nothing copied.
+"""
+
+import logging
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from qfactor.optimize import optimize
+from qfactor.serialize import _pack, _unpack_circuit, _unpack_target
+
+
+logger = logging.getLogger( "qfactor" )
+
+
+class SharedProblems():
+    """A SharedProblems object holds problems in shared memory."""
+
+    def __init__ ( self, circuits, targets = None ):
+        """
+        SharedProblems Constructor
+
+        The creating process owns the shared memory and must call
+        `close` (or use a with block) to free it.
+
+        Args:
+            circuits (list[list[Gate]]): The problems' circuits.
+
+            targets (list[np.ndarray or None] or None): The problems'
+                target unitaries.
+        """
+
+        if targets is None:
+            targets = [ None ] * len( circuits )
+
+        if len( targets ) != len( circuits ):
+            raise ValueError( "Circuits and targets lengths differ." )
+
+        self.owner = True
+        self.blocks = {}
+        self.specs = {}
+        self.arrays = {}
+
+        for name, array in _pack( circuits, targets ).items():
+            size = max( array.nbytes, 1 )
+            block = shared_memory.SharedMemory( create = True, size = size )
+            view = np.ndarray( array.shape, array.dtype, block.buf )
+            view[...] = array
+            view.flags.writeable = False
+            self.blocks[ name ] = block
+            self.specs[ name ] = ( block.name, array.shape, array.dtype.str )
+            self.arrays[ name ] = view
+
+        logger.debug( f"Shared {len( circuits )} problems." )
+
+    def get_circuit ( self, index ):
+        """Rebuilds the circuit at index; gates are small copies."""
+        return _unpack_circuit( self.arrays, self._check_index( index ) )
+
+    def get_target ( self, index ):
+        """Returns a read-only view of the target at index, or None."""
+        return _unpack_target( self.arrays, self._check_index( index ),
+                               copy = False )
+
+    def _check_index ( self, index ):
+        """Validates a problem index."""
+
+        if not isinstance( index, ( int, np.integer ) ):
+            raise TypeError( "Invalid problem index." )
+
+        if index < 0 or index >= len( self ):
+            raise IndexError( "Problem index out of range." )
+
+        return int( index )
+
+    def close ( self ):
+        """
+        Detaches from the shared memory, freeing it if owned.
+
+        Target views returned by this object must be released first.
+        """
+
+        # Views must go before the blocks can be closed
+        self.arrays = {}
+
+        for block in self.blocks.values():
+            block.close()
+            if self.owner:
+                block.unlink()
+
+        self.blocks = {}
+
+    def __getitem__ ( self, index ):
+        """Returns the circuit and target view at index."""
+        return self.get_circuit( index ), self.get_target( index )
+
+    def __len__ ( self ):
+        """Returns the number of problems."""
+        return len( self.arrays[ "circuit_offsets" ] ) - 1
+
+    def __enter__ ( self ):
+        return self
+
+    def __exit__ ( self, *args ):
+        self.close()
+
+    def __getstate__ ( self ):
+        """Sends only the shared memory specs."""
+        return { "specs": self.specs }
+
+    def __setstate__ ( self, state ):
+        """Attaches to the shared memory blocks."""
+
+        self.owner = False
+        self.specs = state[ "specs" ]
+        self.blocks = {}
+        self.arrays = {}
+
+        for name, ( block_name, shape, dtype ) in self.specs.items():
+            block = shared_memory.SharedMemory( name = block_name )
+            view = np.ndarray( shape, np.dtype( dtype ), block.buf )
+            view.flags.writeable = False
+            self.blocks[ name ] = block
+            self.arrays[ name ] = view
+
+
+def optimize_shared ( problems, index, **kwargs ):
+    """
+    Optimizes one shared problem; meant to run in a worker process.
+
+    Args:
+        problems (SharedProblems): The shared problems.
+
+        index (int): The problem to optimize.
+
+        kwargs (dict): Passed on to `optimize`.
+
+    Returns:
+        (list[Gate]): The optimized circuit.
+    """
+
+    circuit, target = problems[ index ]
+
+    try:
+        circuit = optimize( circuit, target, **kwargs )
+    finally:
+        del target
+        if not problems.owner:
+            problems.close()
+
+    return circuit
@@ -0,0 +1,236 @@
+"""
+This module implements circuit simulation utilities.
+
+`apply_circuit` pushes a state vector, or a batch of them, through a
+circuit one gate at a time, so checking a result on a few states costs
+O(L * 2^n) per state instead of the 4^n entries of the circuit's
+unitary. `circuit_unitary` builds the unitary when it is needed, and
+`estimate_distance` estimates a circuit's distance to a target from a
+few random probe states without either unitary.
+
+Gates are applied in place by `apply_gate`. Diagonal gates, such as
+RzGate, are a broadcast multiply, and permutations with phases, such as
+CnotGate, are a gather; only other gates use a matrix product.
+"""
+
+import logging
+from statistics import NormalDist
+
+import numpy as np
+
+from qfactor import utils
+from qfactor.gates import Gate
+from qfactor.tensors import apply_matrix, get_num_qubits
+
+
+logger = logging.getLogger( "qfactor" )
+
+
+def circuit_unitary ( circuit, num_qubits = None ):
+    """
+    Calculates the unitary matrix of a circuit.
+
+    Args:
+        circuit (list[Gate]): The circuit.
+
+        num_qubits (int or None): The number of qubits. If None, it is
+            inferred from the gates' locations.
+
+    Returns:
+        (np.ndarray): The circuit's unitary matrix.
+    """
+
+    num_qubits = get_num_qubits( _check_circuit( circuit ), [], num_qubits )
+    utry = np.identity( 2 ** num_qubits, dtype = np.complex128 )
+    return apply_circuit( circuit, utry, out = utry )
+
+
+def apply_circuit ( circuit, states, out = None ):
+    """
+    Applies a circuit to a state vector or a batch of them.
+
+    Args:
+        circuit (list[Gate]): The circuit.
+
+        states (np.ndarray): A state vector of length 2^n, or a batch
+            of them as the columns of a (2^n, k) matrix.
+
+        out (np.ndarray or None): Where to write the result, with the
+            shape of states. It may be states itself. If None, a new
+            array is returned.
+
+    Returns:
+        (np.ndarray): The resulting states.
+    """
+
+    _check_circuit( circuit )
+    states = np.asarray( states )
+
+    if states.ndim not in ( 1, 2 ):
+        raise TypeError( "States are not a vector or a matrix." )
+
+    num_qubits = int( np.log2( states.shape[0] ) )
+
+    if 2 ** num_qubits != states.shape[0]:
+        raise ValueError( "State length is not a power of two." )
+
+    if not all( [ max( gate.location ) < num_qubits for gate in circuit ] ):
+        raise ValueError( "Gate location mismatch with states." )
+
+    if out is None:
+        out = np.array( states, np.result_type( states, np.complex64 ) )
+
+    else:
+        if out.shape != states.shape or not out.flags.c_contiguous:
+            raise ValueError( "Invalid output buffer." )
+
+        if out is not states:
+            out[...] = states
+
+    tensor = out.reshape( [2] * num_qubits + [-1] )
+
+    for gate in circuit:
+        apply_gate( tensor, gate.utry, list( gate.location ) )
+
+    return out
+
+
+def apply_gate ( tensor, utry, axes ):
+    """
+    Applies a matrix to a set of tensor indices in place.
+
+    Same as `apply_matrix`, but the tensor is overwritten, and diagonal
+    and phased permutation matrices are applied without a product.
+
+    Args:
+        tensor (np.ndarray): The tensor to apply to, overwritten.
+
+        utry (np.ndarray): The matrix to apply.
+
+        axes (list[int]): The tensor indices to apply to.
+    """
+
+    size = len( axes )
+    rows = np.arange( 2 ** size )
+    perm = np.argmax( np.abs( utry ), axis = 1 )
+    phases = utry[ rows, perm ]
+
+    if np.count_nonzero( utry ) != 2 ** size or np.any( phases == 0 ):
+        tensor[...] = apply_matrix( tensor, utry, axes )
+        return
+
+    if np.array_equal( perm, rows ):
+        # Diagonal: broadcast over the other indices
+        shape = [1] * tensor.ndim
+        for x in axes:
+            shape[x] = 2
+        diag = phases.reshape( [2] * size ).transpose( np.argsort( axes ) )
+        tensor *= diag.reshape( shape )
+        return
+
+    # Phased permutation: out[i] = phases[i] * in[perm[i]]
+    view = np.moveaxis( tensor, axes, list( range( size ) ) )
+    gathered = view.reshape( ( 2 ** size, -1 ) )[ perm ]
+
+    if np.any( phases != 1 ):
+        gathered *= phases[ :, None ]
+
+    view[...] = gathered.reshape( view.shape )
+
+
+def estimate_distance ( circuit, target, tol = 1e-3, confidence = 0.95,
+                        min_probes = 8, max_probes = 1024, seed = None ):
+    """
+    Estimates the distance between the circuit and the target.
+
+    The trace Tr(U_t^dagger C) is estimated Hutchinson-style as the mean
+    of <U_t z|C z> over probe states z with random-phase entries. Probes
+    are added in batches until the confidence interval of the distance
+    is within tol. Each probe costs O(L * 2^n) for a target circuit. The
+    estimate is exact for a circuit equal to the target up to a phase.
+
+    Args:
+        circuit (list[Gate]): The circuit.
+
+        target (np.ndarray or list[Gate]): The unitary target, or a
+            circuit implementing it.
+
+        tol (float): The wanted half-width of the confidence interval.
+
+        confidence (float): The confidence level of the interval.
+
+        min_probes (int): The number of probes in the first batch.
+
+        max_probes (int): Stop at this many probes even if the interval
+            is wider than tol.
+
+        seed (int or None): Seed for the probe states.
+
+    Returns:
+        (tuple[float, float]): The estimated distance and the half-width
+            of its confidence interval.
+    """
+
+    _check_circuit( circuit )
+
+    if not isinstance( tol, float ) or tol <= 0:
+        raise TypeError( "Invalid tolerance." )
+
+    if not isinstance( confidence, float ) or not 0 < confidence < 1:
+        raise TypeError( "Invalid confidence level." )
+
+    if not isinstance( min_probes, int ) or min_probes < 2:
+        raise TypeError( "Invalid minimum number of probes." )
+
+    if not isinstance( max_probes, int ) or max_probes < min_probes:
+        raise TypeError( "Invalid maximum number of probes." )
+
+    if isinstance( target, list ):
+        num_qubits = get_num_qubits( _check_circuit( target ), circuit )
+    elif utils.is_unitary( target ):
+        num_qubits = utils.get_num_qubits( target )
+    else:
+        raise TypeError( "The target matrix is not unitary." )
+
+    num_elems = 2 ** num_qubits
+    quantile = NormalDist().inv_cdf( 0.5 + confidence / 2 )
+    rng = np.random.default_rng( seed )
+    samples = np.zeros( 0, dtype = np.complex128 )
+    batch = min_probes
+
+    while True:
+        probes = np.exp( 2j * np.pi * rng.random( ( num_elems, batch ) ) )
+        outs = apply_circuit( circuit, probes )
+
+        if isinstance( target, list ):
+            apply_circuit( target, probes, out = probes )
+        else:
+            probes = target @ probes
+
+        samples = np.append( samples, np.sum( probes.conj() * outs, 0 ) )
+
+        # Radius of the mean's confidence disc, scaled to a distance
+        mean = np.mean( samples )
+        error = np.sqrt( np.sum( np.abs( samples - mean ) ** 2 )
+                         / ( len( samples ) - 1 ) / len( samples ) )
+        half_width = quantile * error / num_elems
+
+        if half_width <= tol or len( samples ) >= max_probes:
+            break
+
+        batch = min( len( samples ), max_probes - len( samples ) )
+
+    logger.debug( f"Estimated distance from {len( samples )} probes." )
+    return 1 - ( np.abs( mean ) / num_elems ), half_width
+
+
+def _check_circuit ( circuit ):
+    """Validates a circuit, returning it."""
+
+    if not isinstance( circuit, list ):
+        raise TypeError( "Circuit is not a list of gates." )
+
+    if not all( [ isinstance( gate, Gate ) for gate in circuit ] ):
+        raise TypeError( "Circuit is not a list of gates." )
+
+    return circuit
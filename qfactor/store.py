@@ -0,0 +1,257 @@
+"""
+This module implements a persistent on-disk solution store.
+
+Solved circuits are kept in a SQLite database, serialized with
+`qfactor.serialize`, and keyed by a hash of the circuit structure, a hash
+of the target and the requested distance tolerance. Only solutions
+within their tolerance are stored, so a stored solution is valid
+whatever optimize options produced it. Every process opens
+its own connection, and the database runs in write-ahead-log mode, so
+worker processes on one node can read and write the same store at once.
+The total size of the stored solutions is bounded by evicting the least
+recently used entries.
+"""
+
+import io
+import os
+import time
+import hashlib
+import logging
+import sqlite3
+
+import numpy as np
+
+from qfactor.gates import Gate
+from qfactor.serialize import save_circuit, load_circuit
+from qfactor.optimize import optimize, get_distance
+
+
+logger = logging.getLogger( "qfactor" )
+
+
+class SolutionStore():
+    """A SolutionStore persists solved circuits across processes."""
+
+    def __init__ ( self, path, max_bytes = 2 ** 30, timeout = 60.0 ):
+        """
+        SolutionStore Constructor
+
+        Args:
+            path (str): The SQLite database file, created if needed.
+
+            max_bytes (int): The maximum total size of stored solutions.
+                Least recently used solutions are evicted beyond it.
+
+            timeout (float): Seconds to wait for another process's lock.
+        """
+
+        if not isinstance( max_bytes, int ) or max_bytes <= 0:
+            raise TypeError( "Invalid maximum store size." )
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._conn = None
+        self._pid = None
+
+        with self._connect() as conn:
+            conn.execute( "CREATE TABLE IF NOT EXISTS solutions ("
+                          " structure TEXT, target TEXT, tol REAL,"
+                          " distance REAL, size INTEGER, accessed REAL,"
+                          " circuit BLOB,"
+                          " PRIMARY KEY ( structure, target, tol ) )" )
+
+    def get ( self, circuit, target, tol ):
+        """
+        Looks up a stored solution.
+
+        A solution matches if it was stored for the same structure and
+        target with a distance within the tolerance. The closest match
+        is returned.
+
+        Args:
+            circuit (list[Gate]): The circuit to solve; only its
+                structure is used.
+
+            target (np.ndarray): The target unitary.
+
+            tol (float): The requested distance tolerance.
+
+        Returns:
+            (list[Gate] or None): The stored solution, if there is one.
+        """
+
+        structure = get_structure_hash( circuit )
+        target = get_target_hash( target )
+
+        with self._connect() as conn:
+            row = conn.execute( "SELECT rowid, circuit FROM solutions"
+                                " WHERE structure = ? AND target = ?"
+                                " AND distance <= ?"
+                                " ORDER BY distance LIMIT 1",
+                                ( structure, target, tol ) ).fetchone()
+
+            if row is None:
+                return None
+
+            conn.execute( "UPDATE solutions SET accessed = ? WHERE rowid = ?",
+                          ( time.time(), row[0] ) )
+
+        solution, _, _ = load_circuit( io.BytesIO( row[1] ) )
+        return solution
+
+    def put ( self, circuit, target, tol, distance ):
+        """
+        Stores a solution within its tolerance.
+
+        Solutions outside the tolerance are not stored. A solution
+        stored under the same key is only replaced by a closer one.
+
+        Args:
+            circuit (list[Gate]): The solved circuit.
+
+            target (np.ndarray): The target unitary.
+
+            tol (float): The requested distance tolerance.
+
+            distance (float): The solution's distance from the target.
+        """
+
+        if distance > tol:
+            logger.debug( "Solution outside its tolerance, not stored." )
+            return
+
+        buffer = io.BytesIO()
+        save_circuit( buffer, circuit )
+        blob = buffer.getvalue()
+
+        if len( blob ) > self.max_bytes:
+            logger.warning( "Solution larger than the store, not stored." )
+            return
+
+        with self._connect() as conn:
+            conn.execute( "INSERT INTO solutions VALUES"
+                          " ( ?, ?, ?, ?, ?, ?, ? )"
+                          " ON CONFLICT ( structure, target, tol ) DO UPDATE"
+                          " SET distance = excluded.distance,"
+                          " size = excluded.size,"
+                          " accessed = excluded.accessed,"
+                          " circuit = excluded.circuit"
+                          " WHERE excluded.distance < solutions.distance",
+                          ( get_structure_hash( circuit ),
+                            get_target_hash( target ), tol, float( distance ),
+                            len( blob ), time.time(), blob ) )
+            self._evict( conn )
+
+    def _evict ( self, conn ):
+        """Deletes least recently used solutions beyond max_bytes."""
+
+        total = conn.execute( "SELECT TOTAL( size ) FROM solutions" )
+        total = total.fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = conn.execute( "SELECT rowid, size FROM solutions"
+                             " ORDER BY accessed" ).fetchall()
+        evicted = []
+        for rowid, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append( ( rowid, ) )
+            total -= size
+
+        conn.executemany( "DELETE FROM solutions WHERE rowid = ?", evicted )
+        logger.info( f"Evicted {len( evicted )} solutions from the store." )
+
+    def _connect ( self ):
+        """Returns this process's connection, opening it if needed."""
+
+        # Connections must not be shared across forked processes
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect( self.path, timeout = self.timeout )
+            self._conn.execute( "PRAGMA journal_mode = WAL" )
+            self._pid = os.getpid()
+
+        return self._conn
+
+    def __len__ ( self ):
+        """Returns the number of stored solutions."""
+        conn = self._connect()
+        return conn.execute( "SELECT COUNT( * ) FROM solutions" ).fetchone()[0]
+
+    def __getstate__ ( self ):
+        """Drops the connection when sent to another process."""
+        state = self.__dict__.copy()
+        state[ "_conn" ] = None
+        state[ "_pid" ] = None
+        return state
+
+
+def get_structure_hash ( circuit ):
+    """
+    Hashes a circuit's structure.
+
+    The structure is the gate types, locations and fixed flags, and the
+    unitaries of fixed gates. Free gate values are ignored.
+
+    Args:
+        circuit (list[Gate]): The circuit to hash.
+
+    Returns:
+        (str): The hex digest.
+    """
+
+    if not isinstance( circuit, list ):
+        raise TypeError( "The circuit argument is not a list of gates." )
+
+    if not all( [ isinstance( g, Gate ) for g in circuit ] ):
+        raise TypeError( "The circuit argument is not a list of gates." )
+
+    digest = hashlib.sha256()
+    for gate in circuit:
+        digest.update( repr( ( type( gate ).__name__, tuple( gate.location ),
+                               gate.fixed ) ).encode() )
+        if gate.fixed:
+            utry = np.ascontiguousarray( gate.utry, dtype = np.complex128 )
+            digest.update( utry.tobytes() )
+    return digest.hexdigest()
+
+
+def get_target_hash ( target ):
+    """Hashes a target unitary by its double-precision entries."""
+    target = np.ascontiguousarray( target, dtype = np.complex128 )
+    digest = hashlib.sha256( repr( target.shape ).encode() )
+    digest.update( target.tobytes() )
+    return digest.hexdigest()
+
+
+def optimize_cached ( circuit, target, store, **kwargs ):
+    """
+    Optimize a circuit, serving repeated problems from a store.
+
+    The store is consulted with the dist_tol of kwargs before solving,
+    and the result is recorded after if it is within dist_tol.
+
+    Args:
+        circuit (list[Gate]): The circuit to optimize.
+
+        target (np.ndarray): The target unitary matrix.
+
+        store (SolutionStore): The solution store.
+
+        kwargs (dict): Passed on to `optimize`.
+
+    Returns:
+        (list[Gate]): The optimized circuit.
+    """
+
+    tol = kwargs.get( "dist_tol", 1e-10 )
+    solution = store.get( circuit, target, tol )
+
+    if solution is not None:
+        logger.info( "Solution served from the store." )
+        return solution
+
+    circuit = optimize( circuit, target, **kwargs )
+    store.put( circuit, target, tol, get_distance( circuit, target ) )
+    return circuit
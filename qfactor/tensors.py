@@ -1,6 +1,7 @@
 """This module implements the CircuitTensor class."""
 
 import logging
+import itertools
 
 import numpy as np
 
@@ -10,20 +11,47 @@ from qfactor.gates import Gate
 logger = logging.getLogger( "qfactor" )
 
 
+# Smallest tensor, in qubits, worth splitting across threads
+MIN_CHUNK_QUBITS = 7
+
+
 class CircuitTensor():
     """A CircuitTensor tracks an entire circuit as a tensor."""
 
-    def __init__ ( self, utry_target, gate_list ):
+    def __init__ ( self, utry_target, gate_list, dtype = None,
+                   executor = None, num_chunks = 8, num_qubits = None ):
         """
         CircuitTensor Constructor
 
         Args:
-            utry_target (np.ndarray): Unitary target matrix
+            utry_target (np.ndarray or list[Gate]): Unitary target
+                matrix, or a circuit implementing it. A circuit's gates
+                are applied directly, without forming its matrix.
 
             gate_list (list[Gate]): The circuit's gate list.
+
+            dtype (np.dtype or None): If given, the tensor and every
+                applied gate are cast to this type. A real type requires
+                real gates, their imaginary parts are dropped.
+
+            executor (Executor or None): If given, a thread pool that
+                gate applications and environment calculations on
+                tensors of MIN_CHUNK_QUBITS or more qubits are split
+                across. NumPy releases the GIL for the chunks' work.
+
+            num_chunks (int): The number of chunks to split into,
+                rounded up to a power of two.
+
+            num_qubits (int or None): The number of qubits. Only used
+                for a target circuit; if None, it is inferred from the
+                gates' locations.
         """
 
-        if not utils.is_unitary( utry_target ):
+        if isinstance( utry_target, list ):
+            if not all( [ isinstance( g, Gate ) for g in utry_target ] ):
+                raise TypeError( "Target circuit contains non-gate objects." )
+
+        elif not self._is_unitary_target( utry_target ):
             raise TypeError( "Specified target matrix is not unitary." )
 
         if not isinstance( gate_list, list ):
@@ -33,21 +61,40 @@ class CircuitTensor():
             raise TypeError( "Gate list contains non-gate objects." )
 
         self.utry_target = utry_target
-        self.num_qubits = utils.get_num_qubits( self.utry_target )
+        self.num_qubits = get_num_qubits( utry_target, gate_list, num_qubits )
 
         if not all( [ utils.is_valid_location( gate.location, self.num_qubits )
                       for gate in gate_list ] ):
             raise ValueError( "Gate location mismatch with circuit tensor." )
 
+        if not isinstance( num_chunks, int ) or num_chunks <= 0:
+            raise TypeError( "Invalid number of chunks." )
+
         self.gate_list = gate_list
+        self.dtype = dtype
+        self.executor = executor
+        self.num_chunks = num_chunks
         self.reinitialize()
 
+    def _is_unitary_target ( self, utry_target ):
+        """Returns true if a target matrix is unitary."""
+        return utils.is_unitary( utry_target )
+
     def reinitialize ( self ):
         """Reconstruct the circuit tensor."""
         logger.debug( "Reinitializing CircuitTensor" )
 
-        self.tensor = self.utry_target.conj().T
-        self.tensor = self.tensor.reshape( [2] * 2 * self.num_qubits )
+        if isinstance( self.utry_target, list ):
+            self.tensor = np.identity( 2 ** self.num_qubits, self.dtype )
+            self.tensor = self.tensor.reshape( [2] * 2 * self.num_qubits )
+
+            # The inverse target is the target gates' inverses, in order
+            for gate in self.utry_target:
+                self.apply_left( gate, inverse = True )
+
+        else:
+            self.tensor = self._cast( self.utry_target.conj().T )
+            self.tensor = self.tensor.reshape( [2] * 2 * self.num_qubits )
 
         for gate in self.gate_list:
             self.apply_right( gate )
@@ -61,6 +108,10 @@ class CircuitTensor():
         # print( paulis[0] )
         return utry
 
+    def calc_trace ( self ):
+        """Calculates the trace of this circuit tensor's unitary."""
+        return np.trace( self.utry )
+
     def apply_right ( self, gate, inverse = False ):
         """
         Apply the specified gate on the right of the circuit.
@@ -88,7 +139,14 @@ class CircuitTensor():
         mid_perm = [ x for x in range( self.num_qubits ) if x not in gate.location ]
         right_perm = [ x + self.num_qubits for x in range( self.num_qubits ) ]
 
-        utry = gate.utry.conj().T if inverse else gate.utry
+        utry = gate.inverse_utry if inverse else gate.utry
+        utry = self._cast( utry )
+
+        if self._is_chunked():
+            self.tensor = apply_matrix_chunked( self.tensor, utry, left_perm,
+                                                self.executor,
+                                                self.num_chunks )
+            return
 
         perm = left_perm + mid_perm + right_perm
         self.tensor = self.tensor.transpose( perm )
@@ -127,7 +185,15 @@ class CircuitTensor():
         mid_perm = [ x + self.num_qubits for x in left_perm if x not in gate.location ]
         right_perm = [ x + self.num_qubits for x in gate.location ]
 
-        utry = gate.utry.conj().T if inverse else gate.utry
+        utry = gate.inverse_utry if inverse else gate.utry
+        utry = self._cast( utry )
+
+        if self._is_chunked():
+            # Multiplying on the right contracts the matrix's row index
+            self.tensor = apply_matrix_chunked( self.tensor, utry.T,
+                                                right_perm, self.executor,
+                                                self.num_chunks )
+            return
 
         perm = left_perm + mid_perm + right_perm
         self.tensor = self.tensor.transpose( perm )
@@ -138,6 +204,22 @@ class CircuitTensor():
         inv_perm = np.argsort( perm )
         self.tensor = self.tensor.transpose( inv_perm )
 
+    def _is_chunked ( self ):
+        """Returns true if work is split across the executor's threads."""
+        return ( self.executor is not None and self.num_chunks > 1
+                 and self.num_qubits >= MIN_CHUNK_QUBITS )
+
+    def _cast ( self, utry ):
+        """Casts a matrix to the tensor's dtype, if one is set."""
+
+        if self.dtype is None or utry.dtype == self.dtype:
+            return utry
+
+        if not np.issubdtype( self.dtype, np.complexfloating ):
+            utry = utry.real
+
+        return utry.astype( self.dtype )
+
     def calc_env_matrix ( self, location ):
         """
         Calculates the environmental matrix of the tensor with
@@ -151,6 +233,10 @@ class CircuitTensor():
             (np.ndarray): The environmental matrix.
         """
 
+        if self._is_chunked():
+            return calc_env_chunked( self.tensor, location, self.executor,
+                                     self.num_chunks )
+
         left_perm = list( range( self.num_qubits ) )
         left_perm = [ x for x in left_perm if x not in location ]
         left_perm = left_perm + [ x + self.num_qubits for x in left_perm ]
@@ -165,3 +251,191 @@ class CircuitTensor():
                              2 ** len( location ) ) )
         return np.trace( a )
 
+
+
+def get_num_qubits ( target, circuit, num_qubits = None ):
+    """
+    Returns the number of qubits of a problem.
+
+    Args:
+        target (np.ndarray or list[Gate]): The unitary target, or a
+            circuit implementing it.
+
+        circuit (list[Gate]): The circuit.
+
+        num_qubits (int or None): The number of qubits, if known. It
+            must match a target matrix.
+
+    Returns:
+        (int): The number of qubits.
+    """
+
+    if not isinstance( target, list ):
+        if num_qubits not in ( None, utils.get_num_qubits( target ) ):
+            raise ValueError( "Number of qubits mismatch with target." )
+
+        return utils.get_num_qubits( target )
+
+    if num_qubits is not None:
+        if not isinstance( num_qubits, int ) or num_qubits <= 0:
+            raise TypeError( "Invalid number of qubits." )
+
+        if not all( [ utils.is_valid_location( g.location, num_qubits )
+                      for g in target ] ):
+            raise ValueError( "Gate location mismatch with circuit tensor." )
+
+        return num_qubits
+
+    return 1 + max( [ max( g.location, default = -1 )
+                      for g in target + circuit ], default = 0 )
+
+
+def apply_matrix ( tensor, matrix, axes ):
+    """
+    Contracts a matrix into a set of tensor indices.
+
+    The result has the matrix's row index in place of the contracted
+    indices, the first axis being the most significant:
+        out[..., a, ...] = sum_b matrix[a, b] * tensor[..., b, ...]
+
+    Args:
+        tensor (np.ndarray): The tensor to contract into.
+
+        matrix (np.ndarray): The matrix to contract.
+
+        axes (list[int]): The tensor indices to contract with.
+
+    Returns:
+        (np.ndarray): The contracted tensor, with the same shape.
+    """
+
+    others = [ x for x in range( tensor.ndim ) if x not in axes ]
+    perm = list( axes ) + others
+    shape = [ tensor.shape[x] for x in perm ]
+
+    tensor = tensor.transpose( perm )
+    tensor = tensor.reshape( ( matrix.shape[1], -1 ) )
+    tensor = matrix @ tensor
+
+    tensor = tensor.reshape( shape )
+    return tensor.transpose( np.argsort( perm ) )
+
+
+def apply_matrix_chunked ( tensor, matrix, axes, executor, num_chunks,
+                           out = None ):
+    """
+    Contracts a matrix into a set of tensor indices in chunks.
+
+    Same as `apply_matrix`, but the tensor is split along its leading
+    uncontracted indices into chunks that are contracted separately,
+    in parallel on the executor's threads if one is given.
+
+    Args:
+        tensor (np.ndarray): The tensor to contract into.
+
+        matrix (np.ndarray): The matrix to contract.
+
+        axes (list[int]): The tensor indices to contract with.
+
+        executor (Executor or None): The thread pool running the
+            chunks. If None, the chunks run one after another.
+
+        num_chunks (int): The number of chunks, rounded up to a power
+            of two and limited by the uncontracted indices.
+
+        out (np.ndarray or None): Where to write the result. It may be
+            the tensor itself, as every chunk is read before it is
+            written.
+
+    Returns:
+        (np.ndarray): The contracted tensor, with the same shape.
+    """
+
+    others = [ x for x in range( tensor.ndim ) if x not in axes ]
+    split = others[ : _get_num_split( num_chunks, len( others ) ) ]
+    sub_axes = [ x - sum( y < x for y in split ) for x in axes ]
+
+    if out is None:
+        out = np.empty( tensor.shape, np.result_type( tensor, matrix ) )
+
+    def contract ( index ):
+        key = [ slice( None ) ] * tensor.ndim
+        for x, i in zip( split, index ):
+            key[x] = i
+        key = tuple( key )
+        out[ key ] = apply_matrix( tensor[ key ], matrix, sub_axes )
+
+    list( _map( executor, contract, _get_chunk_indices( tensor, split ) ) )
+    return out
+
+
+def calc_env_chunked ( tensor, location, executor, num_chunks ):
+    """
+    Calculates an environmental matrix in chunks.
+
+    The partial trace is split over the leading traced qubits: every
+    chunk fixes their output and input indices to the same value, traces
+    out the rest, and the chunks' results are summed.
+
+    Args:
+        tensor (np.ndarray): A circuit tensor with 2n indices.
+
+        location (iterable): Calculate the environment for this
+            set of qubits.
+
+        executor (Executor or None): The thread pool running the
+            chunks. If None, the chunks run one after another.
+
+        num_chunks (int): The number of chunks, rounded up to a power
+            of two and limited by the traced qubits.
+
+    Returns:
+        (np.ndarray): The environmental matrix.
+    """
+
+    num_qubits = tensor.ndim // 2
+    location = list( location )
+
+    if not all( 0 <= x < num_qubits for x in location ):
+        raise ValueError( "Invalid location for the tensor." )
+
+    traced = [ x for x in range( num_qubits ) if x not in location ]
+    split = traced[ : _get_num_split( num_chunks, len( traced ) ) ]
+    sub_location = [ x - sum( y < x for y in split ) for x in location ]
+    sub_traced = [ x - sum( y < x for y in split )
+                   for x in traced if x not in split ]
+    sub_qubits = num_qubits - len( split )
+
+    def trace ( index ):
+        key = [ slice( None ) ] * tensor.ndim
+        for x, i in zip( split, index ):
+            key[x] = i
+            key[ x + num_qubits ] = i
+        a = tensor[ tuple( key ) ]
+        perm = ( sub_traced + [ x + sub_qubits for x in sub_traced ]
+                 + sub_location + [ x + sub_qubits for x in sub_location ] )
+        a = np.transpose( a, perm )
+        a = np.reshape( a, ( 2 ** len( sub_traced ), 2 ** len( sub_traced ),
+                             2 ** len( location ), 2 ** len( location ) ) )
+        return np.trace( a )
+
+    return sum( _map( executor, trace, _get_chunk_indices( tensor, split ) ) )
+
+
+def _map ( executor, fn, iterable ):
+    """Maps fn over iterable on the executor, or here if it is None."""
+
+    if executor is None:
+        return map( fn, iterable )
+
+    return executor.map( fn, iterable )
+
+
+def _get_num_split ( num_chunks, num_axes ):
+    """Returns how many qubit indices to split along for num_chunks."""
+    return min( int( np.ceil( np.log2( num_chunks ) ) ), num_axes )
+
+
+def _get_chunk_indices ( tensor, split ):
+    """Returns every index combination of the split tensor indices."""
+    return itertools.product( *[ range( tensor.shape[x] ) for x in split ] )
@@ -0,0 +1,196 @@
+"""
+This module implements BLAS thread budgeting for pools of workers.
+
+Every process running optimize uses a BLAS library that, by default,
+starts one thread per core. With several worker processes per node this
+oversubscribes the machine, and the small matrix products of a
+CircuitTensor slow down. The policy here splits the node's cores between
+the workers and gives each worker only as many BLAS threads as its
+problem size can use: small problems run single-threaded in many
+processes, large ones multi-threaded in few. Workers can also be pinned
+to their share of the cores.
+
+Limiting a running BLAS library requires the optional threadpoolctl
+package. Without it, only the thread environment variables are set,
+which affects processes started afterwards.
+"""
+
+import os
+import logging
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:
+    threadpool_limits = None
+
+
+logger = logging.getLogger( "qfactor" )
+
+
+# Unitary entries, 4^n, worth one BLAS thread
+ENTRIES_PER_THREAD = 4 ** 7
+
+THREAD_ENV_VARS = ( "OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS",
+                    "MKL_NUM_THREADS", "BLIS_NUM_THREADS" )
+
+
+def get_cores ( ):
+    """Returns the sorted cores this process may run on."""
+
+    if hasattr( os, "sched_getaffinity" ):
+        return sorted( os.sched_getaffinity( 0 ) )
+
+    return list( range( os.cpu_count() or 1 ) )
+
+
+def get_blas_threads ( num_qubits, num_workers = 1, num_cores = None ):
+    """
+    Picks the number of BLAS threads for one worker.
+
+    Args:
+        num_qubits (int): The problem size in qubits.
+
+        num_workers (int): The number of workers sharing the node.
+
+        num_cores (int or None): The number of cores. If None, use
+            the cores this process may run on.
+
+    Returns:
+        (int): The number of BLAS threads, at least 1.
+    """
+
+    if not isinstance( num_qubits, int ) or num_qubits < 0:
+        raise TypeError( "Invalid number of qubits." )
+
+    if not isinstance( num_workers, int ) or num_workers <= 0:
+        raise TypeError( "Invalid number of workers." )
+
+    if num_cores is None:
+        num_cores = len( get_cores() )
+
+    budget = max( 1, num_cores // num_workers )
+    wanted = max( 1, ( 4 ** num_qubits ) // ENTRIES_PER_THREAD )
+    return min( budget, wanted )
+
+
+def get_num_workers ( num_qubits, num_cores = None ):
+    """
+    Picks how many workers to run on a node for a problem size.
+
+    Each worker gets as many cores as `get_blas_threads` would use
+    without a worker limit.
+
+    Args:
+        num_qubits (int): The problem size in qubits.
+
+        num_cores (int or None): The number of cores. If None, use
+            the cores this process may run on.
+
+    Returns:
+        (int): The number of workers, at least 1.
+    """
+
+    if num_cores is None:
+        num_cores = len( get_cores() )
+
+    threads = get_blas_threads( num_qubits, 1, num_cores )
+    return max( 1, num_cores // threads )
+
+
+def set_blas_threads ( num_threads ):
+    """
+    Limits this process's BLAS threads.
+
+    Args:
+        num_threads (int): The number of BLAS threads.
+
+    Returns:
+        (bool): True if the running BLAS library was limited, false if
+            only the environment was set since threadpoolctl is missing.
+    """
+
+    if not isinstance( num_threads, int ) or num_threads <= 0:
+        raise TypeError( "Invalid number of threads." )
+
+    for var in THREAD_ENV_VARS:
+        os.environ[ var ] = str( num_threads )
+
+    if threadpool_limits is None:
+        logger.debug( "threadpoolctl is missing, BLAS threads not limited." )
+        return False
+
+    threadpool_limits( limits = num_threads, user_api = "blas" )
+    return True
+
+
+def pin_to_cores ( cores ):
+    """
+    Pins this process to a set of cores, where the platform allows it.
+
+    Args:
+        cores (iterable[int]): The cores to run on.
+
+    Returns:
+        (bool): True if the process was pinned.
+    """
+
+    if not hasattr( os, "sched_setaffinity" ):
+        return False
+
+    os.sched_setaffinity( 0, set( cores ) )
+    return True
+
+
+def make_executor ( num_qubits, num_workers = None, pin = True ):
+    """
+    Builds a process pool whose workers follow the thread budget.
+
+    Every worker limits its BLAS threads with `get_blas_threads` and,
+    if pin is true, is pinned to its own slice of the cores.
+
+    Args:
+        num_qubits (int): The size in qubits of the pool's problems.
+
+        num_workers (int or None): The number of workers. If None, use
+            `get_num_workers`.
+
+        pin (bool): Pin every worker to its own cores.
+
+    Returns:
+        (ProcessPoolExecutor): The process pool.
+    """
+
+    cores = get_cores()
+
+    if num_workers is None:
+        num_workers = get_num_workers( num_qubits, len( cores ) )
+
+    threads = get_blas_threads( num_qubits, num_workers, len( cores ) )
+    counter = mp.Value( "i", 0 )
+    logger.info( f"Starting {num_workers} workers"
+                 f" with {threads} BLAS threads each." )
+
+    return ProcessPoolExecutor( max_workers = num_workers,
+                                initializer = _init_worker,
+                                initargs = ( threads, cores if pin else None,
+                                             counter ) )
+
+
+def _init_worker ( threads, cores, counter ):
+    """Applies the thread budget in a new worker process."""
+
+    set_blas_threads( threads )
+
+    if cores is None:
+        return
+
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+
+    # Wrap around when there are more workers than core slices
+    start = ( index * threads ) % len( cores )
+    pin_to_cores( [ cores[ ( start + j ) % len( cores ) ]
+                    for j in range( threads ) ] )
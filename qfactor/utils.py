@@ -81,12 +81,37 @@ def is_square_matrix ( M ):
     return True
 
 
-def is_unitary ( U, tol = 1e-12 ):
-    """Checks if U is a unitary matrix."""
+def get_unitary_tol ( dtype ):
+    """Returns the default unitary tolerance for matrices of dtype."""
+
+    # Single precision carries about 7 significant digits
+    if np.issubdtype( dtype, np.inexact ) and np.finfo( dtype ).eps > 1e-10:
+        return 1e-5
+
+    return 1e-12
+
+
+def is_unitary ( U, tol = None ):
+    """
+    Checks if U is a unitary matrix.
+
+    Args:
+        U (np.ndarray): The matrix to check.
+
+        tol (float or None): The absolute tolerance on the entries of
+            U U^d and U^d U. If None, it follows U's precision: 1e-12
+            for double and 1e-5 for single precision.
+
+    Returns:
+        (bool): Unitary or not
+    """
 
     if not is_square_matrix( U ):
         return False
 
+    if tol is None:
+        tol = get_unitary_tol( U.dtype )
+
     X = U @ U.conj().T
     Y = U.conj().T @ U
     I = np.identity( X.shape[0] )
@@ -105,3 +130,64 @@ def is_unitary ( U, tol = 1e-12 ):
     
     return True
 
+
+
+def is_unitary_stack ( U, tol = None ):
+    """
+    Checks which matrices in a stack are unitary.
+
+    Args:
+        U (np.ndarray): The (N, d, d) stack of matrices to check.
+
+        tol (float or None): The absolute tolerance, as in is_unitary.
+
+    Returns:
+        (np.ndarray): Boolean array of length N, unitary or not
+    """
+
+    if not isinstance( U, np.ndarray ) or U.ndim != 3:
+        raise TypeError( "Invalid matrix stack." )
+
+    if U.shape[1] != U.shape[2]:
+        raise TypeError( "Invalid matrix stack." )
+
+    if tol is None:
+        tol = get_unitary_tol( U.dtype )
+
+    Ud = U.conj().transpose( ( 0, 2, 1 ) )
+    I = np.identity( U.shape[1] )
+    X = np.abs( U @ Ud - I ).max( axis = ( 1, 2 ), initial = 0 )
+    Y = np.abs( Ud @ U - I ).max( axis = ( 1, 2 ), initial = 0 )
+    return ( X <= tol ) & ( Y <= tol )
+
+
+def random_unitaries ( num_unitaries, dim, seed = None ):
+    """
+    Samples Haar-random unitary matrices in one batch.
+
+    The QR decomposition of a complex Gaussian matrix, with the phases of
+    R's diagonal moved into Q, is distributed by the Haar measure.
+
+    Args:
+        num_unitaries (int): The number of matrices to sample.
+
+        dim (int): The dimension of each matrix.
+
+        seed (int or None): Seed for the random number generator.
+
+    Returns:
+        (np.ndarray): The (num_unitaries, dim, dim) stack of unitaries.
+    """
+
+    if not isinstance( num_unitaries, int ) or num_unitaries < 0:
+        raise TypeError( "Invalid number of unitaries." )
+
+    if not isinstance( dim, int ) or dim <= 0:
+        raise TypeError( "Invalid dimension." )
+
+    rng = np.random if seed is None else np.random.RandomState( seed )
+    shape = ( num_unitaries, dim, dim )
+    Z = rng.standard_normal( shape ) + 1j * rng.standard_normal( shape )
+    Q, R = np.linalg.qr( Z )
+    diag = np.diagonal( R, axis1 = 1, axis2 = 2 )
+    return Q * ( diag / np.abs( diag ) )[ :, None, : ]
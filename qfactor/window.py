@@ -0,0 +1,280 @@
+"""
+This module implements sliding-window optimization for long circuits.
+
+The circuit tensor is split at the end of the active window: gates before
+the split are applied on its right and the remaining gates are wrapped
+around on its left. Together they act as cached prefix and suffix tensors
+around the window, so a sweep only touches the gates inside the window.
+Sliding the window forward moves gates across the split, two gate
+applications per gate.
+"""
+
+import logging
+
+import numpy as np
+
+from qfactor import utils
+from qfactor.gates import Gate
+from qfactor.tensors import CircuitTensor
+from qfactor.optimize import _sweep
+
+
+logger = logging.getLogger( "qfactor" )
+
+
+class GateIndex():
+    """A GateIndex maps every qubit to the circuit gates acting on it."""
+
+    def __init__ ( self, circuit ):
+        """
+        GateIndex Constructor
+
+        Args:
+            circuit (list[Gate]): The circuit to index.
+        """
+
+        if not isinstance( circuit, list ):
+            raise TypeError( "The circuit argument is not a list of gates." )
+
+        if not all( [ isinstance( g, Gate ) for g in circuit ] ):
+            raise TypeError( "The circuit argument is not a list of gates." )
+
+        self.num_gates = len( circuit )
+        self.qubit_gates = {}
+
+        for i, gate in enumerate( circuit ):
+            for qubit in gate.location:
+                self.qubit_gates.setdefault( qubit, [] ).append( i )
+
+    def get_gates ( self, qubits ):
+        """
+        Returns the sorted indices of gates acting on any of the qubits.
+
+        Args:
+            qubits (iterable[int]): The qubit region.
+
+        Returns:
+            (list[int]): Indices of the gates touching the region.
+        """
+
+        gates = set()
+        for qubit in qubits:
+            gates.update( self.qubit_gates.get( qubit, [] ) )
+        return sorted( gates )
+
+    def get_windows ( self, window_size, stride = None, qubits = None ):
+        """
+        Computes the windows visited by one sliding pass.
+
+        Args:
+            window_size (int): The number of gates in a window.
+
+            stride (int or None): The number of gates a window slides
+                by. Defaults to half the window size.
+
+            qubits (iterable[int] or None): If given, only windows
+                containing gates acting on these qubits are returned.
+
+        Returns:
+            (list[tuple[int]]): The (start, end) gate ranges of the
+                windows, in increasing order.
+        """
+
+        if not isinstance( window_size, int ) or window_size <= 0:
+            raise TypeError( "Invalid window size." )
+
+        if stride is None:
+            stride = max( 1, window_size // 2 )
+
+        if not isinstance( stride, int ) or stride <= 0:
+            raise TypeError( "Invalid window stride." )
+
+        if self.num_gates == 0:
+            return []
+
+        last_start = max( 0, self.num_gates - window_size )
+        windows = []
+
+        if qubits is None:
+            start = 0
+            while True:
+                end = min( start + window_size, self.num_gates )
+                windows.append( ( start, end ) )
+                if end >= self.num_gates:
+                    break
+                start = min( start + stride, last_start )
+            return windows
+
+        # Start a new window at every region gate not yet covered
+        covered = 0
+        for gate in self.get_gates( qubits ):
+            if gate < covered:
+                continue
+            start = min( gate, last_start )
+            covered = min( start + window_size, self.num_gates )
+            windows.append( ( start, covered ) )
+        return windows
+
+
+def optimize_window ( circuit, target, window_size = 16, stride = None,
+                      region = None, diff_tol_a = 1e-12, diff_tol_r = 1e-6,
+                      dist_tol = 1e-10, max_passes = 1000, window_iters = 20,
+                      slowdown_factor = 0.0 ):
+    """
+    Optimize distance between circuit and target by sliding a window.
+
+    Each pass slides a window of gates across the circuit. Only the gates
+    inside the window are updated, with up to `window_iters` sweeps per
+    window, so the cost of a sweep depends on the window size and not
+    on the circuit length.
+
+    Args:
+        circuit (list[Gate]): The circuit to optimize.
+
+        target (np.ndarray): The target unitary matrix.
+
+        window_size (int): The number of gates in a window.
+
+        stride (int or None): The number of gates a window slides by.
+            Defaults to half the window size.
+
+        region (iterable[int] or None): If given, only windows holding
+            gates that act on these qubits are optimized.
+
+        diff_tol_a (float): Terminate when the difference in distance
+            between passes is less than this threshold.
+
+        diff_tol_r (float): Terminate when the relative difference in
+            distance between passes is less than this threshold:
+                |c1 - c2| <= diff_tol_a + diff_tol_r * abs( c1 )
+            The same criteria end the sweeps on a single window.
+
+        dist_tol (float): Terminate when the distance is less than
+            this threshold.
+
+        max_passes (int): Maximum number of passes over the circuit.
+
+        window_iters (int): Maximum number of sweeps per window.
+
+        slowdown_factor (float): A positive number less than 1.
+            The larger this factor, the slower the optimization.
+
+    Returns:
+        (list[Gate]): The optimized circuit.
+    """
+
+    if not isinstance( circuit, list ):
+        raise TypeError( "The circuit argument is not a list of gates." )
+
+    if not all( [ isinstance( g, Gate ) for g in circuit ] ):
+        raise TypeError( "The circuit argument is not a list of gates." )
+
+    if not utils.is_unitary( target ):
+        raise TypeError( "The target matrix is not unitary." )
+
+    num_qubits = utils.get_num_qubits( target )
+
+    if not all( [ utils.is_valid_location( g.location, num_qubits )
+                  for g in circuit ] ):
+        raise ValueError( "Gate location mismatch with target." )
+
+    if not isinstance( diff_tol_a, float ) or diff_tol_a > 0.5:
+        raise TypeError( "Invalid absolute difference threshold." )
+
+    if not isinstance( diff_tol_r, float ) or diff_tol_r > 0.5:
+        raise TypeError( "Invalid relative difference threshold." )
+
+    if not isinstance( dist_tol, float ) or dist_tol > 0.5:
+        raise TypeError( "Invalid distance threshold." )
+
+    if not isinstance( max_passes, int ) or max_passes < 0:
+        raise TypeError( "Invalid maximum number of passes." )
+
+    if not isinstance( window_iters, int ) or window_iters < 1:
+        raise TypeError( "Invalid number of sweeps per window." )
+
+    if slowdown_factor < 0 or slowdown_factor >= 1:
+        raise TypeError( "Slowdown factor is a positive number less than 1." )
+
+    windows = GateIndex( circuit ).get_windows( window_size, stride, region )
+
+    c1 = 0
+    c2 = 1
+    passes = 0
+
+    while True:
+
+        # Termination conditions
+        if passes > 0:
+
+            if np.abs(c1 - c2) <= diff_tol_a + diff_tol_r * np.abs( c1 ):
+                diff = np.abs(c1 - c2)
+                logger.info( f"Terminated: |c1 - c2| = {diff}"
+                              " <= diff_tol_a + diff_tol_r * |c1|." )
+                break
+
+        if passes >= max_passes:
+            logger.info( "Terminated: pass limit reached." )
+            break
+
+        passes += 1
+
+        # Rebuilding the tensor every pass also bounds numerical drift
+        split = windows[0][1] if len( windows ) > 0 else 0
+        ct = _build_split_tensor( target, circuit, split )
+
+        for start, end in windows:
+
+            # Slide the split to the end of the window
+            for k in range( split, end ):
+                ct.apply_left( circuit[k], inverse = True )
+                ct.apply_right( circuit[k] )
+            split = end
+
+            w1 = _calc_distance( ct )
+            for _ in range( window_iters ):
+                _sweep( ct, circuit, slowdown_factor, start, end )
+                w2 = w1
+                w1 = _calc_distance( ct )
+
+                if w1 <= dist_tol:
+                    break
+
+                if np.abs(w1 - w2) <= diff_tol_a + diff_tol_r * np.abs( w1 ):
+                    break
+
+        c2 = c1
+        c1 = _calc_distance( ct )
+
+        if c1 <= dist_tol:
+            logger.info( f"Terminated: c1 = {c1} <= dist_tol." )
+            return circuit
+
+        logger.info( f"pass: {passes}, cost: {c1}" )
+
+    return circuit
+
+
+def _build_split_tensor ( target, circuit, split ):
+    """
+    Builds a circuit tensor split before gate `split`.
+
+    Gates before the split are applied on the right of the tensor and the
+    rest are wrapped around on its left, which is the arrangement
+    `qfactor.optimize._sweep` expects for windows ending at the split.
+    """
+
+    ct = CircuitTensor( target, [] )
+
+    for gate in circuit[:split]:
+        ct.apply_right( gate )
+
+    for gate in reversed( circuit[split:] ):
+        ct.apply_left( gate )
+
+    return ct
+
+
+def _calc_distance ( ct ):
+    """Returns the distance encoded by the circuit tensor's trace."""
+    return 1 - ( np.abs( ct.calc_trace() ) / ( 2 ** ct.num_qubits ) )
@@ -31,9 +31,9 @@ setup( name = "qfactor",
            "Intended Audience :: Science/Research",
            "Operating System :: OS Independent",
            "Programming Language :: Python :: 3 :: Only",
-           "Programming Language :: Python :: 3.5",
-           "Programming Language :: Python :: 3.6",
-           "Programming Language :: Python :: 3.7",
+           "Programming Language :: Python :: 3.8",
+           "Programming Language :: Python :: 3.9",
+           "Programming Language :: Python :: 3.10",
            "Topic :: Scientific/Engineering",
            "Topic :: Scientific/Engineering :: Mathematics",
            "Topic :: Scientific/Engineering :: Physics",
@@ -47,6 +47,10 @@ setup( name = "qfactor",
        packages = find_namespace_packages( exclude = [ "tests*",
                                                        "examples*" ] ),
        install_requires = requirements,
-       python_requires = ">=3.5, <4",
+       extras_require = { "threads": [ "threadpoolctl" ] },
+       entry_points = {
+           "console_scripts": [ "qfactor = qfactor.cli:main" ]
+       },
+       python_requires = ">=3.8, <4",
 )
 
@@ -0,0 +1,85 @@
+import time
+import asyncio
+import numpy as np
+import unittest as ut
+
+from scipy.stats import unitary_group
+
+from qfactor import Gate, optimize_async
+from qfactor.optimize import get_distance
+from qfactor import aio
+from qfactor.aio import optimize_iter, set_max_concurrency
+
+
+class TestOptimizeAsync ( ut.TestCase ):
+
+    def setUp ( self ):
+        self.max_concurrency = aio._max_concurrency
+
+    def tearDown ( self ):
+        set_max_concurrency( self.max_concurrency )
+
+    def test_optimize_async ( self ):
+        target = unitary_group.rvs( 8 )
+        circuit = [ Gate( unitary_group.rvs( 8 ), ( 0, 1, 2 ) ) ]
+        circ = asyncio.run( optimize_async( circuit, target ) )
+        self.assertTrue( get_distance( circ, target ) < 1e-8 )
+
+    def test_optimize_async_cancel ( self ):
+        target = unitary_group.rvs( 16 )
+        circuit = [ Gate( unitary_group.rvs( 8 ), ( 0, 1, 2 ) ) ]
+        iterations = []
+
+        def callback ( it, c1 ):
+            iterations.append( it )
+
+        async def run ( ):
+            task = asyncio.ensure_future( optimize_async( circuit, target,
+                                                          min_iters = 100000,
+                                                          callback = callback ) )
+            await asyncio.sleep( 0.2 )
+            task.cancel()
+            start = time.time()
+            with self.assertRaises( asyncio.CancelledError ):
+                await task
+            return time.time() - start
+
+        self.assertTrue( asyncio.run( run() ) < 1 )
+        num_iterations = len( iterations )
+        time.sleep( 0.1 )
+        self.assertEqual( len( iterations ), num_iterations )
+
+    def test_optimize_iter ( self ):
+        target = unitary_group.rvs( 8 )
+        circuit = [ Gate( unitary_group.rvs( 8 ), ( 0, 1, 2 ) ) ]
+
+        async def run ( ):
+            return [ p async for p in optimize_iter( circuit, target,
+                                                     min_iters = 0 ) ]
+
+        progress = asyncio.run( run() )
+        self.assertEqual( [ it for it, _ in progress ],
+                          list( range( 1, len( progress ) + 1 ) ) )
+        self.assertTrue( progress[-1][1] < 1e-8 )
+
+    def test_optimize_iter_concurrency ( self ):
+        set_max_concurrency( 1 )
+        events = []
+
+        async def run ( name ):
+            target = unitary_group.rvs( 8 )
+            circuit = [ Gate( unitary_group.rvs( 8 ), ( 0, 1, 2 ) ) ]
+            async for it, _ in optimize_iter( circuit, target, min_iters = 20,
+                                              max_iters = 20 ):
+                events.append( name )
+
+        async def run_all ( ):
+            await asyncio.gather( run( "a" ), run( "b" ) )
+
+        asyncio.run( run_all() )
+        self.assertEqual( events, sorted( events ) )
+        self.assertRaises( TypeError, set_max_concurrency, 0 )
+
+
+if __name__ == "__main__":
+    ut.main()
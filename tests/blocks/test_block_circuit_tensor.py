@@ -0,0 +1,70 @@
+import numpy as np
+import unittest as ut
+
+from qfactor import utils
+from qfactor.gates import Gate, CnotGate, RzGate, RyGate
+from qfactor.tensors import CircuitTensor
+from qfactor.optimize import optimize, get_distance
+from qfactor.simulate import circuit_unitary
+from qfactor.blocks import BlockCircuitTensor, get_conserved_qubits
+
+
+class TestBlockCircuitTensor ( ut.TestCase ):
+
+    def setUp ( self ):
+        # Qubits 0 and 2 are only touched by CNOT controls and Rz gates
+        utrys = utils.random_unitaries( 2, 4, seed = 0 )
+        self.circuit = [ CnotGate( 0, 1 ), Gate( utrys[0], ( 1, 3 ) ),
+                         RzGate( 0.3, ( 2, ) ), CnotGate( 2, 3 ),
+                         RyGate( 0.5, ( 1, ) ), CnotGate( 0, 3 ),
+                         Gate( utrys[1], ( 1, 3 ) ), RzGate( 1.2, ( 0, ) ) ]
+        self.target = [ RzGate( 0.9, ( 0, ) ), CnotGate( 0, 1 ),
+                        CnotGate( 2, 3 ), Gate( utrys[1], ( 1, 3 ) ),
+                        RzGate( 0.1, ( 2, ) ) ]
+
+    def test_get_conserved_qubits ( self ):
+        self.assertEqual( get_conserved_qubits( self.target, self.circuit ),
+                          [ 0, 2 ] )
+        dense = circuit_unitary( self.target )
+        self.assertEqual( get_conserved_qubits( dense, self.circuit ),
+                          [ 0, 2 ] )
+
+        circuit = self.circuit + [ Gate( np.identity( 2 ), ( 2, ) ) ]
+        self.assertEqual( get_conserved_qubits( dense, circuit ), [ 0 ] )
+
+    def test_matches_circuit_tensor ( self ):
+        dense = circuit_unitary( self.target )
+
+        for target in [ self.target, dense ]:
+            ref = CircuitTensor( dense, self.circuit )
+            ct = BlockCircuitTensor( target, self.circuit )
+            self.assertEqual( ct.tensor.size, ref.tensor.size // 4 )
+            self.assertTrue( np.allclose( ct.utry, ref.utry ) )
+            self.assertTrue( np.isclose( ct.calc_trace(), ref.calc_trace() ) )
+
+            for gate in self.circuit:
+                ct.apply_left( gate, inverse = True )
+                ref.apply_left( gate, inverse = True )
+            self.assertTrue( np.allclose( ct.utry, ref.utry ) )
+
+            for location in [ ( 0, ), ( 1, ), ( 1, 3 ), ( 0, 1 ), ( 3, 2 ),
+                              ( 2, 0, 1 ) ]:
+                env = ct.calc_env_matrix( location )
+                ref_env = ref.calc_env_matrix( location )
+                self.assertTrue( np.allclose( env, ref_env ) )
+
+    def test_optimize_blocks ( self ):
+        utrys = utils.random_unitaries( 2, 4, seed = 1 )
+        circuit = [ CnotGate( 0, 1 ), Gate( utrys[0], ( 1, 2 ) ),
+                    RzGate( 0.3, ( 0, ) ) ]
+        target = circuit_unitary( circuit )
+        start = [ CnotGate( 0, 1 ), Gate( np.identity( 4 ), ( 1, 2 ) ),
+                  RzGate( 0.0, ( 0, ) ) ]
+
+        start = optimize( start, target, min_iters = 0,
+                          tensor_factory = BlockCircuitTensor )
+        self.assertLess( get_distance( start, target ), 1e-8 )
+
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,120 @@
+import numpy as np
+import unittest as ut
+
+from scipy.stats import unitary_group
+
+from qfactor import Gate, RxGate, RyGate, RzGate, CnotGate
+from qfactor.gates import XXGate
+from qfactor.circuit import CircuitArray, RX, RY, RZ, XX, CNOT
+from qfactor.tensors import CircuitTensor
+from qfactor.optimize import optimize, get_distance
+
+
+class TestCircuitArray ( ut.TestCase ):
+
+    def get_circuit ( self ):
+        return [ RxGate( np.random.random(), 0 ),
+                 RyGate( np.random.random(), 1 ),
+                 CnotGate( 0, 1 ),
+                 RzGate( np.random.random(), 2, fixed = True ),
+                 XXGate( np.random.random(), ( 1, 2 ) ),
+                 Gate( unitary_group.rvs( 8 ), ( 0, 1, 2 ) ),
+                 RxGate( np.random.random(), 2 ),
+                 RzGate( np.random.random(), 0 ) ]
+
+    def test_circuit_array_roundtrip ( self ):
+        circuit = self.get_circuit()
+        circuit_array = CircuitArray( circuit )
+        self.assertEqual( len( circuit_array ), len( circuit ) )
+        self.assertEqual( list( circuit_array.indices[ RX ] ), [ 0, 6 ] )
+
+        for g1, g2 in zip( circuit, circuit_array.to_gates() ):
+            self.assertEqual( type( g1 ), type( g2 ) )
+            self.assertEqual( g1.location, g2.location )
+            self.assertEqual( g1.fixed, g2.fixed )
+            self.assertTrue( np.allclose( g1.utry, g2.utry ) )
+
+    def test_circuit_array_get_utrys ( self ):
+        circuit = self.get_circuit()
+        utrys = CircuitArray( circuit ).get_utrys()
+        self.assertEqual( len( utrys ), len( circuit ) )
+
+        for gate, utry in zip( circuit, utrys ):
+            self.assertTrue( np.allclose( gate.utry, utry ) )
+
+    def test_circuit_array_update ( self ):
+        circuit = self.get_circuit()
+        circuit_array = CircuitArray( circuit )
+
+        for code in [ RX, RY, RZ, XX ]:
+            indices = circuit_array.indices[ code ]
+            dim = 4 if code == XX else 2
+            envs = np.array( [ unitary_group.rvs( dim ) for _ in indices ] )
+            circuit_array.update( code, envs, 0.0 )
+
+            for i, env in zip( indices, envs ):
+                circuit[i].update( env, 0.0 )
+
+        for g1, g2 in zip( circuit, circuit_array.to_gates() ):
+            self.assertTrue( np.allclose( g1.utry, g2.utry ) )
+
+    def test_circuit_array_update_gate ( self ):
+        circuit = self.get_circuit()
+        circuit_array = CircuitArray( circuit )
+        gates = circuit_array.get_gates()
+
+        for gate, view in zip( circuit, gates ):
+            self.assertTrue( np.allclose( gate.utry, view.utry ) )
+            env = unitary_group.rvs( 2 ** gate.gate_size )
+            gate.update( env, 0.0 )
+            view.update( env, 0.0 )
+
+        for g1, g2 in zip( circuit, gates ):
+            self.assertTrue( np.allclose( g1.utry, g2.utry ) )
+            self.assertTrue( np.allclose( g1.inverse_utry, g2.inverse_utry ) )
+
+        for g1, g2 in zip( circuit, circuit_array.to_gates() ):
+            self.assertTrue( np.allclose( g1.utry, g2.utry ) )
+
+    def test_circuit_array_update_rz_zero ( self ):
+        circuit_array = CircuitArray( [ RzGate( 0.5, 0 ) ] )
+        env = np.diag( [ 1, 1j ] )
+
+        with np.errstate( all = "raise" ):
+            circuit_array.update( RZ, env[ None ], 0.0 )
+            circuit_array.update_gate( 0, env, 0.0 )
+
+        self.assertTrue( np.isclose( circuit_array.thetas[ RZ ][0],
+                                     -np.pi / 2 ) )
+
+    def test_circuit_array_optimize ( self ):
+        circuit = self.get_circuit()
+        target = CircuitTensor( np.identity( 8 ), circuit ).utry
+        circuit_array = CircuitArray( self.get_circuit() )
+
+        result = optimize( circuit_array, target )
+        self.assertIs( result, circuit_array )
+        self.assertTrue( get_distance( result.to_gates(), target ) < 1e-8 )
+
+    def test_circuit_array_optimize_real ( self ):
+        target = RyGate( 0.7, 0 ).utry.astype( np.complex128 )
+        circuit_array = CircuitArray( [ RyGate( 0., 0 ),
+                                        Gate( np.identity( 2 ), ( 0, ) ) ] )
+        optimize( circuit_array, target, real = True )
+        self.assertEqual( circuit_array.utrys[0].dtype, np.float64 )
+        self.assertTrue( get_distance( circuit_array.to_gates(),
+                                       target ) < 1e-8 )
+
+    def test_circuit_array_invalid ( self ):
+        self.assertRaises( TypeError, CircuitArray, 0 )
+        self.assertRaises( TypeError, CircuitArray, [ 0 ] )
+
+        circuit_array = CircuitArray( self.get_circuit() )
+        self.assertRaises( ValueError, circuit_array.update, CNOT,
+                           np.zeros( ( 1, 4, 4 ) ), 0.0 )
+        self.assertRaises( ValueError, circuit_array.update, RX,
+                           np.zeros( ( 1, 2, 2 ) ), 0.0 )
+
+
+if __name__ == "__main__":
+    ut.main()
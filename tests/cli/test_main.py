@@ -0,0 +1,107 @@
+import os
+import json
+import tempfile
+import numpy as np
+import unittest as ut
+
+from scipy.stats import unitary_group
+
+from qfactor import Gate, RyGate, CnotGate
+from qfactor.tensors import CircuitTensor
+from qfactor.serialize import save_corpus, save_circuit
+from qfactor.cli import main
+
+
+class TestMain ( ut.TestCase ):
+
+    def get_circuit ( self ):
+        return [ Gate( unitary_group.rvs( 4 ), ( 0, 1 ) ),
+                 RyGate( np.random.random(), 0 ),
+                 CnotGate( 0, 1 ) ]
+
+    def read_results ( self, output ):
+        with open( output ) as f:
+            return sorted( [ json.loads( line ) for line in f ],
+                           key = lambda r: r[ "index" ] )
+
+    def test_main ( self ):
+        circuits = [ self.get_circuit() for _ in range( 3 ) ]
+        targets = [ CircuitTensor( np.identity( 4 ), self.get_circuit() ).utry
+                    for _ in range( 3 ) ]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            corpus = os.path.join( tmpdir, "corpus" )
+            output = os.path.join( tmpdir, "out.jsonl" )
+            save_corpus( corpus, circuits, targets )
+
+            self.assertEqual( main( [ corpus, output, "-j", "2" ] ), 0 )
+            results = self.read_results( output )
+
+        self.assertEqual( [ r[ "index" ] for r in results ], [ 0, 1, 2 ] )
+        for result in results:
+            self.assertTrue( result[ "distance" ] < 1e-8 )
+            self.assertTrue( result[ "iterations" ] > 0 )
+            self.assertEqual( len( result[ "params" ] ), 3 )
+            self.assertIsNone( result[ "params" ][2] )
+
+    def test_main_error ( self ):
+        circuits = [ self.get_circuit() for _ in range( 4 ) ]
+        targets = [ CircuitTensor( np.identity( 4 ), self.get_circuit() ).utry
+                    for _ in range( 4 ) ]
+        targets[1] = np.ones( ( 4, 4 ) )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            corpus = os.path.join( tmpdir, "corpus" )
+            output = os.path.join( tmpdir, "out.jsonl" )
+            save_corpus( corpus, circuits, targets )
+
+            self.assertEqual( main( [ corpus, output, "-j", "2" ] ), 1 )
+            results = self.read_results( output )
+
+            # The failed problem is recorded, so a rerun skips it
+            self.assertEqual( main( [ corpus, output ] ), 0 )
+            self.assertEqual( len( self.read_results( output ) ), 4 )
+
+        self.assertEqual( [ r[ "index" ] for r in results ], [ 0, 1, 2, 3 ] )
+        self.assertIn( "TypeError", results[1][ "error" ] )
+        for result in results[:1] + results[2:]:
+            self.assertTrue( result[ "distance" ] < 1e-8 )
+
+    def test_main_resume ( self ):
+        circuits = [ self.get_circuit() for _ in range( 3 ) ]
+        targets = [ unitary_group.rvs( 4 ) for _ in range( 3 ) ]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            corpus = os.path.join( tmpdir, "corpus" )
+            output = os.path.join( tmpdir, "out.jsonl" )
+            save_corpus( corpus, circuits, targets )
+
+            # Simulate a crash after one result and a partial line
+            with open( output, "w" ) as f:
+                f.write( json.dumps( { "index": 1, "distance": 0.5 } ) + "\n" )
+                f.write( "{\"index\": 2, \"dist" )
+
+            main( [ corpus, output, "-j", "1" ] )
+            results = self.read_results( output )
+
+        self.assertEqual( [ r[ "index" ] for r in results ], [ 0, 1, 2 ] )
+        self.assertEqual( results[1][ "distance" ], 0.5 )
+
+    def test_main_time_limit ( self ):
+        circuit = [ Gate( unitary_group.rvs( 8 ), ( 0, 1, 2 ) ) ]
+        target = unitary_group.rvs( 16 )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join( tmpdir, "circ.npz" )
+            output = os.path.join( tmpdir, "out.jsonl" )
+            save_circuit( path, circuit, target )
+            main( [ path, output, "-t", "0.05", "--min-iters", "100000" ] )
+            results = self.read_results( output )
+
+        self.assertEqual( len( results ), 1 )
+        self.assertTrue( results[0][ "timed_out" ] )
+        self.assertTrue( results[0][ "time" ] < 5 )
+
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,26 @@
+import numpy as np
+import unittest as ut
+
+from qfactor import utils
+from qfactor.gates import Gate
+from qfactor.tensors import CircuitTensor
+from qfactor.optimize import get_distance
+from qfactor.distributed import optimize_distributed
+
+
+class TestOptimizeDistributed ( ut.TestCase ):
+
+    def test_optimize_distributed ( self ):
+        utrys = utils.random_unitaries( 2, 4, seed = 2 )
+        circuit = [ Gate( utrys[0], ( 0, 1 ) ), Gate( utrys[1], ( 1, 2 ) ) ]
+        target = CircuitTensor( np.identity( 8 ), circuit ).utry
+
+        start = [ Gate( np.identity( 4 ), ( 0, 1 ) ),
+                  Gate( np.identity( 4 ), ( 1, 2 ) ) ]
+        start = optimize_distributed( start, target, num_workers = 2,
+                                      num_slabs = 4, min_iters = 0 )
+        self.assertLess( get_distance( start, target ), 1e-8 )
+
+
+if __name__ == "__main__":
+    ut.main()
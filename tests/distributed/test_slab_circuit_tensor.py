@@ -0,0 +1,59 @@
+import numpy as np
+import unittest as ut
+
+from qfactor import utils
+from qfactor.gates import Gate, CnotGate, RzGate
+from qfactor.tensors import CircuitTensor
+from qfactor.distributed import SlabCircuitTensor
+
+
+class TestSlabCircuitTensor ( ut.TestCase ):
+
+    def setUp ( self ):
+        self.num_qubits = 4
+        self.target = utils.random_unitaries( 1, 16, seed = 0 )[0]
+        utrys = utils.random_unitaries( 3, 4, seed = 1 )
+        self.circuit = [ Gate( utrys[0], ( 0, 1 ) ),
+                         Gate( utrys[1], ( 1, 3 ) ),
+                         CnotGate( 0, 2 ),
+                         RzGate( 0.4, ( 3, ) ),
+                         Gate( utrys[2], ( 0, 3 ) ) ]
+
+    def test_matches_circuit_tensor ( self ):
+        ref = CircuitTensor( self.target, self.circuit )
+
+        with SlabCircuitTensor( self.target, self.circuit, 2, 4 ) as ct:
+            self.assertTrue( np.allclose( ct.utry, ref.utry ) )
+            self.assertTrue( np.isclose( ct.calc_trace(), ref.calc_trace() ) )
+
+            for gate in self.circuit:
+                ct.apply_left( gate, inverse = True )
+                ref.apply_left( gate, inverse = True )
+                ct.apply_right( gate )
+                ref.apply_right( gate )
+            self.assertTrue( np.allclose( ct.utry, ref.utry ) )
+
+            for location in [ ( 0, ), ( 3, ), ( 1, 2 ), ( 3, 0 ),
+                              ( 0, 1, 2, 3 ) ]:
+                env = ct.calc_env_matrix( location )
+                ref_env = ref.calc_env_matrix( location )
+                self.assertTrue( np.allclose( env, ref_env ) )
+
+    def test_reinitialize ( self ):
+        with SlabCircuitTensor( self.target, self.circuit, 1, 2 ) as ct:
+            ct.apply_left( self.circuit[0] )
+            ct.reinitialize()
+            ref = CircuitTensor( self.target, self.circuit )
+            self.assertTrue( np.allclose( ct.utry, ref.utry ) )
+
+    def test_invalid ( self ):
+        self.assertRaises( ValueError, SlabCircuitTensor, self.target,
+                           self.circuit, 1, 3 )
+        self.assertRaises( ValueError, SlabCircuitTensor, self.target,
+                           self.circuit, 1, 32 )
+        self.assertRaises( TypeError, SlabCircuitTensor, self.target,
+                           "a", 1, 2 )
+
+
+if __name__ == "__main__":
+    ut.main()
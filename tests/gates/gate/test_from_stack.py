@@ -0,0 +1,36 @@
+import numpy as np
+import unittest as ut
+
+from qfactor.gates import Gate
+from qfactor.utils import random_unitaries
+
+
+class TestFromStack ( ut.TestCase ):
+
+    def test_from_stack ( self ):
+        utrys = random_unitaries( 5, 4 )
+        locations = [ ( 0, 1 ), ( 1, 2 ), ( 0, 2 ), ( 2, 3 ), ( 1, 3 ) ]
+        gates = Gate.from_stack( utrys, locations )
+        self.assertEqual( len( gates ), 5 )
+
+        for gate, utry, location in zip( gates, utrys, locations ):
+            self.assertTrue( np.allclose( gate.utry, utry ) )
+            self.assertEqual( gate.location, location )
+            self.assertEqual( gate.gate_size, 2 )
+            self.assertFalse( gate.fixed )
+
+    def test_from_stack_invalid ( self ):
+        utrys = random_unitaries( 2, 4 )
+        self.assertRaises( TypeError, Gate.from_stack, np.ones( ( 2, 4, 4 ) ),
+                           [ ( 0, 1 ), ( 1, 2 ) ] )
+        self.assertRaises( TypeError, Gate.from_stack, utrys,
+                           [ ( 1, 0 ), ( 1, 2 ) ] )
+        self.assertRaises( TypeError, Gate.from_stack, utrys,
+                           [ ( 1, 1 ), ( 1, 2 ) ] )
+        self.assertRaises( TypeError, Gate.from_stack, utrys, [ ( 0, 1 ) ] )
+        self.assertRaises( ValueError, Gate.from_stack, utrys,
+                           [ ( 0, 1, 2 ), ( 1, 2, 3 ) ] )
+
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,43 @@
+import numpy as np
+import unittest as ut
+
+from scipy.stats import unitary_group
+
+from qfactor.gates import Gate, RxGate, CnotGate
+
+
+class TestInverseUtry ( ut.TestCase ):
+
+    def test_inverse_utry ( self ):
+        gate = Gate( unitary_group.rvs( 4 ), (0, 1) )
+        self.assertTrue( np.allclose( gate.inverse_utry @ gate.utry,
+                                      np.identity( 4 ) ) )
+        self.assertIs( gate.inverse_utry, gate.inverse_utry )
+
+        gate.utry = unitary_group.rvs( 4 )
+        self.assertTrue( np.allclose( gate.inverse_utry @ gate.utry,
+                                      np.identity( 4 ) ) )
+
+    def test_inverse_utry_cached ( self ):
+        gate = RxGate( 0.5, 0 )
+        utry = gate.utry
+        self.assertIs( gate.utry, utry )
+        self.assertFalse( utry.flags.writeable )
+
+        gate.theta = 1.0
+        self.assertIsNot( gate.utry, utry )
+        self.assertTrue( np.allclose( gate.utry, RxGate( 1.0, 0 ).utry ) )
+        self.assertTrue( np.allclose( gate.inverse_utry @ gate.utry,
+                                      np.identity( 2 ) ) )
+
+    def test_inverse_utry_shared ( self ):
+        g1 = CnotGate( 0, 1 )
+        g2 = CnotGate( 1, 2 )
+        self.assertIs( g1.utry, g2.utry )
+        self.assertIs( g1.inverse_utry, g1.utry )
+        self.assertFalse( g1.utry.flags.writeable )
+        self.assertRaises( AttributeError, setattr, g1, "name", "cx" )
+
+
+if __name__ == "__main__":
+    ut.main()
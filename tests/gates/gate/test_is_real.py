@@ -0,0 +1,27 @@
+import numpy as np
+import unittest as ut
+
+from scipy.stats import unitary_group, ortho_group
+
+from qfactor.gates import Gate, RxGate, RyGate, RzGate, XXGate, CnotGate
+
+
+class TestIsReal ( ut.TestCase ):
+
+    def test_is_real_gate ( self ):
+        self.assertTrue( Gate( ortho_group.rvs( 4 ), (0, 1) ).is_real() )
+        self.assertTrue( Gate( ortho_group.rvs( 4 ).astype( complex ),
+                               (0, 1) ).is_real() )
+        self.assertFalse( Gate( unitary_group.rvs( 4 ), (0, 1) ).is_real() )
+        self.assertTrue( CnotGate( 0, 1 ).is_real() )
+
+    def test_is_real_param_gates ( self ):
+        self.assertTrue( RyGate( 1., 0 ).is_real() )
+        self.assertFalse( RxGate( 0., 0 ).is_real() )
+        self.assertTrue( RxGate( 0., 0, True ).is_real() )
+        self.assertFalse( RzGate( 1., 0, True ).is_real() )
+        self.assertFalse( XXGate( 0., (0, 1) ).is_real() )
+
+
+if __name__ == "__main__":
+    ut.main()
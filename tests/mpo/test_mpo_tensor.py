@@ -0,0 +1,69 @@
+import numpy as np
+import unittest as ut
+
+from scipy.stats import unitary_group
+
+from qfactor.gates import Gate
+from qfactor.tensors import CircuitTensor
+from qfactor.mpo import MPOCircuitTensor
+
+
+class TestMPOCircuitTensor ( ut.TestCase ):
+
+    LOCATIONS = [ (0, 1), (1, 3), (0, 4), (2,), (1, 2, 4) ]
+
+    def get_tensors ( self ):
+        target = unitary_group.rvs( 32 )
+        circuit = [ Gate( unitary_group.rvs( 2 ** len( loc ) ), loc )
+                    for loc in self.LOCATIONS ]
+        return ( CircuitTensor( target, circuit ),
+                 MPOCircuitTensor( target, circuit ) )
+
+    def test_mpo_tensor_constructor ( self ):
+        ct, mpo = self.get_tensors()
+        self.assertTrue( np.allclose( ct.utry, mpo.utry ) )
+        self.assertTrue( np.allclose( ct.calc_trace(), mpo.calc_trace() ) )
+
+        mpo = MPOCircuitTensor( np.identity( 16 ), [] )
+        self.assertEqual( mpo.bond_dims, [ 1, 1, 1 ] )
+
+    def test_mpo_tensor_apply ( self ):
+        ct, mpo = self.get_tensors()
+        for gate in ct.gate_list:
+            ct.apply_left( gate )
+            mpo.apply_left( gate )
+            ct.apply_right( gate, inverse = True )
+            mpo.apply_right( gate, inverse = True )
+            self.assertTrue( np.allclose( ct.utry, mpo.utry ) )
+
+    def test_mpo_tensor_calc_env_matrix ( self ):
+        ct, mpo = self.get_tensors()
+        for location in [ (0,), (1, 3), (0, 2, 4) ]:
+            self.assertTrue( np.allclose( ct.calc_env_matrix( location ),
+                                          mpo.calc_env_matrix( location ) ) )
+
+        self.assertRaises( ValueError, mpo.calc_env_matrix, [ 0, 5 ] )
+        self.assertRaises( TypeError, mpo.calc_env_matrix, "a" )
+
+    def test_mpo_tensor_max_bond ( self ):
+        target = unitary_group.rvs( 16 )
+        mpo = MPOCircuitTensor( target, [], max_bond = 2 )
+        self.assertTrue( max( mpo.bond_dims ) <= 2 )
+
+    def test_mpo_tensor_invalid ( self ):
+        target = unitary_group.rvs( 4 )
+        self.assertRaises( TypeError, MPOCircuitTensor, target, [], 0 )
+        self.assertRaises( TypeError, MPOCircuitTensor, target, [], None, 1 )
+
+    def test_mpo_tensor_target_circuit ( self ):
+        target = [ Gate( unitary_group.rvs( 2 ** len( loc ) ), loc )
+                   for loc in self.LOCATIONS ]
+        circuit = [ Gate( unitary_group.rvs( 4 ), ( 1, 2 ) ) ]
+        dense = CircuitTensor( np.identity( 32 ), target ).utry
+        ct = CircuitTensor( dense, circuit )
+        mpo = MPOCircuitTensor( target, circuit )
+        self.assertTrue( np.allclose( ct.utry, mpo.utry ) )
+
+
+if __name__ == "__main__":
+    ut.main()
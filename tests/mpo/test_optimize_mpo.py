@@ -0,0 +1,30 @@
+import numpy as np
+import unittest as ut
+from functools import partial
+
+from scipy.stats import unitary_group
+
+from qfactor.gates import Gate
+from qfactor.tensors import CircuitTensor
+from qfactor.mpo import MPOCircuitTensor
+from qfactor.optimize import optimize, get_distance
+
+
+class TestOptimizeMPO ( ut.TestCase ):
+
+    LOCATIONS = [ (0, 1), (1, 2), (2, 3) ]
+
+    def test_optimize_mpo ( self ):
+        circuit = [ Gate( unitary_group.rvs( 4 ), loc )
+                    for loc in self.LOCATIONS ]
+        target = CircuitTensor( np.identity( 16 ), circuit ).utry
+        circuit = [ Gate( unitary_group.rvs( 4 ), loc )
+                    for loc in self.LOCATIONS ]
+
+        factory = partial( MPOCircuitTensor, max_bond = 16 )
+        circ = optimize( circuit, target, tensor_factory = factory )
+        self.assertTrue( get_distance( circ, target ) < 1e-8 )
+
+
+if __name__ == "__main__":
+    ut.main()
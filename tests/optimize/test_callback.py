@@ -0,0 +1,25 @@
+import numpy as np
+import unittest as ut
+
+from scipy.stats import unitary_group
+
+from qfactor import Gate
+from qfactor.optimize import optimize
+
+
+class TestOptimizeCallback ( ut.TestCase ):
+
+    def test_optimize_callback ( self ):
+        calls = []
+
+        def callback ( it, c1 ):
+            calls.append( ( it, c1 ) )
+            return it >= 5
+
+        circuit = [ Gate( unitary_group.rvs( 8 ), ( 0, 1, 2 ) ) ]
+        optimize( circuit, unitary_group.rvs( 16 ), callback = callback )
+        self.assertEqual( [ it for it, _ in calls ], [ 1, 2, 3, 4, 5 ] )
+
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,62 @@
+import numpy as np
+import unittest as ut
+
+from scipy.stats import unitary_group
+
+from qfactor import Gate
+from qfactor.gates import RzGate, CnotGate
+from qfactor.tensors import CircuitTensor
+from qfactor.optimize import optimize, get_distance
+
+
+class TestOptimizePrecision ( ut.TestCase ):
+
+    def get_circuit ( self ):
+        return [ Gate( unitary_group.rvs( 4 ), ( 0, 1 ) ),
+                 Gate( unitary_group.rvs( 4 ), ( 1, 2 ) ) ]
+
+    def test_optimize_mixed ( self ):
+        target = CircuitTensor( np.identity( 8 ), self.get_circuit() ).utry
+        circ = optimize( self.get_circuit(), target, precision = "mixed" )
+        self.assertTrue( get_distance( circ, target ) < 1e-8 )
+
+    def test_optimize_mixed_promotes ( self ):
+        circuit = self.get_circuit() + [ RzGate( 0.5, 0 ) ]
+        target = CircuitTensor( np.identity( 8 ), circuit ).utry
+        circuit[-1].theta = 0.
+        dtypes = []
+
+        def callback ( it, c1 ):
+            dtypes.append( np.asarray( circuit[-1].theta ).dtype )
+
+        with self.assertLogs( "qfactor", "INFO" ) as logs:
+            optimize( circuit, target, precision = "mixed",
+                      callback = callback )
+
+        # Angles come from the environments, in the sweep's precision
+        self.assertEqual( dtypes[0], np.float32 )
+        self.assertIs( type( circuit[-1].theta ), float )
+        self.assertTrue( any( [ "Promoting to double precision" in line
+                                for line in logs.output ] ) )
+
+    def test_optimize_mixed_stopped ( self ):
+        target = CircuitTensor( np.identity( 8 ), self.get_circuit() ).utry
+        circuit = self.get_circuit() + [ RzGate( 0.5, 0 ), CnotGate( 0, 1 ) ]
+        circ = optimize( circuit, target, precision = "mixed",
+                         callback = lambda it, c1: True )
+        self.assertEqual( circ[0].utry.dtype, np.complex128 )
+        self.assertEqual( circ[1].utry.dtype, np.complex128 )
+        self.assertIs( type( circ[2].theta ), float )
+        self.assertEqual( circ[2].utry.dtype, np.complex128 )
+
+    def test_optimize_mixed_invalid ( self ):
+        target = unitary_group.rvs( 8 )
+        self.assertRaises( ValueError, optimize, self.get_circuit(), target,
+                           precision = "half" )
+        self.assertRaises( ValueError, optimize, self.get_circuit(), target,
+                           precision = "mixed",
+                           tensor_factory = CircuitTensor )
+
+
+if __name__ == "__main__":
+    ut.main()
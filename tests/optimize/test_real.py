@@ -0,0 +1,53 @@
+import numpy as np
+import unittest as ut
+
+from scipy.stats import unitary_group
+
+from qfactor.gates import Gate, RyGate, RzGate, CnotGate
+from qfactor.tensors import CircuitTensor
+from qfactor.optimize import optimize, get_distance
+
+
+class TestOptimizeReal ( ut.TestCase ):
+
+    def get_circuit ( self ):
+        return [ RyGate( np.random.random(), 0 ),
+                 RyGate( np.random.random(), 1 ),
+                 CnotGate( 0, 1 ),
+                 RyGate( np.random.random(), 0 ),
+                 RyGate( np.random.random(), 1 ) ]
+
+    def test_optimize_real ( self ):
+        target = CircuitTensor( np.identity( 4 ), self.get_circuit() ).utry
+        target = target.astype( np.complex128 )
+        for real in [ False, True ]:
+            circ = optimize( self.get_circuit(), target, real = real )
+            self.assertTrue( get_distance( circ, target ) < 1e-8 )
+
+    def test_optimize_real_dtypes ( self ):
+        target = np.identity( 8, dtype = np.complex128 )
+        circuit = [ Gate( np.identity( 4 ), ( 0, 1 ) ),
+                    Gate( np.identity( 4, dtype = np.complex128 ), ( 1, 2 ) ) ]
+        circ = optimize( circuit, target, real = True )
+        self.assertEqual( circ[0].utry.dtype, np.float64 )
+        self.assertEqual( circ[1].utry.dtype, np.complex128 )
+
+    def test_optimize_real_opt_in ( self ):
+        target = CircuitTensor( np.identity( 4 ), self.get_circuit() ).utry
+        with self.assertLogs( "qfactor", "INFO" ) as logs:
+            optimize( self.get_circuit(), target )
+        self.assertNotIn( "Running in real arithmetic.",
+                          " ".join( logs.output ) )
+
+    def test_optimize_real_invalid ( self ):
+        target = unitary_group.rvs( 4 )
+        self.assertRaises( ValueError, optimize, self.get_circuit(), target,
+                           real = True )
+
+        target = np.identity( 4 )
+        circuit = self.get_circuit() + [ RzGate( 1., 0 ) ]
+        self.assertRaises( ValueError, optimize, circuit, target, real = True )
+
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,27 @@
+import numpy as np
+import unittest as ut
+
+from qfactor import utils
+from qfactor.gates import Gate
+from qfactor.optimize import optimize, get_distance
+from qfactor.simulate import circuit_unitary
+
+
+class TestOptimizeReorder ( ut.TestCase ):
+
+    def test_optimize_reorder ( self ):
+        utrys = utils.random_unitaries( 4, 4, seed = 2 )
+        locations = [ ( 0, 1 ), ( 2, 3 ), ( 0, 1 ), ( 1, 2 ) ]
+        target = circuit_unitary( Gate.from_stack( utrys, locations ) )
+
+        circuit = [ Gate( np.identity( 4 ), loc ) for loc in locations ]
+        result = optimize( list( circuit ), target, min_iters = 0,
+                           reorder = True )
+
+        self.assertEqual( [ g.location for g in result ], locations )
+        self.assertTrue( all( [ a is b for a, b in zip( result, circuit ) ] ) )
+        self.assertLess( get_distance( result, target ), 1e-8 )
+
+
+if __name__ == "__main__":
+    ut.main()
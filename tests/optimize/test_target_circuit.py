@@ -0,0 +1,28 @@
+import numpy as np
+import unittest as ut
+
+from qfactor import utils
+from qfactor.gates import Gate, CnotGate
+from qfactor.optimize import optimize, get_distance
+from qfactor.tensors import CircuitTensor
+
+
+class TestOptimizeTargetCircuit ( ut.TestCase ):
+
+    def test_optimize_target_circuit ( self ):
+        utrys = utils.random_unitaries( 2, 4, seed = 3 )
+        target = [ Gate( utrys[0], ( 0, 1 ) ), CnotGate( 1, 2 ),
+                   Gate( utrys[1], ( 1, 2 ) ) ]
+        circuit = [ Gate( np.identity( 4 ), ( 0, 1 ) ), CnotGate( 1, 2 ),
+                    Gate( np.identity( 4 ), ( 1, 2 ) ) ]
+
+        circuit = optimize( circuit, target, min_iters = 0 )
+        self.assertLess( get_distance( circuit, target ), 1e-8 )
+
+        dense = CircuitTensor( np.identity( 8 ), target ).utry
+        self.assertTrue( np.isclose( get_distance( circuit, target ),
+                                     get_distance( circuit, dense ) ) )
+
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,99 @@
+import gc
+import warnings
+import tracemalloc
+import numpy as np
+import unittest as ut
+
+from qfactor import utils
+from qfactor.gates import Gate, CnotGate, RzGate
+from qfactor.tensors import CircuitTensor
+from qfactor.optimize import get_distance
+from qfactor.outofcore import MemmapCircuitTensor, optimize_memmap
+from qfactor.outofcore import is_unitary_streamed
+
+
+class TestMemmapCircuitTensor ( ut.TestCase ):
+
+    def setUp ( self ):
+        self.target = utils.random_unitaries( 1, 16, seed = 0 )[0]
+        utrys = utils.random_unitaries( 3, 4, seed = 1 )
+        self.circuit = [ Gate( utrys[0], ( 0, 1 ) ),
+                         Gate( utrys[1], ( 1, 3 ) ),
+                         CnotGate( 0, 2 ),
+                         RzGate( 0.4, ( 3, ) ),
+                         Gate( utrys[2], ( 0, 3 ) ) ]
+
+    def test_matches_circuit_tensor ( self ):
+        ref = CircuitTensor( self.target, self.circuit )
+
+        # 4 KiB of tensor in blocks of at most 256 bytes
+        with MemmapCircuitTensor( self.target, self.circuit, 1024 ) as ct:
+            self.assertIsInstance( ct.tensor, np.memmap )
+            self.assertEqual( ct.num_chunks, 16 )
+            self.assertTrue( np.allclose( ct.utry, ref.utry ) )
+
+            for gate in self.circuit:
+                ct.apply_left( gate, inverse = True )
+                ref.apply_left( gate, inverse = True )
+            self.assertTrue( np.allclose( ct.utry, ref.utry ) )
+            self.assertIsInstance( ct.tensor, np.memmap )
+
+            for location in [ ( 0, ), ( 1, 2 ), ( 3, 0 ) ]:
+                env = ct.calc_env_matrix( location )
+                ref_env = ref.calc_env_matrix( location )
+                self.assertTrue( np.allclose( env, ref_env ) )
+
+            ct.reinitialize()
+            ref.reinitialize()
+            self.assertTrue( np.allclose( ct.utry, ref.utry ) )
+
+    def test_invalid_max_memory ( self ):
+        self.assertRaises( TypeError, MemmapCircuitTensor, self.target,
+                           self.circuit, 0 )
+        self.assertRaises( TypeError, MemmapCircuitTensor, self.target,
+                           self.circuit, 1.5 )
+
+    def test_is_unitary_streamed ( self ):
+        self.assertTrue( is_unitary_streamed( self.target, 3, 1e-12 ) )
+        self.assertTrue( is_unitary_streamed( self.target, 16, 1e-12 ) )
+
+        target = self.target.copy()
+        target[ 5, 7 ] += 1e-6
+        self.assertFalse( is_unitary_streamed( target, 3, 1e-12 ) )
+        self.assertRaises( TypeError, MemmapCircuitTensor, target,
+                           self.circuit, 1024 )
+
+    def test_target_check_memory ( self ):
+        target = utils.random_unitaries( 1, 2 ** 8, seed = 3 )[0]
+        circuit = [ Gate( np.identity( 4 ), ( 0, 1 ) ) ]
+
+        # The dense check alone would take 3 MiB
+        tracemalloc.start()
+        try:
+            with MemmapCircuitTensor( target, circuit, 2 ** 16 ):
+                peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertLess( peak, 2 ** 18 )
+
+    def test_optimize_memmap ( self ):
+        utrys = utils.random_unitaries( 2, 4, seed = 2 )
+        circuit = [ Gate( utrys[0], ( 0, 1 ) ), Gate( utrys[1], ( 1, 2 ) ) ]
+        target = CircuitTensor( np.identity( 8 ), circuit ).utry
+
+        start = [ Gate( np.identity( 4 ), ( 0, 1 ) ),
+                  Gate( np.identity( 4 ), ( 1, 2 ) ) ]
+
+        # The scratch files are closed, not left to the garbage collector
+        with warnings.catch_warnings( record = True ) as caught:
+            warnings.simplefilter( "always", ResourceWarning )
+            start = optimize_memmap( start, target, max_memory = 1024,
+                                     min_iters = 0 )
+            gc.collect()
+        self.assertFalse( any( [ issubclass( w.category, ResourceWarning )
+                                 for w in caught ] ) )
+        self.assertLess( get_distance( start, target ), 1e-8 )
+
+
+if __name__ == "__main__":
+    ut.main()
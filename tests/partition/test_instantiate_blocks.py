@@ -0,0 +1,44 @@
+import numpy as np
+import unittest as ut
+
+from scipy.stats import unitary_group
+
+from qfactor.gates import Gate
+from qfactor.tensors import CircuitTensor
+from qfactor.optimize import get_distance
+from qfactor.partition import instantiate_blocks, get_error_bound
+
+
+class TestInstantiateBlocks ( ut.TestCase ):
+
+    LOCATIONS = [ (0, 1), (1, 2), (2, 3), (3, 4) ]
+
+    def get_circuit ( self ):
+        return [ Gate( unitary_group.rvs( 4 ), loc )
+                 for loc in self.LOCATIONS ]
+
+    def test_instantiate_blocks ( self ):
+        target = self.get_circuit()
+        for num_workers in [ 1, 2 ]:
+            circ, blocks = instantiate_blocks( self.get_circuit(), target,
+                                               block_size = 3,
+                                               num_workers = num_workers )
+            self.assertEqual( len( blocks ), 2 )
+            self.assertEqual( [ g.location for g in circ ], self.LOCATIONS )
+
+            bound = get_error_bound( blocks )
+            utry = CircuitTensor( np.identity( 32 ), target ).utry
+            self.assertTrue( get_distance( circ, utry ) <= bound + 1e-8 )
+            self.assertTrue( bound < 1e-6 )
+
+    def test_instantiate_blocks_invalid ( self ):
+        circuit = self.get_circuit()
+        self.assertRaises( TypeError, instantiate_blocks, circuit, "a" )
+        self.assertRaises( ValueError, instantiate_blocks, circuit,
+                           circuit[:2] )
+        self.assertRaises( ValueError, instantiate_blocks, circuit,
+                           circuit[::-1] )
+
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,43 @@
+import numpy as np
+import unittest as ut
+
+from scipy.stats import unitary_group
+
+from qfactor.gates import Gate, RzGate
+from qfactor.partition import partition
+
+
+class TestPartition ( ut.TestCase ):
+
+    def test_partition ( self ):
+        locations = [ (0, 1), (1, 2), (0, 2), (2, 3), (3, 4), (2, 4), (0, 1) ]
+        circuit = [ Gate( unitary_group.rvs( 4 ), loc ) for loc in locations ]
+        blocks = partition( circuit, 3 )
+
+        self.assertEqual( [ ( b.start, b.end ) for b in blocks ],
+                          [ (0, 3), (3, 6), (6, 7) ] )
+        self.assertEqual( blocks[0].location, (0, 1, 2) )
+        self.assertEqual( blocks[1].location, (2, 3, 4) )
+        self.assertEqual( blocks[2].location, (0, 1) )
+
+    def test_partition_local_circuit ( self ):
+        circuit = [ RzGate( 1., 3 ), Gate( unitary_group.rvs( 4 ), (3, 5) ) ]
+        block = partition( circuit, 2 )[0]
+        local = block.get_local_circuit( circuit )
+        self.assertEqual( local[0].location, (0,) )
+        self.assertEqual( local[1].location, (0, 1) )
+        self.assertEqual( circuit[1].location, (3, 5) )
+
+        restored = block.get_global_circuit( local )
+        self.assertEqual( restored[1].location, (3, 5) )
+        self.assertTrue( np.array_equal( restored[1].utry, circuit[1].utry ) )
+
+    def test_partition_invalid ( self ):
+        circuit = [ Gate( unitary_group.rvs( 8 ), (0, 1, 2) ) ]
+        self.assertRaises( TypeError, partition, "a", 2 )
+        self.assertRaises( TypeError, partition, circuit, 0 )
+        self.assertRaises( ValueError, partition, circuit, 2 )
+
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,39 @@
+import numpy as np
+import unittest as ut
+
+from qfactor.gates import CnotGate, RzGate
+from qfactor.phase import optimize_phase, get_phase_distance
+
+
+class TestOptimizePhase ( ut.TestCase ):
+
+    def get_circuit ( self, thetas ):
+        circuit = []
+        for i, theta in enumerate( thetas ):
+            control, target = i % 3, 3 + i % 2
+            circuit += [ CnotGate( control, target ),
+                         RzGate( float( theta ), ( target, ) ),
+                         CnotGate( control, target ) ]
+        circuit += [ RzGate( float( thetas[0] ), ( q, ) ) for q in range( 5 ) ]
+        return circuit
+
+    def test_optimize_phase ( self ):
+        target = self.get_circuit( np.random.RandomState( 0 ).rand( 6 ) )
+        circuit = self.get_circuit( np.zeros( 6 ) )
+
+        circuit = optimize_phase( circuit, target, min_iters = 0 )
+        self.assertLess( get_phase_distance( circuit, target ), 1e-8 )
+
+    def test_optimize_phase_fixed ( self ):
+        target = self.get_circuit( np.ones( 6 ) )
+        circuit = self.get_circuit( np.zeros( 6 ) )
+        circuit[1] = RzGate( 0.0, ( 3, ), fixed = True )
+
+        circuit = optimize_phase( circuit, target, min_iters = 0,
+                                  max_iters = 50 )
+        self.assertEqual( circuit[1].theta, 0.0 )
+        self.assertGreater( get_phase_distance( circuit, target ), 1e-4 )
+
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,50 @@
+import numpy as np
+import unittest as ut
+
+from qfactor.gates import Gate, CnotGate, RzGate
+from qfactor.simulate import circuit_unitary
+from qfactor.phase import PhasePolynomial, get_phase_distance
+
+
+class TestPhasePolynomial ( ut.TestCase ):
+
+    def setUp ( self ):
+        self.circuit = [ CnotGate( 0, 1 ), RzGate( 0.3, ( 1, ) ),
+                         CnotGate( 1, 2 ), RzGate( 1.1, ( 2, ) ),
+                         CnotGate( 0, 2 ), RzGate( -0.4, ( 0, ) ),
+                         RzGate( 0.7, ( 2, ) ) ]
+
+    def test_matches_unitary ( self ):
+        poly = PhasePolynomial( self.circuit )
+        utry = circuit_unitary( self.circuit )
+        perm = np.argmax( np.abs( utry ), axis = 0 )
+
+        fixed = perm == np.arange( 8 )
+        self.assertTrue( np.array_equal( poly.get_fixed_points(), fixed ) )
+
+        phases = utry[ perm, np.arange( 8 ) ]
+        self.assertTrue( np.allclose( poly.get_phases(), phases ) )
+
+    def test_get_phase_distance ( self ):
+        circuit = self.circuit + [ CnotGate( 0, 2 ), CnotGate( 1, 2 ),
+                                   CnotGate( 0, 1 ) ]
+        target = circuit_unitary( circuit )
+        self.assertAlmostEqual( get_phase_distance( circuit, target ), 0 )
+        self.assertAlmostEqual( get_phase_distance( circuit, circuit ), 0 )
+
+        other = np.diag( np.exp( 1j * np.arange( 8 ) ) )
+        for circuit in [ circuit, self.circuit ]:
+            utry = circuit_unitary( circuit )
+            exact = 1 - np.abs( np.trace( other.conj().T @ utry ) ) / 8
+            distance = get_phase_distance( circuit, np.diagonal( other ) )
+            self.assertAlmostEqual( distance, exact )
+
+    def test_invalid ( self ):
+        self.assertRaises( TypeError, PhasePolynomial,
+                           [ Gate( np.identity( 2 ), ( 0, ) ) ] )
+        self.assertRaises( ValueError, get_phase_distance, self.circuit,
+                           circuit_unitary( [ CnotGate( 0, 1 ) ], 3 ) )
+
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,41 @@
+import numpy as np
+import unittest as ut
+
+from qfactor.gates import Gate, CnotGate, RzGate, RxGate
+from qfactor.reorder import commutes
+
+
+class TestCommutes ( ut.TestCase ):
+
+    def test_commutes_disjoint ( self ):
+        gate = Gate( np.identity( 4 ), ( 0, 1 ) )
+        self.assertTrue( commutes( gate, Gate( np.identity( 4 ), ( 2, 3 ) ) ) )
+        self.assertFalse( commutes( gate, Gate( np.identity( 4 ), ( 1, 2 ) ) ) )
+
+    def test_commutes_diagonal ( self ):
+        diag = Gate( np.diag( [ 1, 1j, -1, 1 ] ), ( 0, 1 ), fixed = True )
+        self.assertTrue( diag.is_diagonal() )
+        self.assertTrue( RzGate( 0.2, ( 1, ) ).is_diagonal() )
+        self.assertTrue( commutes( diag, RzGate( 0.2, ( 1, ) ) ) )
+
+        # An updated general gate may stop being diagonal
+        free = Gate( np.identity( 2 ), ( 1, ) )
+        self.assertFalse( free.is_diagonal() )
+        self.assertFalse( commutes( diag, free ) )
+
+    def test_commutes_cnot ( self ):
+        cnot = CnotGate( 0, 1 )
+        self.assertFalse( cnot.is_diagonal() )
+        self.assertTrue( commutes( cnot, RzGate( 0.2, ( 0, ) ) ) )
+        self.assertTrue( commutes( RzGate( 0.2, ( 0, ) ), cnot ) )
+        self.assertFalse( commutes( cnot, RzGate( 0.2, ( 1, ) ) ) )
+        self.assertFalse( commutes( cnot, RxGate( 0.2, ( 0, ) ) ) )
+
+        # CnotGates sharing only their control commute
+        self.assertTrue( commutes( cnot, CnotGate( 0, 2 ) ) )
+        self.assertFalse( commutes( cnot, CnotGate( 1, 2 ) ) )
+        self.assertFalse( commutes( cnot, CnotGate( 2, 1 ) ) )
+
+
+if __name__ == "__main__":
+    ut.main()
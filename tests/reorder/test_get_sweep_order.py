@@ -0,0 +1,68 @@
+import numpy as np
+import unittest as ut
+
+from qfactor import utils
+from qfactor.gates import Gate, CnotGate, RzGate
+from qfactor.simulate import circuit_unitary
+from qfactor.reorder import get_sweep_order, commutes
+
+
+class TestGetSweepOrder ( ut.TestCase ):
+
+    def test_get_sweep_order_groups ( self ):
+        utrys = utils.random_unitaries( 4, 4, seed = 0 )
+        circuit = [ Gate( utrys[0], ( 0, 1 ) ), Gate( utrys[1], ( 2, 3 ) ),
+                    Gate( utrys[2], ( 0, 1 ) ), Gate( utrys[3], ( 2, 3 ) ) ]
+        self.assertEqual( get_sweep_order( circuit ), [ 0, 2, 1, 3 ] )
+
+    def test_get_sweep_order_equivalent ( self ):
+        rng = np.random.RandomState( 1 )
+        utrys = utils.random_unitaries( 20, 4, seed = 1 )
+        circuit = []
+
+        for utry in utrys:
+            a, b = sorted( int( x ) for x in rng.choice( 5, 2, False ) )
+            circuit += [ Gate( utry, ( a, b ) ), CnotGate( a, b ),
+                         RzGate( float( rng.rand() ), ( a, ) ) ]
+
+        order = get_sweep_order( circuit )
+        self.assertEqual( sorted( order ), list( range( len( circuit ) ) ) )
+        self.assertNotEqual( order, list( range( len( circuit ) ) ) )
+
+        reordered = [ circuit[i] for i in order ]
+        self.assertTrue( np.allclose( circuit_unitary( reordered ),
+                                      circuit_unitary( circuit ) ) )
+
+    def test_get_sweep_order_dependencies ( self ):
+        rng = np.random.RandomState( 2 )
+        utrys = utils.random_unitaries( 100, 2, seed = 2 )
+        diag = Gate( np.diag( [ 1, 1j, -1, 1 ] ), ( 0, 1 ), fixed = True )
+        circuit = []
+
+        for utry in utrys:
+            a, b = sorted( int( x ) for x in rng.choice( 4, 2, False ) )
+            choices = [ Gate( utry, ( a, ) ), CnotGate( a, b ),
+                        CnotGate( b, a ),
+                        RzGate( float( rng.rand() ), ( b, ) ),
+                        Gate( diag.utry, ( a, b ), fixed = True ) ]
+            circuit.append( choices[ rng.randint( len( choices ) ) ] )
+
+        order = get_sweep_order( circuit )
+        position = { k: p for p, k in enumerate( order ) }
+
+        # Every pair that may not be swapped keeps its order
+        for j in range( len( circuit ) ):
+            for i in range( j ):
+                if not commutes( circuit[i], circuit[j] ):
+                    self.assertLess( position[i], position[j] )
+
+        reordered = [ circuit[i] for i in order ]
+        self.assertTrue( np.allclose( circuit_unitary( reordered ),
+                                      circuit_unitary( circuit ) ) )
+
+    def test_get_sweep_order_empty ( self ):
+        self.assertEqual( get_sweep_order( [] ), [] )
+
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,32 @@
+import numpy as np
+import unittest as ut
+
+from scipy.stats import unitary_group
+
+from qfactor.gates import Gate
+from qfactor.tensors import CircuitTensor
+from qfactor.optimize import get_distance
+from qfactor.sampled import optimize_sampled
+
+
+class TestOptimizeSampled ( ut.TestCase ):
+
+    def test_optimize_sampled ( self ):
+        u1 = unitary_group.rvs( 8 )
+        g1 = Gate( unitary_group.rvs( 8 ), (0, 1, 2) )
+        circ, dist = optimize_sampled( [ g1 ], u1, num_samples = 8 )
+        self.assertTrue( dist < 1e-8 )
+        self.assertTrue( get_distance( circ, u1 ) < 1e-8 )
+
+    def test_optimize_sampled_target_circuit ( self ):
+        target = [ Gate( unitary_group.rvs( 4 ), (0, 1) ),
+                   Gate( unitary_group.rvs( 4 ), (1, 2) ) ]
+        circuit = [ Gate( unitary_group.rvs( 4 ), (0, 1) ),
+                    Gate( unitary_group.rvs( 4 ), (1, 2) ) ]
+        circ, dist = optimize_sampled( circuit, target, num_samples = 4 )
+        utry = CircuitTensor( np.identity( 8 ), target ).utry
+        self.assertTrue( get_distance( circ, utry ) < 1e-8 )
+
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,65 @@
+import numpy as np
+import unittest as ut
+
+from scipy.stats import unitary_group
+
+from qfactor.gates import Gate
+from qfactor.tensors import CircuitTensor
+from qfactor.sampled import SampledCircuitTensor
+
+
+class TestSampledCircuitTensor ( ut.TestCase ):
+
+    LOCATIONS = [ (0, 1), (1, 3), (0, 2), (2,) ]
+
+    def get_circuit ( self ):
+        return [ Gate( unitary_group.rvs( 2 ** len( loc ) ), loc )
+                 for loc in self.LOCATIONS ]
+
+    def test_sampled_tensor_env ( self ):
+        target = unitary_group.rvs( 16 )
+        st = SampledCircuitTensor( target, self.get_circuit(), 4 )
+
+        # Environments are partial traces of the sampled product
+        ct = CircuitTensor( np.identity( 16 ), [] )
+        ct.tensor = st.utry.reshape( [2] * 8 )
+        for location in [ (0,), (1, 3), (0, 1, 2) ]:
+            self.assertTrue( np.allclose( st.calc_env_matrix( location ),
+                                          ct.calc_env_matrix( location ) ) )
+        self.assertTrue( np.allclose( st.calc_trace(), np.trace( st.utry ) ) )
+
+    def test_sampled_tensor_apply ( self ):
+        target = unitary_group.rvs( 16 )
+        gate = Gate( unitary_group.rvs( 4 ), (1, 2) )
+        st = SampledCircuitTensor( target, [], 4 )
+        prod = st.utry
+
+        st.apply_right( gate )
+        full = np.kron( np.identity( 2 ), np.kron( gate.utry, np.identity( 2 ) ) )
+        self.assertTrue( np.allclose( st.utry, full @ prod ) )
+
+        st.apply_left( gate )
+        self.assertTrue( np.allclose( st.utry, full @ prod @ full ) )
+
+    def test_sampled_tensor_target_circuit ( self ):
+        circuit = self.get_circuit()
+        target = CircuitTensor( np.identity( 16 ), circuit ).utry
+        st1 = SampledCircuitTensor( target, circuit, 4, seed = 7 )
+        st2 = SampledCircuitTensor( circuit, circuit, 4, seed = 7 )
+        self.assertEqual( st2.num_qubits, 4 )
+        self.assertTrue( np.allclose( st1.utry, st2.utry ) )
+
+        # Sample norms are scaled to sum to the dimension
+        self.assertTrue( np.isclose( np.abs( st1.calc_trace() ), 16 ) )
+
+    def test_sampled_tensor_invalid ( self ):
+        target = unitary_group.rvs( 4 )
+        self.assertRaises( TypeError, SampledCircuitTensor, np.ones( ( 4, 4 ) ), [] )
+        self.assertRaises( TypeError, SampledCircuitTensor, [ "a" ], [] )
+        self.assertRaises( TypeError, SampledCircuitTensor, target, [], 0 )
+        self.assertRaises( ValueError, SampledCircuitTensor, target,
+                           [ Gate( unitary_group.rvs( 4 ), (1, 2) ) ] )
+
+
+if __name__ == "__main__":
+    ut.main()
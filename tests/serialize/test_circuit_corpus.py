@@ -0,0 +1,53 @@
+import tempfile
+import numpy as np
+import unittest as ut
+
+from scipy.stats import unitary_group
+
+from qfactor import Gate, RyGate, CnotGate
+from qfactor.serialize import save_corpus, CircuitCorpus
+
+
+class TestCircuitCorpus ( ut.TestCase ):
+
+    def get_circuit ( self, num_qubits ):
+        return [ RyGate( np.random.random(), 0 ),
+                 CnotGate( 0, num_qubits - 1 ),
+                 Gate( unitary_group.rvs( 4 ), ( 0, 1 ) ) ]
+
+    def test_circuit_corpus ( self ):
+        circuits = [ self.get_circuit( n ) for n in [ 2, 3, 4 ] ]
+        targets = [ unitary_group.rvs( 4 ), None, unitary_group.rvs( 16 ) ]
+        metadata = [ { "i": i } for i in range( 3 ) ]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            save_corpus( tmpdir, circuits, targets, metadata )
+            corpus = CircuitCorpus( tmpdir )
+            self.assertEqual( len( corpus ), 3 )
+
+            for i in [ 2, 0, 1 ]:
+                circ, targ, meta = corpus[i]
+                self.assertEqual( meta, { "i": i } )
+
+                if targets[i] is None:
+                    self.assertIsNone( targ )
+                else:
+                    self.assertTrue( np.allclose( targ, targets[i] ) )
+
+                for g1, g2 in zip( circ, circuits[i] ):
+                    self.assertEqual( type( g1 ), type( g2 ) )
+                    self.assertEqual( g1.location, g2.location )
+                    self.assertTrue( np.allclose( g1.utry, g2.utry ) )
+
+            self.assertRaises( IndexError, corpus.get_circuit, 3 )
+            self.assertRaises( TypeError, corpus.get_circuit, "a" )
+            del corpus
+
+    def test_circuit_corpus_invalid ( self ):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.assertRaises( ValueError, save_corpus, tmpdir,
+                               [ self.get_circuit( 2 ) ], [] )
+
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import numpy as np
+import unittest as ut
+
+from scipy.stats import unitary_group
+
+from qfactor import Gate, RxGate, RyGate, RzGate, CnotGate
+from qfactor.gates import XXGate
+from qfactor.serialize import save_circuit, load_circuit
+
+
+class TestSaveCircuit ( ut.TestCase ):
+
+    def get_circuit ( self ):
+        return [ RxGate( np.random.random(), 0 ),
+                 RyGate( np.random.random(), 1, fixed = True ),
+                 CnotGate( 0, 1 ),
+                 RzGate( np.random.random(), 2 ),
+                 XXGate( np.random.random(), ( 1, 2 ) ),
+                 Gate( unitary_group.rvs( 8 ), ( 0, 1, 2 ) ) ]
+
+    def assertCircuitsEqual ( self, c1, c2 ):
+        self.assertEqual( len( c1 ), len( c2 ) )
+        for g1, g2 in zip( c1, c2 ):
+            self.assertEqual( type( g1 ), type( g2 ) )
+            self.assertEqual( g1.location, g2.location )
+            self.assertEqual( g1.fixed, g2.fixed )
+            self.assertTrue( np.allclose( g1.utry, g2.utry ) )
+
+    def test_save_circuit ( self ):
+        circuit = self.get_circuit()
+        target = unitary_group.rvs( 8 )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join( tmpdir, "circ.npz" )
+            save_circuit( filename, circuit, target, { "distance": 0.5 } )
+            circ, targ, metadata = load_circuit( filename )
+
+        self.assertCircuitsEqual( circuit, circ )
+        self.assertTrue( np.allclose( target, targ ) )
+        self.assertEqual( metadata, { "distance": 0.5 } )
+
+    def test_save_circuit_no_target ( self ):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join( tmpdir, "circ.npz" )
+            save_circuit( filename, [] )
+            circ, targ, metadata = load_circuit( filename )
+
+        self.assertEqual( circ, [] )
+        self.assertIsNone( targ )
+        self.assertIsNone( metadata )
+
+    def test_save_circuit_invalid ( self ):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join( tmpdir, "circ.npz" )
+            self.assertRaises( TypeError, save_circuit, filename, [ 0 ] )
+
+
+if __name__ == "__main__":
+    ut.main()
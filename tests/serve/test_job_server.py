@@ -0,0 +1,121 @@
+import os
+import time
+import tempfile
+import threading
+import numpy as np
+import unittest as ut
+
+from scipy.stats import unitary_group
+
+from qfactor import Gate
+from qfactor.optimize import get_distance
+from qfactor import serve
+from qfactor.serve import JobServer, make_server, submit, encode_problem
+
+
+class TestJobServer ( ut.TestCase ):
+
+    @classmethod
+    def setUpClass ( cls ):
+        cls.job_server = JobServer( num_workers = 2, max_queue = 4 )
+
+    @classmethod
+    def tearDownClass ( cls ):
+        cls.job_server.shutdown()
+
+    def serve ( self, **kwargs ):
+        server = make_server( self.job_server, **kwargs )
+        thread = threading.Thread( target = server.serve_forever )
+        thread.start()
+        self.addCleanup( thread.join )
+        self.addCleanup( server.server_close )
+        self.addCleanup( server.shutdown )
+        return server
+
+    def test_job_server_port ( self ):
+        server = self.serve( port = 0 )
+        target = unitary_group.rvs( 4 )
+        circuit = [ Gate( unitary_group.rvs( 4 ), ( 0, 1 ) ) ]
+        circ, result = submit( circuit, target,
+                               port = server.server_address[1],
+                               min_iters = 0 )
+        self.assertTrue( result[ "distance" ] < 1e-8 )
+        self.assertTrue( get_distance( circ, target ) < 1e-8 )
+
+    def test_job_server_socket ( self ):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join( tmpdir, "qfactor.sock" )
+            self.serve( socket_path = path )
+            target = unitary_group.rvs( 16 )
+            circuit = [ Gate( unitary_group.rvs( 8 ), ( 0, 1, 2 ) ) ]
+            circ, result = submit( circuit, target, socket_path = path,
+                                   deadline = 0.05, min_iters = 100000 )
+            self.assertTrue( result[ "timed_out" ] )
+            self.assertEqual( len( circ ), 1 )
+
+    def test_job_server_queue_full ( self ):
+        problem = encode_problem( [ Gate( np.identity( 2 ), ( 0, ) ) ],
+                                  np.identity( 2 ) )
+        with self.job_server.lock:
+            self.job_server.num_jobs = self.job_server.max_queue
+        try:
+            status, reply = self.job_server.run_job( { "problem": problem } )
+        finally:
+            with self.job_server.lock:
+                self.job_server.num_jobs = 0
+        self.assertEqual( status, 503 )
+
+    def test_job_server_expired ( self ):
+        problem = encode_problem( [ Gate( np.identity( 2 ), ( 0, ) ) ],
+                                  np.identity( 2 ) )
+        status, _ = self.job_server.run_job( { "problem": problem,
+                                               "deadline": 0.0 } )
+        self.assertEqual( status, 504 )
+        self.assertIsNone( serve._run_job( problem, time.time(), None ) )
+
+    def test_job_server_slot_held ( self ):
+        problem = encode_problem( [ Gate( unitary_group.rvs( 8 ),
+                                          ( 0, 1, 2 ) ) ],
+                                  unitary_group.rvs( 16 ) )
+        job = { "problem": problem, "deadline": 0.5,
+                "options": { "min_iters": 100000 } }
+
+        grace = serve.DEADLINE_GRACE
+        serve.DEADLINE_GRACE = -0.45
+        try:
+            status, _ = self.job_server.run_job( job )
+        finally:
+            serve.DEADLINE_GRACE = grace
+
+        # The worker is still running the job, so it keeps its slot
+        self.assertEqual( status, 504 )
+        self.assertEqual( self.job_server.get_status()[ "jobs" ], 1 )
+
+        for _ in range( 100 ):
+            if self.job_server.get_status()[ "jobs" ] == 0:
+                break
+            time.sleep( 0.05 )
+        self.assertEqual( self.job_server.get_status()[ "jobs" ], 0 )
+
+    def test_job_server_failure ( self ):
+        job_server = JobServer( num_workers = 1 )
+        job_server.shutdown()
+        problem = encode_problem( [ Gate( np.identity( 2 ), ( 0, ) ) ],
+                                  np.identity( 2 ) )
+        status, _ = job_server.run_job( { "problem": problem } )
+        self.assertEqual( status, 500 )
+        self.assertEqual( job_server.get_status()[ "jobs" ], 0 )
+
+    def test_job_server_invalid ( self ):
+        status, _ = self.job_server.run_job( {} )
+        self.assertEqual( status, 400 )
+        status, _ = self.job_server.run_job( [] )
+        self.assertEqual( status, 400 )
+        problem = encode_problem( [ Gate( np.identity( 2 ), ( 0, ) ) ] )
+        status, _ = self.job_server.run_job( { "problem": problem } )
+        self.assertEqual( status, 400 )
+        self.assertEqual( self.job_server.get_status()[ "jobs" ], 0 )
+
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,73 @@
+import pickle
+import numpy as np
+import unittest as ut
+from concurrent.futures import ProcessPoolExecutor
+
+from scipy.stats import unitary_group
+
+from qfactor import Gate
+from qfactor.tensors import CircuitTensor
+from qfactor.optimize import get_distance
+from qfactor.shared import SharedProblems, optimize_shared
+
+
+def get_target_info ( problems, index ):
+    circuit, target = problems[ index ]
+    info = ( target.flags.writeable, target.flags.owndata,
+             CircuitTensor( target, circuit ).utry.shape )
+    del target
+    problems.close()
+    return info
+
+
+class TestSharedProblems ( ut.TestCase ):
+
+    def get_problems ( self ):
+        circuits = [ [ Gate( unitary_group.rvs( 4 ), ( 0, 1 ) ),
+                       Gate( unitary_group.rvs( 4 ), ( 1, 2 ) ) ]
+                     for _ in range( 3 ) ]
+        targets = [ CircuitTensor( np.identity( 8 ), c ).utry
+                    for c in circuits ]
+        return circuits, targets
+
+    def test_shared_problems ( self ):
+        circuits, targets = self.get_problems()
+
+        with SharedProblems( circuits, targets ) as problems:
+            self.assertEqual( len( problems ), 3 )
+            self.assertLess( len( pickle.dumps( problems ) ), 2000 )
+
+            for i in range( 3 ):
+                circuit, target = problems[i]
+                self.assertTrue( np.allclose( target, targets[i] ) )
+                for g1, g2 in zip( circuit, circuits[i] ):
+                    self.assertTrue( np.allclose( g1.utry, g2.utry ) )
+                del target
+
+            with ProcessPoolExecutor( max_workers = 2 ) as executor:
+                infos = list( executor.map( get_target_info,
+                                            [ problems ] * 3, range( 3 ) ) )
+                self.assertEqual( infos, [ ( False, False, ( 8, 8 ) ) ] * 3 )
+
+    def test_optimize_shared ( self ):
+        circuits, targets = self.get_problems()
+
+        with SharedProblems( circuits, targets ) as problems:
+            with ProcessPoolExecutor( max_workers = 2 ) as executor:
+                results = list( executor.map( optimize_shared,
+                                              [ problems ] * 3, range( 3 ) ) )
+
+        for circuit, target in zip( results, targets ):
+            self.assertTrue( get_distance( circuit, target ) < 1e-8 )
+
+    def test_shared_problems_invalid ( self ):
+        circuits, targets = self.get_problems()
+        self.assertRaises( ValueError, SharedProblems, circuits, targets[:1] )
+
+        with SharedProblems( circuits, targets ) as problems:
+            self.assertRaises( IndexError, problems.get_circuit, 3 )
+            self.assertRaises( TypeError, problems.get_target, "a" )
+
+
+if __name__ == "__main__":
+    ut.main()
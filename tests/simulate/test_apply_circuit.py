@@ -0,0 +1,63 @@
+import numpy as np
+import unittest as ut
+
+from qfactor import utils
+from qfactor.gates import Gate, CnotGate, RzGate
+from qfactor.simulate import apply_circuit, apply_gate, circuit_unitary
+
+
+class TestApplyCircuit ( ut.TestCase ):
+
+    def setUp ( self ):
+        utrys = utils.random_unitaries( 2, 4, seed = 1 )
+        self.circuit = [ Gate( utrys[0], ( 1, 3 ) ), CnotGate( 0, 3 ),
+                         RzGate( 1.1, ( 2, ) ), Gate( utrys[1], ( 0, 2 ) ) ]
+        self.utry = circuit_unitary( self.circuit )
+
+    def test_apply_circuit_vector ( self ):
+        state = utils.random_unitaries( 1, 16, seed = 2 )[0][:, 0]
+        out = apply_circuit( self.circuit, state )
+        self.assertTrue( np.allclose( out, self.utry @ state ) )
+
+    def test_apply_circuit_batch ( self ):
+        states = utils.random_unitaries( 1, 16, seed = 3 )[0][:, :5]
+        out = apply_circuit( self.circuit, states )
+        self.assertTrue( np.allclose( out, self.utry @ states ) )
+
+    def test_apply_circuit_in_place ( self ):
+        states = utils.random_unitaries( 1, 16, seed = 4 )[0][:, :3]
+        expected = self.utry @ states
+        states = np.ascontiguousarray( states )
+        out = apply_circuit( self.circuit, states, out = states )
+        self.assertIs( out, states )
+        self.assertTrue( np.allclose( states, expected ) )
+
+    def test_apply_gate_fast_paths ( self ):
+        tensor = utils.random_unitaries( 1, 4, seed = 5 )[0]
+        tensor = tensor.reshape( [2] * 4 )
+        phases = np.exp( 1j * np.arange( 4 ) )
+        utrys = [ np.diag( phases ),
+                  CnotGate( 0, 1 ).utry,
+                  np.diag( phases )[ [ 1, 3, 0, 2 ] ] ]
+
+        for utry in utrys:
+            for axes in [ [ 0, 1 ], [ 2, 0 ] ]:
+                ref = np.moveaxis( tensor, axes, [ 0, 1 ] ).reshape( 4, -1 )
+                ref = ( utry @ ref ).reshape( [2] * 4 )
+                ref = np.moveaxis( ref, [ 0, 1 ], axes )
+
+                out = tensor.copy()
+                apply_gate( out, utry, axes )
+                self.assertTrue( np.allclose( out, ref ) )
+
+    def test_apply_circuit_invalid ( self ):
+        self.assertRaises( ValueError, apply_circuit, self.circuit,
+                           np.ones( 8 ) )
+        self.assertRaises( ValueError, apply_circuit, self.circuit,
+                           np.ones( 12 ) )
+        self.assertRaises( ValueError, apply_circuit, self.circuit,
+                           np.ones( 16 ), np.ones( 8 ) )
+
+
+if __name__ == "__main__":
+    ut.main()
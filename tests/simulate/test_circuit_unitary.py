@@ -0,0 +1,33 @@
+import numpy as np
+import unittest as ut
+
+from qfactor import utils
+from qfactor.gates import Gate, CnotGate, RzGate, RxGate
+from qfactor.tensors import CircuitTensor
+from qfactor.simulate import circuit_unitary
+
+
+class TestCircuitUnitary ( ut.TestCase ):
+
+    def test_circuit_unitary ( self ):
+        utrys = utils.random_unitaries( 2, 4, seed = 0 )
+        circuit = [ Gate( utrys[0], ( 0, 2 ) ), CnotGate( 1, 2 ),
+                    RzGate( 0.7, ( 1, ) ), CnotGate( 0, 3 ),
+                    RxGate( 0.2, ( 3, ) ), Gate( utrys[1], ( 1, 3 ) ) ]
+
+        utry = circuit_unitary( circuit )
+        ref = CircuitTensor( np.identity( 16 ), circuit ).utry
+        self.assertTrue( np.allclose( utry, ref ) )
+
+    def test_circuit_unitary_num_qubits ( self ):
+        utry = circuit_unitary( [ CnotGate( 0, 1 ) ], num_qubits = 3 )
+        ref = np.kron( CnotGate( 0, 1 ).utry, np.identity( 2 ) )
+        self.assertTrue( np.allclose( utry, ref ) )
+
+    def test_circuit_unitary_invalid ( self ):
+        self.assertRaises( TypeError, circuit_unitary, "a" )
+        self.assertRaises( TypeError, circuit_unitary, [ 1 ] )
+
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,65 @@
+import sys
+import subprocess
+import numpy as np
+import unittest as ut
+
+from qfactor import utils
+from qfactor.gates import Gate, CnotGate
+from qfactor.optimize import get_distance
+from qfactor.simulate import estimate_distance, circuit_unitary
+
+
+class TestEstimateDistance ( ut.TestCase ):
+
+    def setUp ( self ):
+        utrys = utils.random_unitaries( 3, 4, seed = 0 )
+        self.target = [ Gate( utrys[0], ( 0, 1 ) ), CnotGate( 1, 3 ),
+                        Gate( utrys[1], ( 2, 3 ) ) ]
+        self.circuit = self.target[:2] + [ Gate( utrys[2], ( 2, 3 ) ) ]
+
+    def test_estimate_distance_exact ( self ):
+        distance, half_width = estimate_distance( self.target, self.target,
+                                                  seed = 1 )
+        self.assertAlmostEqual( distance, 0 )
+        self.assertAlmostEqual( half_width, 0 )
+
+    def test_estimate_distance ( self ):
+        exact = get_distance( self.circuit, self.target )
+
+        for target in [ self.target, circuit_unitary( self.target ) ]:
+            distance, half_width = estimate_distance( self.circuit, target,
+                                                      tol = 0.02,
+                                                      max_probes = 4096,
+                                                      seed = 2 )
+            self.assertLessEqual( half_width, 0.02 )
+            self.assertLess( abs( distance - exact ), 0.05 )
+
+    def test_get_distance_tol ( self ):
+        exact = get_distance( self.circuit, self.target )
+        distance = get_distance( self.circuit, self.target, tol = 0.02,
+                                 max_probes = 4096, seed = 3 )
+        self.assertLess( abs( distance - exact ), 0.05 )
+
+    def test_max_probes ( self ):
+        distance, half_width = estimate_distance( self.circuit, self.target,
+                                                  tol = 1e-9, max_probes = 16,
+                                                  seed = 4 )
+        self.assertGreater( half_width, 1e-9 )
+
+    def test_estimate_distance_invalid ( self ):
+        self.assertRaises( TypeError, estimate_distance, self.circuit,
+                           self.target, tol = 0 )
+        self.assertRaises( TypeError, estimate_distance, self.circuit,
+                           self.target, confidence = 1.0 )
+        self.assertRaises( TypeError, estimate_distance, self.circuit,
+                           np.ones( ( 4, 4 ) ) )
+
+    def test_estimate_distance_no_scipy_stats ( self ):
+        # scipy.stats is slow to import; importing qfactor must not load it
+        code = "import sys, qfactor; print( 'scipy.stats' in sys.modules )"
+        output = subprocess.check_output( [ sys.executable, "-c", code ] )
+        self.assertEqual( output.strip(), b"False" )
+
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,43 @@
+import os
+import tempfile
+import numpy as np
+import unittest as ut
+
+from scipy.stats import unitary_group
+
+from qfactor import Gate
+from qfactor.optimize import get_distance
+from qfactor.store import SolutionStore, optimize_cached
+
+
+class TestOptimizeCached ( ut.TestCase ):
+
+    def test_optimize_cached ( self ):
+        target = unitary_group.rvs( 4 )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = SolutionStore( os.path.join( tmpdir, "store.db" ) )
+            circuit = [ Gate( unitary_group.rvs( 4 ), ( 0, 1 ) ) ]
+            circ1 = optimize_cached( circuit, target, store )
+            self.assertTrue( get_distance( circ1, target ) < 1e-8 )
+            self.assertEqual( len( store ), 1 )
+
+            circuit = [ Gate( unitary_group.rvs( 4 ), ( 0, 1 ) ) ]
+            circ2 = optimize_cached( circuit, target, store )
+            self.assertIsNot( circ2, circuit )
+            self.assertTrue( np.allclose( circ1[0].utry, circ2[0].utry ) )
+
+    def test_optimize_cached_unconverged ( self ):
+        target = unitary_group.rvs( 8 )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = SolutionStore( os.path.join( tmpdir, "store.db" ) )
+            circuit = [ Gate( np.identity( 4 ), ( 0, 1 ) ),
+                        Gate( np.identity( 4 ), ( 1, 2 ) ) ]
+            optimize_cached( circuit, target, store, max_iters = 5,
+                             min_iters = 0 )
+            self.assertEqual( len( store ), 0 )
+
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,106 @@
+import os
+import tempfile
+import numpy as np
+import unittest as ut
+from concurrent.futures import ProcessPoolExecutor
+
+from scipy.stats import unitary_group
+
+from qfactor import Gate, CnotGate
+from qfactor.store import SolutionStore
+
+
+def put_solution ( args ):
+    store, seed = args
+    np.random.seed( seed )
+    circuit = [ Gate( unitary_group.rvs( 4 ), ( 0, 1 ) ) ]
+    store.put( circuit, np.identity( 4 ), 1e-10, 0.0 )
+    return store.get( circuit, np.identity( 4 ), 1e-10 ) is not None
+
+
+class TestSolutionStore ( ut.TestCase ):
+
+    def get_circuit ( self ):
+        return [ Gate( unitary_group.rvs( 4 ), ( 0, 1 ) ),
+                 CnotGate( 1, 2 ),
+                 Gate( unitary_group.rvs( 4 ), ( 0, 1 ) ) ]
+
+    def test_solution_store ( self ):
+        circuit = self.get_circuit()
+        target = unitary_group.rvs( 8 )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = SolutionStore( os.path.join( tmpdir, "store.db" ) )
+            self.assertIsNone( store.get( circuit, target, 1e-10 ) )
+
+            store.put( circuit, target, 1e-2, 1e-3 )
+            self.assertEqual( len( store ), 1 )
+
+            # Free gate values do not change the structure
+            solution = store.get( self.get_circuit(), target, 1e-2 )
+            for g1, g2 in zip( circuit, solution ):
+                self.assertTrue( np.allclose( g1.utry, g2.utry ) )
+
+            # Any tolerance is served if the distance is within it
+            self.assertIsNotNone( store.get( circuit, target, 1e-1 ) )
+            self.assertIsNone( store.get( circuit, target, 1e-4 ) )
+            self.assertIsNone( store.get( circuit, np.identity( 8 ), 1e-2 ) )
+            self.assertIsNone( store.get( circuit[:2], target, 1e-2 ) )
+
+            # A second store on the same file sees the solution
+            other = SolutionStore( os.path.join( tmpdir, "store.db" ) )
+            self.assertIsNotNone( other.get( circuit, target, 1e-2 ) )
+
+    def test_solution_store_distance ( self ):
+        target = unitary_group.rvs( 8 )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = SolutionStore( os.path.join( tmpdir, "store.db" ) )
+
+            # Solutions outside their tolerance are not stored
+            store.put( self.get_circuit(), target, 1e-10, 0.5 )
+            self.assertEqual( len( store ), 0 )
+
+            # A worse solution does not replace a better one
+            better = self.get_circuit()
+            store.put( better, target, 1e-2, 1e-4 )
+            store.put( self.get_circuit(), target, 1e-2, 1e-3 )
+            solution = store.get( better, target, 1e-2 )
+            self.assertTrue( np.allclose( better[0].utry, solution[0].utry ) )
+
+            closer = self.get_circuit()
+            store.put( closer, target, 1e-2, 1e-5 )
+            solution = store.get( better, target, 1e-2 )
+            self.assertTrue( np.allclose( closer[0].utry, solution[0].utry ) )
+            self.assertEqual( len( store ), 1 )
+
+    def test_solution_store_eviction ( self ):
+        target = np.identity( 8 )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = SolutionStore( os.path.join( tmpdir, "store.db" ),
+                                   max_bytes = 10000 )
+            circuits = [ self.get_circuit()[:k] for k in range( 1, 4 ) ]
+            for k, circuit in enumerate( circuits ):
+                store.put( circuit, target, 1e-10, 0.0 )
+                if k == 0:
+                    store.get( circuit, target, 1e-10 )
+
+            self.assertLess( len( store ), 3 )
+            self.assertIsNotNone( store.get( circuits[-1], target, 1e-10 ) )
+
+    def test_solution_store_processes ( self ):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = SolutionStore( os.path.join( tmpdir, "store.db" ) )
+            with ProcessPoolExecutor( max_workers = 4 ) as executor:
+                jobs = [ ( store, seed ) for seed in range( 8 ) ]
+                self.assertTrue( all( executor.map( put_solution, jobs ) ) )
+            self.assertEqual( len( store ), 1 )
+
+    def test_solution_store_invalid ( self ):
+        self.assertRaises( TypeError, SolutionStore, "store.db",
+                           max_bytes = 0 )
+
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,28 @@
+import numpy as np
+import unittest as ut
+
+from scipy.stats import unitary_group
+
+from qfactor.tensors import apply_matrix
+
+
+class TestApplyMatrix ( ut.TestCase ):
+
+    def test_apply_matrix ( self ):
+        u1 = unitary_group.rvs( 8 )
+        u2 = unitary_group.rvs( 4 )
+        tensor = apply_matrix( u1.reshape( [2] * 6 ), u2, [ 0, 1 ] )
+        prod = np.kron( u2, np.identity( 2 ) ) @ u1
+        self.assertTrue( np.allclose( tensor.reshape( ( 8, 8 ) ), prod ) )
+
+    def test_apply_matrix_order ( self ):
+        u1 = unitary_group.rvs( 8 )
+        u2 = unitary_group.rvs( 4 )
+        tensor = apply_matrix( u1.reshape( [2] * 6 ), u2, [ 4, 3 ] )
+        swap = np.identity( 4 )[ [ 0, 2, 1, 3 ] ]
+        prod = u1 @ np.kron( swap @ u2.T @ swap, np.identity( 2 ) )
+        self.assertTrue( np.allclose( tensor.reshape( ( 8, 8 ) ), prod ) )
+
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,21 @@
+import numpy as np
+import unittest as ut
+
+from scipy.stats import unitary_group
+
+from qfactor.gates import Gate
+from qfactor.tensors import CircuitTensor
+
+
+class TestCalcTrace ( ut.TestCase ):
+
+    def test_calc_trace ( self ):
+        u1 = unitary_group.rvs( 8 )
+        u2 = unitary_group.rvs( 4 )
+        ct = CircuitTensor( u1, [ Gate( u2, (0, 1) ) ] )
+        prod = np.kron( u2, np.identity( 2 ) ) @ u1.conj().T
+        self.assertTrue( np.allclose( ct.calc_trace(), np.trace( prod ) ) )
+
+
+if __name__ == "__main__":
+    ut.main()
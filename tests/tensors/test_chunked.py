@@ -0,0 +1,81 @@
+import numpy as np
+import unittest as ut
+
+from concurrent.futures import ThreadPoolExecutor
+
+from qfactor import utils
+from qfactor.optimize import optimize, get_distance
+from qfactor.gates import Gate, CnotGate, RzGate
+from qfactor.tensors import CircuitTensor, MIN_CHUNK_QUBITS
+from qfactor.tensors import apply_matrix, apply_matrix_chunked
+
+
+class TestChunked ( ut.TestCase ):
+
+    @classmethod
+    def setUpClass ( cls ):
+        cls.executor = ThreadPoolExecutor( 4 )
+
+    @classmethod
+    def tearDownClass ( cls ):
+        cls.executor.shutdown()
+
+    def get_circuit ( self, num_qubits ):
+        utrys = utils.random_unitaries( num_qubits, 4, seed = 0 )
+        locations = [ tuple( sorted( ( i, ( i + 3 ) % num_qubits ) ) )
+                      for i in range( num_qubits ) ]
+        circuit = [ Gate( utry, location )
+                    for utry, location in zip( utrys, locations ) ]
+        circuit.append( CnotGate( 0, 2 ) )
+        circuit.append( RzGate( 0.3, ( 5, ) ) )
+        return circuit
+
+    def test_apply_matrix_chunked ( self ):
+        tensor = utils.random_unitaries( 1, 16, seed = 1 )[0]
+        tensor = tensor.reshape( [2] * 8 )
+        matrix = utils.random_unitaries( 1, 4, seed = 2 )[0]
+
+        for num_chunks in [ 1, 2, 3, 8, 1024 ]:
+            for axes in [ [ 0, 1 ], [ 5, 2 ], [ 7, 6 ] ]:
+                out = apply_matrix_chunked( tensor, matrix, axes,
+                                            self.executor, num_chunks )
+                ref = apply_matrix( tensor, matrix, axes )
+                self.assertTrue( np.allclose( out, ref ) )
+
+    def test_circuit_tensor_chunked ( self ):
+        num_qubits = MIN_CHUNK_QUBITS
+        target = utils.random_unitaries( 1, 2 ** num_qubits, seed = 3 )[0]
+        circuit = self.get_circuit( num_qubits )
+
+        ref = CircuitTensor( target, circuit )
+        ct = CircuitTensor( target, circuit, executor = self.executor )
+        self.assertTrue( np.allclose( ct.utry, ref.utry ) )
+
+        for gate in circuit[:3]:
+            ref.apply_left( gate, inverse = True )
+            ct.apply_left( gate, inverse = True )
+        self.assertTrue( np.allclose( ct.utry, ref.utry ) )
+
+        for location in [ ( 0, ), ( 1, 4 ), ( 6, 2 ), ( 0, 1, 2, 3, 4, 5, 6 ) ]:
+            env = ct.calc_env_matrix( location )
+            ref_env = ref.calc_env_matrix( location )
+            self.assertTrue( np.allclose( env, ref_env ) )
+
+    def test_invalid_num_chunks ( self ):
+        target = np.identity( 4 )
+        self.assertRaises( TypeError, CircuitTensor, target, [],
+                           num_chunks = 0 )
+
+    def test_optimize_executor ( self ):
+        num_qubits = MIN_CHUNK_QUBITS
+        circuit = self.get_circuit( num_qubits )[:3]
+        target = CircuitTensor( np.identity( 2 ** num_qubits ), circuit ).utry
+        start = [ Gate( np.identity( 4 ), gate.location ) for gate in circuit ]
+
+        start = optimize( start, target, min_iters = 0, max_iters = 200,
+                          executor = self.executor )
+        self.assertLess( get_distance( start, target ), 1e-8 )
+
+
+if __name__ == "__main__":
+    ut.main()
@@ -45,6 +45,12 @@ class TestCircuitTensorConstructor ( ut.TestCase ):
         self.assertTrue( len( ct.gate_list ) == 1 )
         self.assertTrue( np.allclose( ct.utry, np.identity( 8 ) ) )
 
+    def test_gate_constructor_dtype ( self ):
+        gate = Gate( self.TOFFOLI, (0, 1, 2) )
+        ct = CircuitTensor( self.TOFFOLI, [ gate ], np.float64 )
+        self.assertEqual( ct.utry.dtype, np.float64 )
+        self.assertTrue( np.allclose( ct.utry, np.identity( 8 ) ) )
+
 
 if __name__ == '__main__':
     ut.main()
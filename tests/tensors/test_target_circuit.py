@@ -0,0 +1,54 @@
+import numpy as np
+import unittest as ut
+
+from concurrent.futures import ThreadPoolExecutor
+
+from qfactor import utils
+from qfactor.gates import Gate, CnotGate
+from qfactor.tensors import CircuitTensor
+
+
+class TestTargetCircuit ( ut.TestCase ):
+
+    def setUp ( self ):
+        utrys = utils.random_unitaries( 2, 4, seed = 0 )
+        self.target = [ Gate( utrys[0], ( 0, 2 ) ),
+                        CnotGate( 1, 2 ),
+                        Gate( utrys[1], ( 0, 1 ) ) ]
+        self.circuit = [ Gate( utils.random_unitaries( 1, 4, seed = 1 )[0],
+                               ( 1, 2 ) ) ]
+
+    def test_matches_dense_target ( self ):
+        dense = CircuitTensor( np.identity( 8 ), self.target ).utry
+        ref = CircuitTensor( dense, self.circuit )
+        ct = CircuitTensor( self.target, self.circuit )
+        self.assertEqual( ct.num_qubits, 3 )
+        self.assertTrue( np.allclose( ct.utry, ref.utry ) )
+
+        ct.reinitialize()
+        self.assertTrue( np.allclose( ct.utry, ref.utry ) )
+
+    def test_chunked ( self ):
+        target = self.target + [ CnotGate( 5, 6 ) ]
+        dense = CircuitTensor( np.identity( 128 ), target ).utry
+        ref = CircuitTensor( dense, self.circuit )
+
+        with ThreadPoolExecutor( 2 ) as executor:
+            ct = CircuitTensor( target, self.circuit, executor = executor )
+            self.assertTrue( np.allclose( ct.utry, ref.utry ) )
+
+    def test_num_qubits ( self ):
+        ct = CircuitTensor( self.target, [], num_qubits = 4 )
+        self.assertEqual( ct.num_qubits, 4 )
+
+        self.assertRaises( ValueError, CircuitTensor, self.target, [],
+                           num_qubits = 2 )
+        self.assertRaises( ValueError, CircuitTensor, np.identity( 8 ), [],
+                           num_qubits = 2 )
+
+    def test_invalid ( self ):
+        self.assertRaises( TypeError, CircuitTensor, [ 1 ], [] )
+
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,27 @@
+import unittest as ut
+
+from qfactor.threads import get_blas_threads, get_num_workers
+
+
+class TestGetBlasThreads ( ut.TestCase ):
+
+    def test_get_blas_threads ( self ):
+        self.assertEqual( get_blas_threads( 3, 1, 32 ), 1 )
+        self.assertEqual( get_blas_threads( 7, 1, 32 ), 1 )
+        self.assertEqual( get_blas_threads( 9, 1, 32 ), 16 )
+        self.assertEqual( get_blas_threads( 12, 1, 32 ), 32 )
+        self.assertEqual( get_blas_threads( 12, 4, 32 ), 8 )
+        self.assertEqual( get_blas_threads( 12, 64, 32 ), 1 )
+
+    def test_get_num_workers ( self ):
+        self.assertEqual( get_num_workers( 3, 32 ), 32 )
+        self.assertEqual( get_num_workers( 9, 32 ), 2 )
+        self.assertEqual( get_num_workers( 12, 32 ), 1 )
+
+    def test_get_blas_threads_invalid ( self ):
+        self.assertRaises( TypeError, get_blas_threads, -1, 1, 4 )
+        self.assertRaises( TypeError, get_blas_threads, 3, 0, 4 )
+
+
+if __name__ == "__main__":
+    ut.main()
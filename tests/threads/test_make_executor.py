@@ -0,0 +1,24 @@
+import os
+import unittest as ut
+
+from qfactor.threads import make_executor, get_cores
+
+
+def get_worker_state ( _ ):
+    return os.environ.get( "OMP_NUM_THREADS" ), get_cores()
+
+
+class TestMakeExecutor ( ut.TestCase ):
+
+    def test_make_executor ( self ):
+        with make_executor( 3, num_workers = 2 ) as executor:
+            states = list( executor.map( get_worker_state, range( 4 ) ) )
+
+        for threads, cores in states:
+            self.assertEqual( threads, "1" )
+            self.assertEqual( len( cores ), 1 )
+            self.assertTrue( set( cores ) <= set( get_cores() ) )
+
+
+if __name__ == "__main__":
+    ut.main()
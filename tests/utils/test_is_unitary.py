@@ -18,7 +18,13 @@ class TestIsUnitary ( ut.TestCase ):
             U = unitary_group.rvs( 2 * i )
             U += 1e-13 * np.ones( ( 2 * i, 2 * i ) )
             self.assertTrue( is_unitary( U, tol = 1e-12 ) )
-   
+
+    def test_is_unitary_single ( self ):
+        for i in range( 1, 10 ):
+            U = unitary_group.rvs( 2 * i ).astype( np.complex64 )
+            self.assertTrue( is_unitary( U ) )
+            self.assertFalse( is_unitary( U, tol = 1e-12 ) )
+
     def test_is_unitary_invalid ( self ):
         self.assertFalse( is_unitary( 1j * np.ones( ( 4, 4 ) ) ) )
         self.assertFalse( is_unitary( np.ones( ( 4, 3 ) ) ) )
@@ -0,0 +1,26 @@
+import numpy    as np
+import unittest as ut
+
+from scipy.stats import unitary_group
+
+from qfactor.utils import is_unitary_stack
+
+
+class TestIsUnitaryStack ( ut.TestCase ):
+
+    def test_is_unitary_stack ( self ):
+        U = np.array( [ unitary_group.rvs( 4 ) for _ in range( 5 ) ] )
+        self.assertTrue( np.all( is_unitary_stack( U ) ) )
+
+        U[2] += 1e-3
+        self.assertEqual( list( is_unitary_stack( U ) ),
+                          [ True, True, False, True, True ] )
+
+    def test_is_unitary_stack_invalid ( self ):
+        self.assertRaises( TypeError, is_unitary_stack, np.identity( 4 ) )
+        self.assertRaises( TypeError, is_unitary_stack, np.ones( ( 2, 4, 3 ) ) )
+        self.assertRaises( TypeError, is_unitary_stack, "a" )
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,26 @@
+import numpy    as np
+import unittest as ut
+
+from qfactor.utils import random_unitaries, is_unitary_stack
+
+
+class TestRandomUnitaries ( ut.TestCase ):
+
+    def test_random_unitaries ( self ):
+        for dim in [ 2, 4, 8 ]:
+            U = random_unitaries( 10, dim )
+            self.assertEqual( U.shape, ( 10, dim, dim ) )
+            self.assertTrue( np.all( is_unitary_stack( U ) ) )
+
+    def test_random_unitaries_seed ( self ):
+        U1 = random_unitaries( 3, 4, seed = 7 )
+        U2 = random_unitaries( 3, 4, seed = 7 )
+        self.assertTrue( np.allclose( U1, U2 ) )
+
+    def test_random_unitaries_invalid ( self ):
+        self.assertRaises( TypeError, random_unitaries, -1, 2 )
+        self.assertRaises( TypeError, random_unitaries, 2, 0 )
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,44 @@
+import numpy as np
+import unittest as ut
+
+from scipy.stats import unitary_group
+
+from qfactor.gates import Gate
+from qfactor.window import GateIndex
+
+
+class TestGateIndex ( ut.TestCase ):
+
+    def get_circuit ( self ):
+        locations = [ (0, 1), (1, 2), (2, 3), (0, 1), (3, 4), (1, 2) ]
+        return [ Gate( unitary_group.rvs( 4 ), loc ) for loc in locations ]
+
+    def test_get_gates ( self ):
+        index = GateIndex( self.get_circuit() )
+        self.assertEqual( index.get_gates( [0] ), [0, 3] )
+        self.assertEqual( index.get_gates( [3, 4] ), [2, 4] )
+        self.assertEqual( index.get_gates( [7] ), [] )
+
+    def test_get_windows ( self ):
+        index = GateIndex( self.get_circuit() )
+        self.assertEqual( index.get_windows( 4, 2 ), [ (0, 4), (2, 6) ] )
+        self.assertEqual( index.get_windows( 4, 1 ),
+                          [ (0, 4), (1, 5), (2, 6) ] )
+        self.assertEqual( index.get_windows( 8 ), [ (0, 6) ] )
+
+    def test_get_windows_region ( self ):
+        index = GateIndex( self.get_circuit() )
+        self.assertEqual( index.get_windows( 2, qubits = [0] ),
+                          [ (0, 2), (3, 5) ] )
+        self.assertEqual( index.get_windows( 2, qubits = [4] ), [ (4, 6) ] )
+
+    def test_gate_index_invalid ( self ):
+        self.assertRaises( TypeError, GateIndex, "a" )
+        self.assertRaises( TypeError, GateIndex, [ "a" ] )
+        index = GateIndex( self.get_circuit() )
+        self.assertRaises( TypeError, index.get_windows, 0 )
+        self.assertRaises( TypeError, index.get_windows, 2, 0 )
+
+
+if __name__ == "__main__":
+    ut.main()
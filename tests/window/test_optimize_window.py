@@ -0,0 +1,59 @@
+import numpy as np
+import unittest as ut
+
+from scipy.stats import unitary_group
+
+from qfactor import Gate, get_distance
+from qfactor.tensors import CircuitTensor
+from qfactor.window import optimize_window
+
+
+class TestOptimizeWindow ( ut.TestCase ):
+
+    LOCATIONS = [ (0, 1), (1, 2), (0, 2), (1, 2), (0, 1), (0, 2) ]
+
+    def get_circuit ( self ):
+        return [ Gate( unitary_group.rvs( 4 ), loc )
+                 for loc in self.LOCATIONS ]
+
+    def test_optimize_window ( self ):
+        target = CircuitTensor( np.identity( 8 ), self.get_circuit() ).utry
+        circuit = self.get_circuit()
+        start_dist = get_distance( circuit, target )
+        circ = optimize_window( circuit, target, window_size = 3,
+                                stride = 1, max_passes = 5 )
+        self.assertTrue( get_distance( circ, target ) < start_dist )
+
+    def test_optimize_window_full ( self ):
+        u1 = unitary_group.rvs( 8 )
+        g1 = Gate( unitary_group.rvs( 8 ), (0, 1, 2) )
+        circ = optimize_window( [ g1 ], u1, window_size = 4 )
+        self.assertTrue( get_distance( circ, u1 ) < 1e-8 )
+
+    def test_optimize_window_region ( self ):
+        circuit = self.get_circuit()
+        target = CircuitTensor( np.identity( 8 ), circuit ).utry
+        circuit[1] = Gate( unitary_group.rvs( 4 ), (1, 2) )
+        circuit[4] = Gate( unitary_group.rvs( 4 ), (0, 1) )
+        before = [ g.utry for g in circuit ]
+        circ = optimize_window( circuit, target, window_size = 1,
+                                region = [0], max_passes = 2 )
+
+        # Gates that never act on qubit 0 are left untouched
+        self.assertTrue( np.array_equal( circ[1].utry, before[1] ) )
+        self.assertTrue( np.array_equal( circ[3].utry, before[3] ) )
+        self.assertFalse( np.array_equal( circ[4].utry, before[4] ) )
+
+    def test_optimize_window_invalid ( self ):
+        target = unitary_group.rvs( 8 )
+        self.assertRaises( TypeError, optimize_window, "a", target )
+        self.assertRaises( TypeError, optimize_window, self.get_circuit(),
+                           target, window_size = 0 )
+        self.assertRaises( TypeError, optimize_window, self.get_circuit(),
+                           target, window_iters = 0 )
+        self.assertRaises( ValueError, optimize_window, self.get_circuit(),
+                           unitary_group.rvs( 2 ) )
+
+
+if __name__ == "__main__":
+    ut.main()